@@ -26,6 +26,7 @@ from oslo.utils import timeutils
 import pytz
 import six
 
+from ceilometer.alarm import storage_client
 from ceilometer.i18n import _
 from ceilometer.openstack.common import log
 
@@ -37,6 +38,8 @@ OK = 'ok'
 ALARM = 'alarm'
 
 cfg.CONF.import_opt('http_timeout', 'ceilometer.service')
+cfg.CONF.import_opt('evaluation_backend', 'ceilometer.alarm.storage_client',
+                    group='alarm')
 cfg.CONF.import_group('service_credentials', 'ceilometer.service')
 
 
@@ -52,6 +55,9 @@ class Evaluator(object):
     def _client(self):
         """Construct or reuse an authenticated API client."""
         if not self.api_client:
+            if cfg.CONF.alarm.evaluation_backend == 'storage':
+                self.api_client = storage_client.get_client()
+                return self.api_client
             auth_config = cfg.CONF.service_credentials
             creds = dict(
                 os_auth_url=auth_config.os_auth_url,
@@ -122,6 +128,16 @@ class Evaluator(object):
         diff = timeutils.total_seconds(ts - cron.get_next(datetime.datetime))
         return abs(diff) < 60  # minute precision
 
+    def prepare(self, alarms):
+        """Prepare the evaluation of the alarms of an evaluation cycle.
+
+        Called once per evaluation cycle, before evaluating individually
+        the alarms of the type handled by this evaluator, to allow
+        retrieving at once what is shared by these alarms.
+
+        alarms: list of the Alarm instances to be evaluated
+        """
+
     @abc.abstractmethod
     def evaluate(self, alarm):
         """Interface definition.
@@ -17,6 +17,7 @@
 
 
 import itertools
+import json
 
 from ceilometer.alarm import evaluator
 from ceilometer.i18n import _
@@ -29,7 +30,37 @@ COMPARATORS = {'and': all, 'or': any}
 
 class CombinationEvaluator(evaluator.Evaluator):
 
+    def __init__(self, notifier):
+        super(CombinationEvaluator, self).__init__(notifier)
+        # states of the alarms retrieved by prepare() for the current
+        # evaluation cycle, by alarm id
+        self._alarm_states = {}
+
+    def prepare(self, alarms):
+        """Retrieve at once the states of the alarms being combined.
+
+        The sub-alarms shared by several combinations are then not
+        retrieved once per combination, only the sub-alarms missing from
+        the query being retrieved individually by evaluate().
+        """
+        self._alarm_states = {}
+        alarm_ids = set()
+        for alarm in alarms:
+            if self.within_time_constraint(alarm):
+                alarm_ids.update(alarm.rule['alarm_ids'])
+        if not alarm_ids:
+            return
+        query = {'in': {'alarm_id': sorted(alarm_ids)}}
+        try:
+            for alarm in self._client.query_alarms.query(
+                    filter=json.dumps(query)):
+                self._alarm_states[alarm.alarm_id] = alarm.state
+        except Exception:
+            LOG.exception(_('alarms retrieval failed'))
+
     def _get_alarm_state(self, alarm_id):
+        if alarm_id in self._alarm_states:
+            return self._alarm_states[alarm_id]
         try:
             alarm = self._client.alarms.get(alarm_id)
         except Exception:
@@ -106,3 +137,7 @@ class CombinationEvaluator(evaluator.Evaluator):
 
         if self._sufficient_states(alarm, states):
             self._transition(alarm, states)
+
+        if alarm.alarm_id in self._alarm_states:
+            # combinations of this combination see its new state
+            self._alarm_states[alarm.alarm_id] = alarm.state
@@ -16,10 +16,12 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import collections
 import datetime
 import operator
 
 from oslo.utils import timeutils
+import six
 
 from ceilometer.alarm import evaluator
 from ceilometer.alarm.evaluator import utils
@@ -48,18 +50,28 @@ class ThresholdEvaluator(evaluator.Evaluator):
     # avoid unknown state
     quorum = 1
 
+    def __init__(self, notifier):
+        super(ThresholdEvaluator, self).__init__(notifier)
+        # statistics retrieved by prepare() for the alarms sharing their
+        # statistics query, by alarm id
+        self._grouped_statistics = {}
+
     @classmethod
-    def _bound_duration(cls, alarm, constraints):
-        """Bound the duration of the statistics query."""
-        now = timeutils.utcnow()
+    def _window(cls, alarm):
+        """Return the duration of the sliding evaluation window."""
         # when exclusion of weak datapoints is enabled, we extend
         # the look-back period so as to allow a clearer sample count
         # trend to be established
         look_back = (cls.look_back if not alarm.rule.get('exclude_outliers')
                      else alarm.rule['evaluation_periods'])
-        window = (alarm.rule['period'] *
-                  (alarm.rule['evaluation_periods'] + look_back))
-        start = now - datetime.timedelta(seconds=window)
+        return (alarm.rule['period'] *
+                (alarm.rule['evaluation_periods'] + look_back))
+
+    @classmethod
+    def _bound_duration(cls, alarm, constraints, now=None):
+        """Bound the duration of the statistics query."""
+        now = now or timeutils.utcnow()
+        start = now - datetime.timedelta(seconds=cls._window(alarm))
         LOG.debug(_('query stats from %(start)s to '
                     '%(now)s') % {'start': start, 'now': now})
         after = dict(field='timestamp', op='ge', value=start.isoformat())
@@ -67,6 +79,96 @@ class ThresholdEvaluator(evaluator.Evaluator):
         constraints.extend([before, after])
         return constraints
 
+    # fields scoping a statistics query to the resources of one owner
+    scope_fields = ('project_id', 'user_id')
+
+    @classmethod
+    def _group_key(cls, alarm):
+        """Return the key of the alarms able to share a statistics query.
+
+        Such alarms are on the same meter with the same period, and their
+        queries only differ by the resource they are constrained to. The
+        alarms excluding weak datapoints are not grouped, as the statistics
+        of the whole window are used to detect these datapoints.
+
+        The shared query is not constrained to the resources of the alarms
+        any more, so the alarms are only grouped when their query is scoped
+        to a project or a user. The query would otherwise compute the
+        statistics of every resource of the meter.
+
+        Return None or the key with the resource id of the alarm.
+        """
+        if alarm.rule.get('exclude_outliers'):
+            return None
+        resource_ids = []
+        constraints = []
+        scoped = False
+        for q in alarm.rule['query']:
+            op = q.get('op', 'eq')
+            if q['field'] == 'resource_id' and op == 'eq':
+                resource_ids.append(q['value'])
+            else:
+                scoped = scoped or (q['field'] in cls.scope_fields and
+                                    op == 'eq')
+                constraints.append((q['field'], op,
+                                    q['value'], q.get('type')))
+        if len(resource_ids) != 1 or not scoped:
+            return None
+        return ((alarm.rule['meter_name'], alarm.rule['period'],
+                 tuple(sorted(constraints))), resource_ids[0])
+
+    def prepare(self, alarms):
+        """Retrieve at once the statistics of the alarms sharing a query.
+
+        A single statistics query grouped by resource is made for each
+        group of alarms on the same meter, period and query but for the
+        resource, over a window long enough for all the alarms of the
+        group. The periods being aligned on the end of the window, each
+        alarm then keeps the statistics of its own window.
+        """
+        self._grouped_statistics = {}
+        groups = collections.defaultdict(list)
+        for alarm in alarms:
+            if not self.within_time_constraint(alarm):
+                continue
+            group = self._group_key(alarm)
+            if group is not None:
+                key, resource_id = group
+                groups[key].append((alarm, resource_id))
+
+        now = timeutils.utcnow()
+        for key, members in six.iteritems(groups):
+            if len(members) < 2:
+                continue
+            meter_name, period = key[:2]
+            longest = max((alarm for alarm, resource_id in members),
+                          key=self._window)
+            query = self._bound_duration(
+                longest,
+                [q for q in longest.rule['query']
+                 if q['field'] != 'resource_id'],
+                now)
+            LOG.debug(_('stats query %(query)s shared by %(count)d alarms')
+                      % {'query': query, 'count': len(members)})
+            try:
+                statistics = self._client.statistics.list(
+                    meter_name=meter_name, q=query, period=period,
+                    groupby=['resource_id'])
+            except Exception:
+                # each alarm queries its statistics on evaluation instead
+                LOG.exception(_('grouped alarm stats retrieval failed'))
+                continue
+
+            by_resource = collections.defaultdict(list)
+            for stat in statistics:
+                by_resource[stat.groupby['resource_id']].append(stat)
+            for alarm, resource_id in members:
+                start = now - datetime.timedelta(seconds=self._window(alarm))
+                self._grouped_statistics[alarm.alarm_id] = [
+                    stat for stat in by_resource[resource_id]
+                    if timeutils.normalize_time(timeutils.parse_isotime(
+                        stat.period_start)) >= start]
+
     @staticmethod
     def _sanitize(alarm, statistics):
         """Sanitize statistics."""
@@ -178,15 +280,15 @@ class ThresholdEvaluator(evaluator.Evaluator):
                         'within its time constraint.') % alarm.alarm_id)
             return
 
-        query = self._bound_duration(
-            alarm,
-            alarm.rule['query']
-        )
+        statistics = self._grouped_statistics.pop(alarm.alarm_id, None)
+        if statistics is None:
+            query = self._bound_duration(
+                alarm,
+                alarm.rule['query']
+            )
+            statistics = self._statistics(alarm, query)
 
-        statistics = self._sanitize(
-            alarm,
-            self._statistics(alarm, query)
-        )
+        statistics = self._sanitize(alarm, statistics)
 
         if self._sufficient(alarm, statistics):
             def _compare(stat):
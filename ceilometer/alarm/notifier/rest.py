@@ -16,6 +16,10 @@
 # under the License.
 """Rest alarm notifier."""
 
+import collections
+import contextlib
+import random
+
 import eventlet
 from oslo.config import cfg
 from oslo.serialization import jsonutils
@@ -47,12 +51,164 @@ OPTS = [
                default=0,
                help='Number of retries for REST notifier',
                ),
+    cfg.FloatOpt('rest_notifier_retry_delay',
+                 default=1.0,
+                 help='Delay in seconds before the first retry of a REST '
+                      'notification, doubled for each following retry and '
+                      'randomized by up to a half.',
+                 ),
+    cfg.IntOpt('rest_notifier_workers',
+               default=32,
+               help='Maximum number of REST notifications sent '
+                    'concurrently, also the size of the connection pool '
+                    'kept for each destination.',
+               ),
+    cfg.FloatOpt('rest_notifier_timeout',
+                 default=30.0,
+                 help='Timeout in seconds of the connection to the REST '
+                      'notification destination and of each read of its '
+                      'response, so that a destination not answering does '
+                      'not hold a notification worker.',
+                 ),
 
 ]
 
 cfg.CONF.register_opts(OPTS, group="alarm")
 
 
+class _Dispatcher(object):
+    """Send the REST notifications with a bounded number of green threads.
+
+    The notifications wait in a queue for a worker. A notification of an
+    alarm queued while a previous notification of the same alarm to the
+    same URL is still waiting replaces it, so that only the latest state
+    is sent. The connections are pooled per destination, for a bounded
+    number of the most recently notified destinations: the least recently
+    used sessions are closed once no notification is sent through them.
+    """
+
+    # maximum number of destinations whose connections are kept
+    max_sessions = 64
+
+    def __init__(self):
+        # notifications waiting to be sent, by (url, alarm_id)
+        self.pending = collections.OrderedDict()
+        # sessions by (scheme, host), the least recently used first
+        self.sessions = collections.OrderedDict()
+        # number of notifications being sent, by session key
+        self.in_use = collections.Counter()
+        self.workers = 0
+        self.queued = 0
+        self.coalesced = 0
+        self.sent = 0
+        self.failed = 0
+
+    def queue(self, url, alarm_id, kwargs):
+        key = (url, alarm_id)
+        if key in self.pending:
+            self.coalesced += 1
+        else:
+            self.queued += 1
+        self.pending[key] = kwargs
+        if self.workers < cfg.CONF.alarm.rest_notifier_workers:
+            self.workers += 1
+            eventlet.spawn_n(self._work)
+
+    def _work(self):
+        try:
+            while self.pending:
+                (url, alarm_id), kwargs = self.pending.popitem(last=False)
+                self._post(url, alarm_id, kwargs)
+        finally:
+            self.workers -= 1
+        LOG.debug(_('REST notifications: %(queued)d queued, %(coalesced)d '
+                    'coalesced, %(sent)d sent, %(failed)d failed') %
+                  {'queued': self.queued, 'coalesced': self.coalesced,
+                   'sent': self.sent, 'failed': self.failed})
+
+    @contextlib.contextmanager
+    def _session(self, url):
+        parts = urlparse.urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        session = self.sessions.pop(key, None)
+        if session is None:
+            self._close_idle_sessions()
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=cfg.CONF.alarm.rest_notifier_workers)
+            session.mount('%s://%s' % key, adapter)
+        self.sessions[key] = session
+        self.in_use[key] += 1
+        try:
+            yield session
+        finally:
+            self.in_use[key] -= 1
+            if not self.in_use[key]:
+                del self.in_use[key]
+
+    def _close_idle_sessions(self):
+        """Make room for a new session among the bounded sessions.
+
+        The least recently used sessions without any notification being
+        sent through them are closed, the sessions in use being kept even
+        over the limit.
+        """
+        for key in list(self.sessions):
+            if len(self.sessions) < self.max_sessions:
+                break
+            if not self.in_use[key]:
+                self.sessions.pop(key).close()
+
+    @staticmethod
+    def _retryable(error):
+        """Whether a failed notification may succeed later.
+
+        The server errors and the connection failures are retried, not
+        the notifications rejected by the destination.
+        """
+        if isinstance(error, requests.HTTPError):
+            return (error.response is None or
+                    error.response.status_code >= 500)
+        return isinstance(error, (requests.ConnectionError,
+                                  requests.Timeout))
+
+    def _post(self, url, alarm_id, kwargs):
+        max_retries = cfg.CONF.alarm.rest_notifier_max_retries
+        delay = cfg.CONF.alarm.rest_notifier_retry_delay
+        timeout = cfg.CONF.alarm.rest_notifier_timeout
+        for attempt in range(max_retries + 1):
+            try:
+                with self._session(url) as session:
+                    session.post(url, timeout=timeout,
+                                 **kwargs).raise_for_status()
+            except Exception as e:
+                if attempt == max_retries or not self._retryable(e):
+                    self.failed += 1
+                    LOG.error(_('Unable to notify alarm %(alarm_id)s to '
+                                '%(url)s: %(error)s') %
+                              {'alarm_id': alarm_id, 'url': url,
+                               'error': e})
+                    return
+                # exponential backoff, with jitter so that the retries
+                # to a recovering destination are spread
+                eventlet.sleep(delay * (2 ** attempt) *
+                               random.uniform(0.5, 1.5))
+            else:
+                self.sent += 1
+                return
+
+
+_DISPATCHER = None
+
+
+def _get_dispatcher():
+    global _DISPATCHER
+    if _DISPATCHER is None:
+        _DISPATCHER = _Dispatcher()
+    return _DISPATCHER
+
+
 class RestAlarmNotifier(notifier.AlarmNotifier):
     """Rest alarm notifier."""
 
@@ -90,12 +246,4 @@ class RestAlarmNotifier(notifier.AlarmNotifier):
             if cert:
                 kwargs['cert'] = (cert, key) if key else cert
 
-        # FIXME(rhonjo): Retries are automatically done by urllib3 in requests
-        # library. However, there's no interval between retries in urllib3
-        # implementation. It will be better to put some interval between
-        # retries (future work).
-        max_retries = cfg.CONF.alarm.rest_notifier_max_retries
-        session = requests.Session()
-        session.mount(action.geturl(),
-                      requests.adapters.HTTPAdapter(max_retries=max_retries))
-        eventlet.spawn_n(session.post, action.geturl(), **kwargs)
+        _get_dispatcher().queue(action.geturl(), alarm_id, kwargs)
@@ -15,19 +15,24 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
-import math
-import random
+import collections
 import uuid
 
+from oslo.config import cfg
 from oslo.utils import timeutils
+from six import moves
 
 from ceilometer.alarm import rpc as rpc_alarm
 from ceilometer.i18n import _
 from ceilometer.openstack.common import log
+from ceilometer import utils
 
 
 LOG = log.getLogger(__name__)
 
+cfg.CONF.import_opt('partition_page_size', 'ceilometer.alarm.rpc',
+                    group='alarm')
+
 
 class PartitionIdentity(object):
     """Representation of a partition's identity for age comparison."""
@@ -79,9 +84,17 @@ class PartitionCoordinator(object):
     responsibility for allocating the alarms to be evaluated across
     the set of currently available partitions.
 
-    When a partition lifecycle event is detected (i.e. a pre-existing
-    partition fails to report its presence, or a new one is started
-    up), a complete rebalance of the alarms is initiated.
+    The alarms are allocated to the partitions by consistent hashing of
+    their ids, so that when a partition lifecycle event is detected (i.e.
+    a pre-existing partition fails to report its presence, or a new one
+    is started up) the rebalance of the alarms only moves the alarms of
+    the partitions leaving, or the share of the partition joining.
+
+    The master only sends to each partition the changes to its
+    allocation, in messages of at most partition_page_size alarm ids.
+    Each allocation is versioned and the partitions report the version
+    they hold with their presence, so that a partition missing changes
+    (or unknown to a newly assumed master) is sent its whole allocation.
 
     Individual alarm lifecycle events, on the other hand, do not
     require a full re-balance. Instead new alarms are allocated as
@@ -114,10 +127,20 @@ class PartitionCoordinator(object):
         self.reports = {}
         self.last_alarms = set()
         self.deleted_alarms = set()
+        # alarms allocated to the other partitions, with the version of
+        # the allocation and when it was sent, by partition uuid
+        self.allocations = {}
+        self.versions = {}
+        self.sent = {}
+        self.version = 0
+        # allocation versions reported by the other partitions, with
+        # when they were reported, by partition uuid
+        self.held_versions = {}
 
         # alarms for evaluation, relevant to all partitions regardless
         # of role
-        self.assignment = []
+        self.assignment = set()
+        self.assignment_version = None
 
     def _distribute(self, alarms, rebalance):
         """Distribute alarms over known set of evaluators.
@@ -127,39 +150,91 @@ class PartitionCoordinator(object):
         :return: true if the distribution completed, false if aborted
         """
         verb = 'assign' if rebalance else 'allocate'
-        method = (self.coordination_rpc.assign if rebalance
-                  else self.coordination_rpc.allocate)
         LOG.debug(_('triggering %s') % verb)
         LOG.debug(_('known evaluators %s') % self.reports)
-        per_evaluator = int(math.ceil(len(alarms) /
-                            float(len(self.reports) + 1)))
-        LOG.debug(_('per evaluator allocation %s') % per_evaluator)
-        # for small distributions (e.g. of newly created alarms)
-        # we deliberately skew to non-master evaluators
-        evaluators = self.reports.keys()
-        random.shuffle(evaluators)
-        offset = 0
-        for evaluator in evaluators:
-            # TODO(eglynn): use pagination in the alarms API to chunk large
-            # large allocations
+        ring = utils.HashRing([self.this.uuid] +
+                              [evaluator.uuid for evaluator in self.reports])
+        if rebalance:
+            targets = collections.defaultdict(set)
+            known = set(evaluator.uuid for evaluator in self.reports)
+            for state in (self.allocations, self.versions, self.sent):
+                for evaluator_uuid in set(state) - known:
+                    del state[evaluator_uuid]
+        else:
+            targets = collections.defaultdict(set, (
+                (evaluator_uuid, set(allocation)) for evaluator_uuid,
+                allocation in self.allocations.items()))
+            targets[self.this.uuid] = set(self.assignment)
+        for alarm_id in alarms:
+            targets[ring.get_node(alarm_id)].add(alarm_id)
+
+        for evaluator in self.reports.keys():
             if self.oldest < self.this:
                 LOG.warn(_('%(this)s bailing on distribution cycle '
                            'as older partition detected: %(older)s') %
                          dict(this=self.this, older=self.oldest))
                 return False
-            allocation = alarms[offset:offset + per_evaluator]
-            if allocation:
-                LOG.debug(_('%(verb)s-ing %(alloc)s to %(eval)s') %
-                          dict(verb=verb, alloc=allocation, eval=evaluator))
-                method(evaluator.uuid, allocation)
-            offset += per_evaluator
-        LOG.debug(_('master taking %s for self') % alarms[offset:])
-        if rebalance:
-            self.assignment = alarms[offset:]
-        else:
-            self.assignment.extend(alarms[offset:])
+            self._send(evaluator.uuid, targets[evaluator.uuid])
+        LOG.debug(_('master taking %d alarms for self') %
+                  len(targets[self.this.uuid]))
+        self.assignment = targets[self.this.uuid]
         return True
 
+    def _in_sync(self, evaluator_uuid):
+        """Check whether a partition holds the allocation last sent to it."""
+        version, reported = self.held_versions.get(evaluator_uuid,
+                                                   (None, None))
+        if version == self.versions.get(evaluator_uuid):
+            return True
+        # a report received before the last allocation may be outdated
+        return (reported is not None and
+                evaluator_uuid in self.sent and
+                reported <= self.sent[evaluator_uuid])
+
+    def _send(self, evaluator_uuid, allocation):
+        """Send to a partition the changes to its allocation.
+
+        The whole allocation is sent if the partition is not known to
+        hold the previous one.
+
+        :param evaluator_uuid: the uuid of the partition
+        :param allocation: the set of alarms allocated to the partition
+        """
+        previous = self.allocations.get(evaluator_uuid)
+        if previous is not None and self._in_sync(evaluator_uuid):
+            removed = sorted(previous - allocation)
+            added = sorted(allocation - previous)
+            messages = ([(self.coordination_rpc.deallocate, page)
+                         for page in self._pages(removed)] +
+                        [(self.coordination_rpc.allocate, page)
+                         for page in self._pages(added)])
+        else:
+            pages = self._pages(sorted(allocation)) or [[]]
+            messages = ([(self.coordination_rpc.assign, pages[0])] +
+                        [(self.coordination_rpc.allocate, page)
+                         for page in pages[1:]])
+        if not messages:
+            return
+        self.version += 1
+        version = '%s:%d' % (self.this.uuid, self.version)
+        LOG.debug(_('sending %(count)d messages for allocation %(version)s '
+                    'of %(alloc)d alarms to %(eval)s') %
+                  dict(count=len(messages), version=version,
+                       alloc=len(allocation), eval=evaluator_uuid))
+        for i, (method, page) in enumerate(messages):
+            # only the last message of an allocation sets its version
+            method(evaluator_uuid, page,
+                   version if i == len(messages) - 1 else None)
+        self.allocations[evaluator_uuid] = allocation
+        self.versions[evaluator_uuid] = version
+        self.sent[evaluator_uuid] = timeutils.utcnow()
+
+    @staticmethod
+    def _pages(alarms):
+        size = cfg.CONF.alarm.partition_page_size
+        return [alarms[i:i + size] for i in moves.xrange(0, len(alarms),
+                                                         size)]
+
     def _deletion_requires_rebalance(self, alarms):
         """Track the level of deletion activity since the last full rebalance.
 
@@ -231,10 +306,14 @@ class PartitionCoordinator(object):
         created_alarms = list(set(alarms) - self.last_alarms)
         LOG.debug(_('newly created alarms %s') % created_alarms)
         sufficient_deletion = self._deletion_requires_rebalance(alarms)
+        out_of_sync = [evaluator for evaluator in self.reports
+                       if not self._in_sync(evaluator.uuid)]
+        if out_of_sync:
+            LOG.debug(_('evaluators out of sync %s') % out_of_sync)
         if assuming or sufficient_deletion or self.presence_changed:
             still_ahead = self._distribute(alarms, rebalance=True)
-        elif created_alarms:
-            still_ahead = self._distribute(list(created_alarms),
+        elif created_alarms or out_of_sync:
+            still_ahead = self._distribute(created_alarms,
                                            rebalance=False)
         else:
             # nothing to distribute, but check anyway if overtaken
@@ -259,7 +338,7 @@ class PartitionCoordinator(object):
         except Exception:
             LOG.exception(_('mastership check failed'))
 
-    def presence(self, uuid, priority):
+    def presence(self, uuid, priority, version=None):
         """Accept an incoming report of presence."""
         report = PartitionIdentity(uuid, priority)
         if report != self.this:
@@ -267,28 +346,40 @@ class PartitionCoordinator(object):
                 self.presence_changed = True
             self._record_oldest(report)
             self.reports[report] = timeutils.utcnow()
+            self.held_versions[uuid] = (version, self.reports[report])
             LOG.debug(_('%(this)s knows about %(reports)s') %
                       dict(this=self.this, reports=self.reports))
 
-    def assign(self, uuid, alarms):
+    def assign(self, uuid, alarms, version=None):
         """Accept an incoming alarm assignment."""
         if uuid == self.this.uuid:
             LOG.debug(_('%(this)s got assignment: %(alarms)s') %
                       dict(this=self.this, alarms=alarms))
-            self.assignment = alarms
+            self.assignment = set(alarms)
+            self.assignment_version = version
 
-    def allocate(self, uuid, alarms):
+    def allocate(self, uuid, alarms, version=None):
         """Accept an incoming alarm allocation."""
         if uuid == self.this.uuid:
             LOG.debug(_('%(this)s got allocation: %(alarms)s') %
                       dict(this=self.this, alarms=alarms))
-            self.assignment.extend(alarms)
+            self.assignment.update(alarms)
+            self.assignment_version = version
+
+    def deallocate(self, uuid, alarms, version=None):
+        """Accept an incoming alarm deallocation."""
+        if uuid == self.this.uuid:
+            LOG.debug(_('%(this)s got deallocation: %(alarms)s') %
+                      dict(this=self.this, alarms=alarms))
+            self.assignment.difference_update(alarms)
+            self.assignment_version = version
 
     def report_presence(self):
         """Report the presence of the current partition."""
         LOG.debug(_('%s reporting presence') % self.this)
         try:
-            self.coordination_rpc.presence(self.this.uuid, self.this.priority)
+            self.coordination_rpc.presence(self.this.uuid, self.this.priority,
+                                           self.assignment_version)
         except Exception:
             LOG.exception(_('presence reporting failed'))
 
@@ -36,6 +36,10 @@ OPTS = [
                     'alarm evaluation service will be removed in Kilo in '
                     'favour of the default alarm evaluation service using '
                     'tooz for partitioning.'),
+    cfg.IntOpt('partition_page_size',
+               default=1000,
+               help='Maximum number of alarm ids sent in one partition '
+                    'coordination message.'),
 ]
 
 cfg.CONF.register_opts(OPTS, group='alarm')
@@ -78,20 +82,30 @@ class RPCAlarmPartitionCoordination(object):
             transport, topic=cfg.CONF.alarm.partition_rpc_topic,
             version="1.0")
 
-    def presence(self, uuid, priority):
+    def presence(self, uuid, priority, version=None):
         cctxt = self.client.prepare(fanout=True)
         return cctxt.cast(context.get_admin_context(),
                           'presence', data={'uuid': uuid,
-                                            'priority': priority})
+                                            'priority': priority,
+                                            'version': version})
 
-    def assign(self, uuid, alarms):
+    def assign(self, uuid, alarms, version=None):
         cctxt = self.client.prepare(fanout=True)
         return cctxt.cast(context.get_admin_context(),
                           'assign', data={'uuid': uuid,
-                                          'alarms': alarms})
+                                          'alarms': alarms,
+                                          'version': version})
 
-    def allocate(self, uuid, alarms):
+    def allocate(self, uuid, alarms, version=None):
         cctxt = self.client.prepare(fanout=True)
         return cctxt.cast(context.get_admin_context(),
                           'allocate', data={'uuid': uuid,
-                                            'alarms': alarms})
+                                            'alarms': alarms,
+                                            'version': version})
+
+    def deallocate(self, uuid, alarms, version=None):
+        cctxt = self.client.prepare(fanout=True)
+        return cctxt.cast(context.get_admin_context(),
+                          'deallocate', data={'uuid': uuid,
+                                              'alarms': alarms,
+                                              'version': version})
@@ -18,15 +18,20 @@
 # under the License.
 
 import abc
+import collections
 
 from ceilometerclient import client as ceiloclient
+import eventlet
+from eventlet import greenpool
 from oslo.config import cfg
 from oslo.utils import netutils
+from oslo.utils import timeutils
 import six
 from stevedore import extension
 
 from ceilometer.alarm.partition import coordination as alarm_coordination
 from ceilometer.alarm import rpc as rpc_alarm
+from ceilometer.alarm import storage_client
 from ceilometer import coordination as coordination
 from ceilometer.i18n import _
 from ceilometer import messaging
@@ -42,6 +47,13 @@ OPTS = [
                     ' collection of underlying metrics.',
                deprecated_opts=[cfg.DeprecatedOpt(
                    'threshold_evaluation_interval', group='alarm')]),
+    cfg.IntOpt('evaluation_workers',
+               default=16,
+               help='Number of alarms evaluated concurrently.'),
+    cfg.IntOpt('evaluation_timeout',
+               default=30,
+               help='Maximum time in seconds given to the evaluation of '
+                    'an alarm.'),
 ]
 
 cfg.CONF.register_opts(OPTS, group='alarm')
@@ -52,6 +64,8 @@ cfg.CONF.import_opt('partition_rpc_topic', 'ceilometer.alarm.rpc',
 cfg.CONF.import_opt('heartbeat', 'ceilometer.coordination',
                     group='coordination')
 cfg.CONF.import_opt('http_timeout', 'ceilometer.service')
+cfg.CONF.import_opt('evaluation_backend', 'ceilometer.alarm.storage_client',
+                    group='alarm')
 cfg.CONF.import_group('service_credentials', 'ceilometer.service')
 
 LOG = log.getLogger(__name__)
@@ -62,10 +76,18 @@ class AlarmService(object):
 
     EXTENSIONS_NAMESPACE = "ceilometer.alarm.evaluator"
 
+    # types of the alarms combining the states of other alarms, evaluated
+    # after these other alarms so as to see the states they transitioned to
+    # during the same cycle
+    COMBINING_TYPES = ('combination',)
+
     def __init__(self):
         super(AlarmService, self).__init__()
         self._load_evaluators()
         self.api_client = None
+        # ids of the alarms which were not evaluated during the last cycle
+        # as it overran the evaluation interval
+        self._skipped_alarms = set()
 
     def _load_evaluators(self):
         self.evaluators = extension.ExtensionManager(
@@ -80,6 +102,9 @@ class AlarmService(object):
     def _client(self):
         """Construct or reuse an authenticated API client."""
         if not self.api_client:
+            if cfg.CONF.alarm.evaluation_backend == 'storage':
+                self.api_client = storage_client.get_client()
+                return self.api_client
             auth_config = cfg.CONF.service_credentials
             creds = dict(
                 os_auth_url=auth_config.os_auth_url,
@@ -100,11 +125,75 @@ class AlarmService(object):
             alarms = self._assigned_alarms()
             LOG.info(_('initiating evaluation cycle on %d alarms') %
                      len(alarms))
-            for alarm in alarms:
-                self._evaluate_alarm(alarm)
+            self._evaluate_alarms(alarms)
+            if cfg.CONF.alarm.evaluation_backend == 'storage':
+                # write at once the state changes of the cycle
+                self._client.flush()
         except Exception:
             LOG.exception(_('alarm evaluation cycle failed'))
 
+    def _evaluate_alarms(self, alarms):
+        """Evaluate the alarms concurrently within the evaluation interval.
+
+        The alarms whose evaluation has not started when the interval is
+        over are skipped, so that the cycle does not delay the next one,
+        and are evaluated first during the next cycle. The alarms combining
+        other alarms are prepared and evaluated once the evaluation of the
+        other alarms is over.
+        """
+        start = timeutils.utcnow()
+        interval = cfg.CONF.alarm.evaluation_interval
+        pool = greenpool.GreenPool(cfg.CONF.alarm.evaluation_workers)
+        skipped = set()
+
+        def evaluate(alarm):
+            if timeutils.delta_seconds(start, timeutils.utcnow()) >= interval:
+                skipped.add(alarm.alarm_id)
+                return
+            self._evaluate_alarm(alarm)
+
+        # stable sort, so the alarms previously skipped come first
+        alarms_by_stage = ([], [])
+        for alarm in sorted(alarms, key=lambda alarm: (
+                alarm.alarm_id not in self._skipped_alarms)):
+            alarms_by_stage[alarm.type in self.COMBINING_TYPES].append(alarm)
+        for stage_alarms in alarms_by_stage:
+            if not stage_alarms:
+                continue
+            self._prepare_evaluators(stage_alarms)
+            for alarm in stage_alarms:
+                pool.spawn_n(evaluate, alarm)
+            pool.waitall()
+        self._skipped_alarms = skipped
+        evaluated = len(alarms) - len(skipped)
+
+        LOG.info(_('evaluation cycle of %(duration).2f seconds: %(evaluated)d '
+                   'alarms evaluated, %(skipped)d skipped as the cycle '
+                   'overran the evaluation interval') %
+                 {'duration': timeutils.delta_seconds(start,
+                                                      timeutils.utcnow()),
+                  'evaluated': evaluated,
+                  'skipped': len(skipped)})
+        if skipped:
+            LOG.warn(_('%(skipped)d alarms not evaluated, the evaluation of '
+                       '%(count)d alarms does not fit in %(interval)d '
+                       'seconds') % {'skipped': len(skipped),
+                                     'count': len(alarms),
+                                     'interval': interval})
+
+    def _prepare_evaluators(self, alarms):
+        """Let each evaluator prepare the evaluation of its alarms."""
+        alarms_by_type = collections.defaultdict(list)
+        for alarm in alarms:
+            if alarm.type in self.supported_evaluators:
+                alarms_by_type[alarm.type].append(alarm)
+        for alarm_type, typed_alarms in six.iteritems(alarms_by_type):
+            try:
+                self.evaluators[alarm_type].obj.prepare(typed_alarms)
+            except Exception:
+                LOG.exception(_('Failed to prepare evaluation of %s alarms'),
+                              alarm_type)
+
     def _evaluate_alarm(self, alarm):
         """Evaluate the alarms assigned to this evaluator."""
         if alarm.type not in self.supported_evaluators:
@@ -114,7 +203,10 @@ class AlarmService(object):
 
         LOG.debug(_('evaluating alarm %s') % alarm.alarm_id)
         try:
-            self.evaluators[alarm.type].obj.evaluate(alarm)
+            with eventlet.Timeout(cfg.CONF.alarm.evaluation_timeout):
+                self.evaluators[alarm.type].obj.evaluate(alarm)
+        except eventlet.Timeout:
+            LOG.warn(_('Evaluation of alarm %s timed out'), alarm.alarm_id)
         except Exception:
             LOG.exception(_('Failed to evaluate alarm %s'), alarm.alarm_id)
 
@@ -221,15 +313,23 @@ class PartitionedAlarmService(AlarmService, os_service.Service):
 
     def presence(self, context, data):
         self.partition_coordinator.presence(data.get('uuid'),
-                                            data.get('priority'))
+                                            data.get('priority'),
+                                            data.get('version'))
 
     def assign(self, context, data):
         self.partition_coordinator.assign(data.get('uuid'),
-                                          data.get('alarms'))
+                                          data.get('alarms'),
+                                          data.get('version'))
 
     def allocate(self, context, data):
         self.partition_coordinator.allocate(data.get('uuid'),
-                                            data.get('alarms'))
+                                            data.get('alarms'),
+                                            data.get('version'))
+
+    def deallocate(self, context, data):
+        self.partition_coordinator.deallocate(data.get('uuid'),
+                                              data.get('alarms'),
+                                              data.get('version'))
 
 
 class AlarmNotifierService(os_service.Service):
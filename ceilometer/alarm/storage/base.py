@@ -73,6 +73,19 @@ class Connection(object):
         """Update alarm."""
         raise ceilometer.NotImplementedError('Alarms not implemented')
 
+    def update_alarm_states(self, states):
+        """Update the state of several alarms at once.
+
+        Only the state and the state timestamp of the alarms are changed.
+
+        :param states: list of (alarm_id, state, state_timestamp) tuples.
+        """
+        for alarm_id, state, state_timestamp in states:
+            for alarm in self.get_alarms(alarm_id=alarm_id):
+                alarm.state = state
+                alarm.state_timestamp = state_timestamp
+                self.update_alarm(alarm)
+
     @staticmethod
     def delete_alarm(alarm_id):
         """Delete an alarm."""
@@ -21,6 +21,7 @@ import os
 
 from oslo.config import cfg
 from oslo.db.sqlalchemy import session as db_session
+import sqlalchemy as sa
 from sqlalchemy import desc
 
 import ceilometer
@@ -138,6 +139,12 @@ class Connection(base.Connection):
                                       time_constraints=row.time_constraints,
                                       repeat_actions=row.repeat_actions)
 
+    @staticmethod
+    def _rule_columns(rule):
+        """Return the values of the columns copied from an alarm rule."""
+        rule = rule or {}
+        return {'meter_name': rule.get('meter_name')}
+
     def _retrieve_alarms(self, query):
         return (self._row_to_alarm_model(x) for x in query.all())
 
@@ -176,17 +183,11 @@ class Connection(base.Connection):
             query = query.filter(models.Alarm.state == state)
         if alarm_type is not None:
             query = query.filter(models.Alarm.type == alarm_type)
-
-        query = query.order_by(desc(models.Alarm.timestamp))
-        alarms = self._retrieve_alarms(query)
-
-        # TODO(cmart): improve this by using sqlalchemy.func factory
         if meter is not None:
-            alarms = filter(lambda row:
-                            row.rule.get('meter_name', None) == meter,
-                            alarms)
+            query = query.filter(models.Alarm.meter_name == meter)
 
-        return alarms
+        query = query.order_by(desc(models.Alarm.timestamp))
+        return self._retrieve_alarms(query)
 
     def create_alarm(self, alarm):
         """Create an alarm.
@@ -197,6 +198,7 @@ class Connection(base.Connection):
         with session.begin():
             alarm_row = models.Alarm(alarm_id=alarm.alarm_id)
             alarm_row.update(alarm.as_dict())
+            alarm_row.update(self._rule_columns(alarm.rule))
             session.add(alarm_row)
 
         return self._row_to_alarm_model(alarm_row)
@@ -210,9 +212,31 @@ class Connection(base.Connection):
         with session.begin():
             alarm_row = session.merge(models.Alarm(alarm_id=alarm.alarm_id))
             alarm_row.update(alarm.as_dict())
+            alarm_row.update(self._rule_columns(alarm.rule))
 
         return self._row_to_alarm_model(alarm_row)
 
+    def update_alarm_states(self, states):
+        """Update the state of several alarms at once.
+
+        :param states: list of (alarm_id, state, state_timestamp) tuples.
+        """
+        if not states:
+            return
+        table = models.Alarm.__table__
+        stmt = table.update().where(
+            table.c.alarm_id == sa.bindparam('_alarm_id')).values(
+            state=sa.bindparam('_state'),
+            state_timestamp=sa.bindparam('_state_timestamp',
+                                         type_=table.c.state_timestamp.type))
+        session = self._engine_facade.get_session()
+        with session.begin():
+            session.execute(stmt, [{'_alarm_id': alarm_id,
+                                    '_state': state,
+                                    '_state_timestamp': state_timestamp}
+                                   for alarm_id, state, state_timestamp
+                                   in states])
+
     def delete_alarm(self, alarm_id):
         """Delete an alarm
 
@@ -71,6 +71,14 @@ class Connection(base.Connection):
 
     create_alarm = update_alarm
 
+    def update_alarm_states(self, states):
+        """Update the state of several alarms at once."""
+        for alarm_id, state, state_timestamp in states:
+            self.db.alarm.update(
+                {'alarm_id': alarm_id},
+                {'$set': {'state': state,
+                          'state_timestamp': state_timestamp}})
+
     def delete_alarm(self, alarm_id):
         """Delete an alarm."""
         self.db.alarm.remove({'alarm_id': alarm_id})
@@ -0,0 +1,272 @@
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+"""Client for the alarm evaluation accessing directly the storage drivers.
+
+It implements the subset of the API client used by the alarm evaluation
+service and the evaluators, so they can skip the round trips through the
+Ceilometer API.
+"""
+
+import ast
+import functools
+import json
+import uuid
+
+from oslo.config import cfg
+from oslo.utils import strutils
+from oslo.utils import timeutils
+from oslo_context import context
+import six
+
+import ceilometer
+from ceilometer.alarm.storage import models
+from ceilometer.i18n import _
+from ceilometer import messaging
+from ceilometer.openstack.common import log
+from ceilometer import storage
+
+LOG = log.getLogger(__name__)
+
+OPTS = [
+    cfg.StrOpt('evaluation_backend',
+               default='api',
+               choices=['api', 'storage'],
+               help='How the alarm evaluation accesses the alarms and the '
+                    'statistics of the meters: through the Ceilometer API '
+                    'or directly with the storage drivers.'),
+    cfg.BoolOpt('record_history',
+                default=True,
+                help='Record alarm change events.'
+                ),
+]
+
+cfg.CONF.register_opts(OPTS, group='alarm')
+
+# same conversions of the metadata values as the API
+_TYPE_CONVERTERS = {'integer': int,
+                    'float': float,
+                    'boolean': functools.partial(strutils.bool_from_string,
+                                                 strict=True),
+                    'string': six.text_type}
+
+_CLIENT = None
+
+
+def get_client():
+    """Return the client shared by the alarm service and its evaluators."""
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = Client(cfg.CONF)
+    return _CLIENT
+
+
+def _get_value_as_type(value, type=None):
+    if type:
+        return _TYPE_CONVERTERS[type](value)
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return value
+
+
+def _query_to_kwargs(query, translation):
+    """Convert an API simple query to storage keyword arguments.
+
+    :param query: list of dict with field, op, value and optional type.
+    :param translation: mapping of the query fields to their argument.
+    """
+    kwargs = {}
+    metaquery = {}
+    for q in query:
+        field = q['field']
+        op = q.get('op') or 'eq'
+        if field == 'timestamp':
+            value = timeutils.normalize_time(
+                timeutils.parse_isotime(q['value']))
+            if op in ('gt', 'ge'):
+                kwargs['start_timestamp'] = value
+                kwargs['start_timestamp_op'] = op
+            elif op in ('lt', 'le'):
+                kwargs['end_timestamp'] = value
+                kwargs['end_timestamp_op'] = op
+        elif op != 'eq':
+            raise ceilometer.NotImplementedError(
+                _('Operator %(op)s is not supported on field %(field)s') %
+                {'op': op, 'field': field})
+        elif field.startswith('metadata.'):
+            metaquery[field] = _get_value_as_type(q['value'],
+                                                  q.get('type'))
+        elif field.startswith('resource_metadata.'):
+            metaquery[field[9:]] = _get_value_as_type(q['value'],
+                                                      q.get('type'))
+        elif field in translation:
+            kwargs[translation[field]] = q['value']
+        else:
+            raise ceilometer.NotImplementedError(
+                _('Field %s is not supported') % field)
+    if metaquery:
+        kwargs['metaquery'] = metaquery
+    return kwargs
+
+
+class AlarmManager(object):
+    """Access to the alarms, with the state changes written in bulk.
+
+    The state changes are kept until flush() is called, usually at the
+    end of an evaluation cycle, the alarms returned in the meantime
+    already having their new state.
+    """
+
+    translation = {'alarm_id': 'alarm_id',
+                   'enabled': 'enabled',
+                   'meter': 'meter',
+                   'name': 'name',
+                   'project_id': 'project',
+                   'state': 'state',
+                   'type': 'alarm_type',
+                   'user_id': 'user'}
+
+    def __init__(self, conn):
+        self.conn = conn
+        # the alarms of the current evaluation cycle, by id
+        self._alarms = {}
+        # the state changes to write, by alarm id
+        self._states = {}
+        self._notifier = None
+
+    def list(self, q=None):
+        alarms = self._with_pending_states(self.conn.get_alarms(
+            **_query_to_kwargs(q or [], self.translation)))
+        self._alarms = dict((alarm.alarm_id, alarm) for alarm in alarms)
+        return alarms
+
+    def query(self, filter_expr=None, orderby=None, limit=None):
+        """Return the alarms matching a complex query expression."""
+        alarms = self._with_pending_states(self.conn.query_alarms(
+            filter_expr=filter_expr, orderby=orderby, limit=limit))
+        self._alarms.update((alarm.alarm_id, alarm) for alarm in alarms)
+        return alarms
+
+    def _with_pending_states(self, alarms):
+        alarms = list(alarms)
+        for alarm in alarms:
+            if alarm.alarm_id in self._states:
+                alarm.state = self._states[alarm.alarm_id][0]
+        return alarms
+
+    def get(self, alarm_id):
+        if alarm_id not in self._alarms:
+            alarms = list(self.conn.get_alarms(alarm_id=alarm_id))
+            if not alarms:
+                return None
+            self._alarms[alarm_id] = alarms[0]
+        return self._alarms[alarm_id]
+
+    def set_state(self, alarm_id, state):
+        self._states[alarm_id] = (state, timeutils.utcnow())
+        if alarm_id in self._alarms:
+            self._alarms[alarm_id].state = state
+        return state
+
+    def flush(self):
+        """Write the pending state changes and record them in history."""
+        states, self._states = self._states, {}
+        if not states:
+            return
+        self.conn.update_alarm_states([
+            (alarm_id, state, now)
+            for alarm_id, (state, now) in six.iteritems(states)])
+        if not cfg.CONF.alarm.record_history:
+            return
+        for alarm_id, (state, now) in six.iteritems(states):
+            alarm = self.get(alarm_id)
+            payload = dict(event_id=str(uuid.uuid4()),
+                           alarm_id=alarm_id,
+                           type=models.AlarmChange.STATE_TRANSITION,
+                           detail=json.dumps({'state': state}),
+                           user_id=alarm and alarm.user_id,
+                           project_id=alarm and alarm.project_id,
+                           on_behalf_of=alarm and alarm.project_id,
+                           timestamp=now)
+            try:
+                self.conn.record_alarm_change(payload)
+            except ceilometer.NotImplementedError:
+                pass
+            # same notification as a state change through the API
+            self._send_notification(dict(payload, detail={'state': state}))
+
+    def _send_notification(self, payload):
+        if self._notifier is None:
+            self._notifier = messaging.get_notifier(
+                messaging.get_transport(),
+                publisher_id='ceilometer.alarm.evaluator')
+        notification = 'alarm.%s' % payload['type'].replace(' ', '_')
+        self._notifier.info(context.RequestContext(), notification, payload)
+
+
+class QueryAlarmsManager(object):
+    """Complex queries of the alarms."""
+
+    def __init__(self, alarms):
+        self.alarms = alarms
+
+    def query(self, filter=None, orderby=None, limit=None):
+        # the JSON expressions are passed as they are to the storage driver,
+        # without the validation and conversions of the API
+        return self.alarms.query(filter and json.loads(filter),
+                                 orderby and json.loads(orderby),
+                                 limit)
+
+
+class StatisticsManager(object):
+    """Computation of the statistics of a meter."""
+
+    translation = {'message_id': 'message_id',
+                   'meter': 'meter',
+                   'project_id': 'project',
+                   'resource_id': 'resource',
+                   'source': 'source',
+                   'user_id': 'user'}
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def list(self, meter_name, q=None, period=None, groupby=None):
+        kwargs = _query_to_kwargs(q or [], self.translation)
+        kwargs['meter'] = meter_name
+        statistics = []
+        for stat in self.conn.get_meter_statistics(
+                storage.SampleFilter(**kwargs), period, groupby):
+            # like the API, return the period bounds as ISO 8601 strings
+            for attr in ('period_start', 'period_end'):
+                if getattr(stat, attr, None) is not None:
+                    setattr(stat, attr, getattr(stat, attr).isoformat())
+            statistics.append(stat)
+        return statistics
+
+
+class Client(object):
+    """Client of the alarm and metering storage drivers."""
+
+    def __init__(self, conf):
+        self.alarms = AlarmManager(
+            storage.get_connection_from_config(conf, 'alarm'))
+        self.query_alarms = QueryAlarmsManager(self.alarms)
+        self.statistics = StatisticsManager(
+            storage.get_connection_from_config(conf))
+
+    def flush(self):
+        try:
+            self.alarms.flush()
+        except Exception:
+            LOG.exception(_('alarm state update failed'))
@@ -15,11 +15,13 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
-import logging
 import os
+import signal
 import socket
-from wsgiref import simple_server
 
+import eventlet
+import eventlet.event
+import eventlet.wsgi
 import netaddr
 from oslo.config import cfg
 from paste import deploy
@@ -30,6 +32,8 @@ from ceilometer.api import hooks
 from ceilometer.api import middleware
 from ceilometer.i18n import _
 from ceilometer.openstack.common import log
+from ceilometer.openstack.common import service as os_service
+from ceilometer import service
 from ceilometer import storage
 
 LOG = log.getLogger(__name__)
@@ -50,6 +54,51 @@ API_OPTS = [
                 help='Toggle Pecan Debug Middleware. '
                 'Defaults to global debug value.'
                 ),
+    cfg.BoolOpt('stream_results',
+                default=True,
+                help='Stream the JSON listings of samples and events to the '
+                'client as they are read from the storage, rather than '
+                'building the whole response in memory.'
+                ),
+    cfg.IntOpt('statistics_cache_size',
+               default=1000,
+               help='Maximum number of statistics results cached by each '
+               'API worker, 0 disables the cache.'
+               ),
+    cfg.IntOpt('statistics_cache_settle_time',
+               default=600,
+               help='Age in seconds from which the end of the time window '
+               'of a statistics request is considered settled: its result '
+               'is then cached until evicted by newer ones.'
+               ),
+    cfg.IntOpt('statistics_cache_tail_ttl',
+               default=0,
+               help='Time in seconds to cache the statistics of the time '
+               'windows not settled yet, 0 not to cache them.'
+               ),
+    cfg.IntOpt('statistics_cache_report_interval',
+               default=300,
+               help='Interval in seconds at which each API worker logs the '
+               'hits, misses and hit ratio of its statistics cache, 0 not '
+               'to log them.'
+               ),
+    cfg.IntOpt('workers',
+               default=1,
+               help='Number of worker processes of the API server, sharing '
+               'its listening socket.'
+               ),
+    cfg.BoolOpt('keep_alive',
+                default=True,
+                help='Keep the connections of the clients open between their '
+                'requests (HTTP keep-alive).'
+                ),
+    cfg.IntOpt('client_socket_timeout',
+               default=60,
+               help='Timeout in seconds of the reads on the connections of '
+               'the clients, closing the idle keep-alive ones, which a '
+               'worker being stopped or reloaded waits for. 0 means to wait '
+               'forever.'
+               ),
 ]
 
 CONF.register_opts(OPTS)
@@ -70,7 +119,9 @@ def setup_app(pecan_config=None, extra_hooks=None):
                      storage.get_connection_from_config(cfg.CONF, 'event'),
                      storage.get_connection_from_config(cfg.CONF, 'alarm'),),
                  hooks.PipelineHook(),
-                 hooks.TranslationHook()]
+                 hooks.StatisticsCacheHook(),
+                 hooks.TranslationHook(),
+                 hooks.StreamingHook()]
     if extra_hooks:
         app_hooks.extend(extra_hooks)
 
@@ -109,34 +160,15 @@ class VersionSelectorApplication(object):
         return self.v2(environ, start_response)
 
 
-def get_server_cls(host):
-    """Return an appropriate WSGI server class base on provided host
+def get_address_family(host):
+    """Return the address family of the socket to listen on the given host.
 
     :param host: The listen host for the ceilometer API server.
     """
-    server_cls = simple_server.WSGIServer
+    # NOTE(dzyu) make sure use IPv6 sockets if host is in IPv6 pattern
     if netaddr.valid_ipv6(host):
-        # NOTE(dzyu) make sure use IPv6 sockets if host is in IPv6 pattern
-        if getattr(server_cls, 'address_family') == socket.AF_INET:
-            class ipv6_server_cls(server_cls):
-                address_family = socket.AF_INET6
-            return ipv6_server_cls
-    return server_cls
-
-
-def get_handler_cls():
-    cls = simple_server.WSGIRequestHandler
-
-    # old-style class doesn't support super
-    class CeilometerHandler(cls, object):
-        def address_string(self):
-            if cfg.CONF.api.enable_reverse_dns_lookup:
-                return super(CeilometerHandler, self).address_string()
-            else:
-                # disable reverse dns lookup, directly return ip address
-                return self.client_address[0]
-
-    return CeilometerHandler
+        return socket.AF_INET6
+    return socket.AF_INET
 
 
 def load_app():
@@ -154,28 +186,82 @@ def load_app():
     return deploy.loadapp("config:" + cfg_file)
 
 
-def build_server():
-    app = load_app()
-    # Create the WSGI server and start it
-    host, port = cfg.CONF.api.host, cfg.CONF.api.port
-    server_cls = get_server_cls(host)
+class WSGIService(os_service.Service):
+    """The API server, run by each worker process.
 
-    srv = simple_server.make_server(host, port, app,
-                                    server_cls, get_handler_cls())
-
-    LOG.info(_('Starting server in PID %s') % os.getpid())
-    LOG.info(_("Configuration:"))
-    cfg.CONF.log_opt_values(LOG, logging.INFO)
-
-    if host == '0.0.0.0':
-        LOG.info(_(
-            'serving on 0.0.0.0:%(sport)s, view at http://127.0.0.1:%(vport)s')
-            % ({'sport': port, 'vport': port}))
-    else:
-        LOG.info(_("serving on http://%(host)s:%(port)s") % (
-                 {'host': host, 'port': port}))
+    The listening socket is opened before the workers are forked and shared
+    by them, whereas the application, and so its storage connections, is
+    loaded by each worker when it starts. The requests in progress are
+    completed when the worker is stopped or reloaded.
+    """
 
-    return srv
+    def __init__(self):
+        super(WSGIService, self).__init__()
+        self.workers = cfg.CONF.api.workers
+        if self.workers < 1:
+            raise service.WorkerException(
+                _("api workers value of %s is invalid, must be greater "
+                  "than 0") % self.workers)
+        self.server = None
+        host, port = cfg.CONF.api.host, cfg.CONF.api.port
+        self.socket = eventlet.listen((host, port),
+                                      family=get_address_family(host))
+
+        if host == '0.0.0.0':
+            LOG.info(_(
+                'serving on 0.0.0.0:%(sport)s, view at '
+                'http://127.0.0.1:%(vport)s')
+                % ({'sport': port, 'vport': port}))
+        else:
+            LOG.info(_("serving on http://%(host)s:%(port)s") % (
+                     {'host': host, 'port': port}))
+
+    @staticmethod
+    def _defer_signal_handlers():
+        """Run the signal handlers of the launcher out of the requests.
+
+        These handlers raise an exception to stop the service, which aborts
+        the request being processed when the signal is received: they are
+        rather run from the hub, which passes the exception to the main
+        green thread waiting for the service to stop.
+        """
+        hub = eventlet.hubs.get_hub()
+        main = eventlet.getcurrent()
+        while main.parent:
+            main = main.parent
+
+        def defer(handler):
+            def deferred(signo, frame):
+                if eventlet.getcurrent() in (main, hub.greenlet):
+                    return handler(signo, frame)
+                hub.schedule_call_global(0, handler, signo, None)
+            return deferred
+
+        for signo in (signal.SIGTERM, getattr(signal, 'SIGHUP', None)):
+            handler = signo and signal.getsignal(signo)
+            if callable(handler):
+                signal.signal(signo, defer(handler))
+
+    def start(self):
+        LOG.info(_('Starting server in PID %s') % os.getpid())
+        self._defer_signal_handlers()
+        self.server = eventlet.event.Event()
+        # the server closes its socket when it stops, it is given a
+        # duplicate to be restarted on the same one
+        self.tg.add_thread(
+            eventlet.wsgi.server, self.socket.dup(), load_app(),
+            log=log.WritableLogger(LOG),
+            keepalive=cfg.CONF.api.keep_alive,
+            socket_timeout=cfg.CONF.api.client_socket_timeout or None,
+            debug=False,
+            server_event=self.server)
+
+    def stop(self):
+        # the connections are closed once their request in progress is
+        # completed, rather than kept open for the next ones
+        if self.server and self.server.ready():
+            self.server.wait().keepalive = False
+        super(WSGIService, self).stop()
 
 
 def app_factory(global_config, **local_conf):
@@ -28,11 +28,15 @@
 """
 import ast
 import base64
+import binascii
+import collections
 import copy
 import datetime
 import functools
 import inspect
+import itertools
 import json
+import operator
 import uuid
 
 import croniter
@@ -46,6 +50,7 @@ import pecan
 from pecan import rest
 import pytz
 import six
+from six.moves.urllib import parse as urlparse
 import wsme
 from wsme import types as wtypes
 import wsmeext.pecan as wsme_pecan
@@ -60,16 +65,13 @@ from ceilometer import messaging
 from ceilometer.openstack.common import log
 from ceilometer import sample
 from ceilometer import storage
+from ceilometer.storage import base as storage_base
 from ceilometer import utils
 
 LOG = log.getLogger(__name__)
 
 
 ALARM_API_OPTS = [
-    cfg.BoolOpt('record_history',
-                default=True,
-                help='Record alarm change events.'
-                ),
     cfg.IntOpt('user_alarm_quota',
                default=None,
                help='Maximum number of alarms defined for a user.'
@@ -81,6 +83,8 @@ ALARM_API_OPTS = [
 ]
 
 cfg.CONF.register_opts(ALARM_API_OPTS, group='alarm')
+cfg.CONF.import_opt('record_history', 'ceilometer.alarm.storage_client',
+                    group='alarm')
 
 state_kind = ["ok", "alarm", "insufficient data"]
 state_kind_enum = wtypes.Enum(str, *state_kind)
@@ -657,6 +661,75 @@ def _make_link(rel_name, url, type, type_arg, query=None):
                 rel=rel_name)
 
 
+def _stream_listing(datatype, values):
+    """Return a listing, streamed to the client when the response is JSON.
+
+    The first value is read here so that the errors raised by the storage
+    driver are still reported with their status code; the following ones
+    are encoded by ceilometer.api.hooks.StreamingHook as they are read.
+    """
+    if (not cfg.CONF.api.stream_results or
+            pecan.request.pecan.get('content_type') != 'application/json'):
+        return list(values)
+    values = iter(values)
+    try:
+        first = next(values)
+    except StopIteration:
+        return []
+    pecan.request.context['json_stream'] = (
+        datatype, itertools.chain([first], values))
+    return []
+
+
+def _link_next_page(values, limit, marker_of):
+    """Link a full page of a listing to the next one with a Link header.
+
+    :param values: The values of the page.
+    :param limit: Maximum number of values of the page.
+    :param marker_of: Function returning the marker of a value, the one
+                      of the last value is the marker of the next page.
+    """
+    if not limit or len(values) < limit:
+        return
+    params = [(k, v) for k, v in pecan.request.GET.items() if k != 'marker']
+    params.append(('marker', marker_of(values[-1])))
+    next_url = '%s?%s' % (pecan.request.path_url, urlparse.urlencode(
+        [(k, six.text_type(v).encode('utf-8')) for k, v in params]))
+    pecan.response.headers['Link'] = '<%s>; rel="next"' % next_url
+
+
+def _paginate_listing(datatype, values, limit, marker_of):
+    """Return a listing, as a page linked to the next one if limited.
+
+    The listings without a limit are streamed.
+    """
+    if not limit:
+        return _stream_listing(datatype, values)
+    values = list(values)
+    _link_next_page(values, limit, marker_of)
+    return values
+
+
+def _statistics_cache_key(sample_filter, period, groupby, aggregate):
+    """Return the key of a statistics request in the statistics cache.
+
+    The project scope of the caller is part of it, in addition to the
+    filter which is restricted to it.
+    """
+    def freeze(value):
+        if isinstance(value, dict):
+            return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+        if isinstance(value, list):
+            return tuple(freeze(v) for v in value)
+        return value
+
+    return (rbac.get_limited_to_project(pecan.request.headers),
+            freeze(vars(sample_filter)),
+            period,
+            tuple(groupby or ()),
+            tuple(sorted((a.func, a.param) for a in aggregate)))
+
+
 def _send_notification(event, payload):
     notification = event.replace(" ", "_")
     notification = "alarm.%s" % notification
@@ -875,12 +948,14 @@ class MeterController(rest.RestController):
         pecan.request.context['meter_name'] = meter_name
         self.meter_name = meter_name
 
-    @wsme_pecan.wsexpose([OldSample], [Query], int)
-    def get_all(self, q=None, limit=None):
+    @wsme_pecan.wsexpose([OldSample], [Query], int, wtypes.text)
+    def get_all(self, q=None, limit=None, marker=None):
         """Return samples for the meter.
 
         :param q: Filter rules for the data to be returned.
         :param limit: Maximum number of samples to return.
+        :param marker: The message_id of the last sample of the previous
+                       page, the samples following it are returned.
         """
 
         rbac.enforce('get_samples', pecan.request)
@@ -891,9 +966,14 @@ class MeterController(rest.RestController):
         kwargs = _query_to_kwargs(q, storage.SampleFilter.__init__)
         kwargs['meter'] = self.meter_name
         f = storage.SampleFilter(**kwargs)
-        return [OldSample.from_db_model(e)
-                for e in pecan.request.storage_conn.get_samples(f, limit=limit)
-                ]
+        try:
+            samples = pecan.request.storage_conn.get_samples(
+                f, limit=limit, marker=marker)
+            return _paginate_listing(
+                OldSample, (OldSample.from_db_model(e) for e in samples),
+                limit, operator.attrgetter('message_id'))
+        except storage_base.NoResultFound:
+            raise ClientSideError(_("Unknown marker %s") % marker)
 
     @wsme_pecan.wsexpose([OldSample], body=[OldSample])
     def post(self, samples):
@@ -995,11 +1075,20 @@ class MeterController(rest.RestController):
                 start = timeutils.parse_isotime(i.value).replace(
                     tzinfo=None)
 
-        try:
-            computed = pecan.request.storage_conn.get_meter_statistics(
-                f, period, g, aggregate)
+        def compute():
             LOG.debug(_('computed value coming from %r'),
                       pecan.request.storage_conn)
+            return list(pecan.request.storage_conn.get_meter_statistics(
+                f, period, g, aggregate))
+
+        try:
+            cache = pecan.request.statistics_cache
+            if cache is not None:
+                computed = cache.get(
+                    _statistics_cache_key(f, period, g, aggregate),
+                    f.end_timestamp, compute)
+            else:
+                computed = compute()
 
             return [Statistics(start_timestamp=start,
                                end_timestamp=end,
@@ -1065,22 +1154,48 @@ class MetersController(rest.RestController):
     def _lookup(self, meter_name, *remainder):
         return MeterController(meter_name), remainder
 
-    @wsme_pecan.wsexpose([Meter], [Query])
-    def get_all(self, q=None):
+    @staticmethod
+    def _decode_marker(marker):
+        """Return the resource id and the meter name of a meter_id."""
+        try:
+            meter_id = base64.decodestring(marker.encode('utf-8'))
+            resource_id, sep, name = meter_id.decode('utf-8').rpartition('+')
+        except (binascii.Error, UnicodeDecodeError):
+            sep = None
+        if not sep:
+            raise ClientSideError(_("Unknown marker %s") % marker)
+        return resource_id, name
+
+    @wsme_pecan.wsexpose([Meter], [Query], int, wtypes.text)
+    def get_all(self, q=None, limit=None, marker=None):
         """Return all known meters, based on the data recorded so far.
 
         :param q: Filter rules for the meters to be returned.
+        :param limit: Maximum number of meters to return.
+        :param marker: The meter_id of the last meter of the previous page,
+                       the meters following it are returned.
         """
 
         rbac.enforce('get_meters', pecan.request)
 
         q = q or []
+        if limit and limit < 0:
+            raise ClientSideError(_("Limit must be positive"))
 
         # Timestamp field is not supported for Meter queries
         kwargs = _query_to_kwargs(q, pecan.request.storage_conn.get_meters,
                                   allow_timestamps=False)
-        return [Meter.from_db_model(m)
-                for m in pecan.request.storage_conn.get_meters(**kwargs)]
+        if limit or marker:
+            kwargs['pagination'] = storage_base.Pagination(
+                limit=limit, primary_sort_dir='asc',
+                marker_value=marker and self._decode_marker(marker))
+        try:
+            meters = [Meter.from_db_model(m) for m in
+                      pecan.request.storage_conn.get_meters(**kwargs)]
+        except storage_base.NoResultFound:
+            raise ClientSideError(_("Unknown marker %s") % marker)
+        _link_next_page(meters, limit, operator.attrgetter('meter_id'))
+        return meters
 
 
 class Sample(_Base):
@@ -1158,12 +1273,14 @@ class Sample(_Base):
 class SamplesController(rest.RestController):
     """Controller managing the samples."""
 
-    @wsme_pecan.wsexpose([Sample], [Query], int)
-    def get_all(self, q=None, limit=None):
+    @wsme_pecan.wsexpose([Sample], [Query], int, wtypes.text)
+    def get_all(self, q=None, limit=None, marker=None):
         """Return all known samples, based on the data recorded so far.
 
         :param q: Filter rules for the samples to be returned.
         :param limit: Maximum number of samples to be returned.
+        :param marker: The id of the last sample of the previous page, the
+                       samples following it are returned.
         """
 
         rbac.enforce('get_samples', pecan.request)
@@ -1174,8 +1291,14 @@ class SamplesController(rest.RestController):
             raise ClientSideError(_("Limit must be positive"))
         kwargs = _query_to_kwargs(q, storage.SampleFilter.__init__)
         f = storage.SampleFilter(**kwargs)
-        return map(Sample.from_db_model,
-                   pecan.request.storage_conn.get_samples(f, limit=limit))
+        try:
+            samples = pecan.request.storage_conn.get_samples(
+                f, limit=limit, marker=marker)
+            return _paginate_listing(
+                Sample, (Sample.from_db_model(s) for s in samples),
+                limit, operator.attrgetter('id'))
+        except storage_base.NoResultFound:
+            raise ClientSideError(_("Unknown marker %s") % marker)
 
     @wsme_pecan.wsexpose(Sample, wtypes.text)
     def get_one(self, sample_id):
@@ -1244,6 +1367,9 @@ class ValidatedComplexQuery(object):
     order_directions = _list_to_regexp(order_directions, regexp_prefix)
 
     timestamp_fields = ["timestamp", "state_timestamp"]
+    # the fields tested first in a conjunction, being the most selective
+    # ones and indexed by the databases
+    leading_fields = timestamp_fields + ["counter_name"]
 
     def __init__(self, query, db_model, additional_name_mapping=None,
                  metadata_allowed=False):
@@ -1363,6 +1489,11 @@ class ValidatedComplexQuery(object):
 
         self._force_visibility(visibility_field)
 
+        if self.filter_expr is not None:
+            self.filter_expr = self._simplify(self.filter_expr)
+            LOG.debug(_("Normalised filter expression: %s"),
+                      self.filter_expr)
+
         if self.original_query.orderby is wtypes.Unset:
             self.orderby = None
         else:
@@ -1435,6 +1566,90 @@ class ValidatedComplexQuery(object):
         else:
             self.filter_expr = {"and": [restriction, self.filter_expr]}
 
+    @staticmethod
+    def _is_metadata_leaf(subfilter):
+        field = subfilter.values()[0].keys()[0]
+        return field.startswith("resource_metadata.")
+
+    def _leaf_rank(self, subfilter):
+        op = subfilter.keys()[0]
+        if op in self.complex_operators or op == "not":
+            return 3
+        if self._is_metadata_leaf(subfilter):
+            return 2
+        if subfilter[op].keys()[0] in self.leading_fields:
+            return 0
+        return 1
+
+    def _merge_in_lists(self, operands):
+        """Merge the equalities on the same field of a disjunction.
+
+        (a = 1 or a in [2, 3]) is (a in [1, 2, 3]). Metadata fields are left
+        alone, not every storage driver supporting the in operator on them.
+        """
+        merged = collections.OrderedDict()
+        for operand in operands:
+            op = operand.keys()[0]
+            if op in ("=", "in") and not self._is_metadata_leaf(operand):
+                field, value = operand[op].items()[0]
+                values = merged.setdefault(field, [])
+                for v in (value if op == "in" else [value]):
+                    if v not in values:
+                        values.append(v)
+            else:
+                merged[id(operand)] = operand
+        result = []
+        for field, values in merged.items():
+            if isinstance(values, dict):
+                result.append(values)
+            elif len(values) == 1:
+                result.append({"=": {field: values[0]}})
+            else:
+                result.append({"in": {field: values}})
+        return result
+
+    def _simplify(self, subfilter):
+        """Return the normalised form of a filter expression.
+
+        Nested and/or are flattened, double negations removed, equalities
+        on the same field of a disjunction merged into a single in, and
+        duplicates dropped. The operands of a conjunction are ordered so the
+        timestamp and meter predicates come first and the metadata ones,
+        each requiring a join in SQL, last.
+        """
+        op = subfilter.keys()[0]
+        if op == "not":
+            negated = self._simplify(subfilter[op])
+            if negated.keys()[0] == "not":
+                return negated["not"]
+            return {"not": negated}
+        if op == "in":
+            field, values = subfilter[op].items()[0]
+            if len(values) == 1 and not self._is_metadata_leaf(subfilter):
+                return {"=": {field: values[0]}}
+            return subfilter
+        if op not in self.complex_operators:
+            return subfilter
+
+        operands = []
+        for operand in (self._simplify(o) for o in subfilter[op]):
+            if operand.keys()[0] == op:
+                operands.extend(operand[op])
+            else:
+                operands.append(operand)
+        if op == "or":
+            operands = self._merge_in_lists(operands)
+        else:
+            operands.sort(key=self._leaf_rank)
+
+        unique = []
+        for operand in operands:
+            if operand not in unique:
+                unique.append(operand)
+        if len(unique) == 1:
+            return unique[0]
+        return {op: unique}
+
     def _replace_isotime_with_datetime(self, filter_expr):
         def replace_isotime(subfilter):
             op = subfilter.keys()[0]
@@ -1541,17 +1756,69 @@ class ResourcesController(rest.RestController):
     """Works on resources."""
 
     @staticmethod
-    def _resource_links(resource_id, meter_links=1):
+    def _resource_links(resource_id, meters):
         links = [_make_link('self', pecan.request.host_url, 'resources',
                             resource_id)]
-        if meter_links:
-            for meter in pecan.request.storage_conn.get_meters(
-                    resource=resource_id):
-                query = {'field': 'resource_id', 'value': resource_id}
-                links.append(_make_link(meter.name, pecan.request.host_url,
-                                        'meters', meter.name, query=query))
+        for meter in meters:
+            query = {'field': 'resource_id', 'value': resource_id}
+            links.append(_make_link(meter, pecan.request.host_url,
+                                    'meters', meter, query=query))
         return links
 
+    # the filters of the resources also applying to their meters
+    _meter_filters = ('user', 'project', 'source', 'metaquery', 'resource')
+
+    @classmethod
+    def _resources_meters(cls, **kwargs):
+        """Return the meter names of the resources, by resource id.
+
+        They are all read at once instead of resource by resource, with
+        the filters of the resources among the given ones.
+        """
+        kwargs = dict((k, v) for k, v in six.iteritems(kwargs)
+                      if k in cls._meter_filters)
+        meters = collections.defaultdict(list)
+        for meter in pecan.request.storage_conn.get_meters(**kwargs):
+            meters[meter.resource_id].append(meter.name)
+        return meters
+
+    # number of meters read per chunk for each resource of a page
+    _meters_chunk_size = 10
+
+    @classmethod
+    def _page_meters(cls, resources, **kwargs):
+        """Return the meter names of a page of resources, by resource id.
+
+        The meters being ordered by resource like the resources, they are
+        read by chunks from the first resource of the page until the meters
+        of its last resource are read, instead of resource by resource.
+        """
+        kwargs = dict((k, v) for k, v in six.iteritems(kwargs)
+                      if k in cls._meter_filters and k != 'resource')
+        resource_ids = set(r.resource_id for r in resources)
+        last_id = resources[-1].resource_id
+        limit = len(resources) * cls._meters_chunk_size
+        # the meter names being not empty, the meters of the first resource
+        # follow this marker
+        marker = (resources[0].resource_id, '')
+        meters = collections.defaultdict(list)
+        while marker:
+            chunk = list(pecan.request.storage_conn.get_meters(
+                pagination=storage_base.Pagination(
+                    limit=limit, primary_sort_dir='asc',
+                    marker_value=marker),
+                **kwargs))
+            marker = None
+            for meter in chunk:
+                if meter.resource_id in resource_ids:
+                    meters[meter.resource_id].append(meter.name)
+                elif last_id in meters:
+                    break
+            else:
+                if len(chunk) == limit:
+                    marker = (chunk[-1].resource_id, chunk[-1].name)
+        return meters
+
     @wsme_pecan.wsexpose(Resource, unicode)
     def get_one(self, resource_id):
         """Retrieve details about one resource.
@@ -1566,27 +1833,47 @@ class ResourcesController(rest.RestController):
             resource=resource_id, project=authorized_project))
         if not resources:
             raise EntityNotFound(_('Resource'), resource_id)
-        return Resource.from_db_and_links(resources[0],
-                                          self._resource_links(resource_id))
+        meters = self._resources_meters(resource=resource_id)
+        return Resource.from_db_and_links(
+            resources[0], self._resource_links(resource_id,
+                                               meters[resource_id]))
 
-    @wsme_pecan.wsexpose([Resource], [Query], int)
-    def get_all(self, q=None, meter_links=1):
+    @wsme_pecan.wsexpose([Resource], [Query], int, int, wtypes.text)
+    def get_all(self, q=None, meter_links=1, limit=None, marker=None):
         """Retrieve definitions of all of the resources.
 
         :param q: Filter rules for the resources to be returned.
         :param meter_links: option to include related meter links
+        :param limit: Maximum number of resources to return.
+        :param marker: The id of the last resource of the previous page, the
+                       resources following it are returned.
         """
 
         rbac.enforce('get_resources', pecan.request)
 
         q = q or []
+        if limit and limit < 0:
+            raise ClientSideError(_("Limit must be positive"))
         kwargs = _query_to_kwargs(q, pecan.request.storage_conn.get_resources)
-        resources = [
-            Resource.from_db_and_links(r,
-                                       self._resource_links(r.resource_id,
-                                                            meter_links))
-            for r in pecan.request.storage_conn.get_resources(**kwargs)]
-        return resources
+        if limit or marker:
+            kwargs['pagination'] = storage_base.Pagination(
+                limit=limit, primary_sort_dir='asc', marker_value=marker)
+        try:
+            resources = list(
+                pecan.request.storage_conn.get_resources(**kwargs))
+        except storage_base.NoResultFound:
+            raise ClientSideError(_("Unknown marker %s") % marker)
+        _link_next_page(resources, limit, operator.attrgetter('resource_id'))
+        meters = {}
+        if meter_links and resources and limit:
+            # only the meters of the resources of the page are read
+            meters = self._page_meters(resources, **kwargs)
+        elif meter_links and resources:
+            meters = self._resources_meters(**kwargs)
+        return [Resource.from_db_and_links(
+                r, self._resource_links(r.resource_id,
+                                        meters.get(r.resource_id, [])))
+                for r in resources]
 
 
 class AlarmThresholdRule(_Base):
@@ -2480,20 +2767,31 @@ class EventsController(rest.RestController):
     """Works on Events."""
 
     @requires_admin
-    @wsme_pecan.wsexpose([Event], [EventQuery])
-    def get_all(self, q=None):
-        """Return all events matching the query filters.
+    @wsme_pecan.wsexpose([Event], [EventQuery], int, wtypes.text)
+    def get_all(self, q=None, limit=None, marker=None):
+        """Return all events matching the query filters, in generated order.
 
         :param q: Filter arguments for which Events to return
+        :param limit: Maximum number of events to return.
+        :param marker: Message ID of the last event of the previous page, the
+                       events following it are returned.
         """
         q = q or []
+        if limit and limit < 0:
+            raise ClientSideError(_("Limit must be positive"))
         event_filter = _event_query_to_event_filter(q)
-        return [Event(message_id=event.message_id,
-                      event_type=event.event_type,
-                      generated=event.generated,
-                      traits=event.traits)
-                for event in
-                pecan.request.event_storage_conn.get_events(event_filter)]
+        try:
+            return _paginate_listing(
+                Event,
+                (Event(message_id=event.message_id,
+                       event_type=event.event_type,
+                       generated=event.generated,
+                       traits=event.traits)
+                 for event in pecan.request.event_storage_conn.get_events(
+                     event_filter, limit=limit, marker=marker)),
+                limit, operator.attrgetter('message_id'))
+        except storage_base.NoResultFound:
+            raise ClientSideError(_("Unknown marker %s") % marker)
 
     @requires_admin
     @wsme_pecan.wsexpose(Event, wtypes.text)
@@ -2627,7 +2925,7 @@ class Capabilities(_Base):
                            'query': {'simple': True,
                                      'metadata': True,
                                      'complex': False}},
-                'resources': {'pagination': False,
+                'resources': {'pagination': True,
                               'query': {'simple': True,
                                         'metadata': True,
                                         'complex': False}},
@@ -16,13 +16,22 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import collections
+import datetime
+import json
 import threading
 
 from oslo.config import cfg
+from oslo.utils import timeutils
 from pecan import hooks
+from wsme.rest import json as wsme_json
 
+from ceilometer.i18n import _
+from ceilometer.openstack.common import log
 from ceilometer import pipeline
 
+LOG = log.getLogger(__name__)
+
 
 class ConfigHook(hooks.PecanHook):
     """Attach the configuration object to the request.
@@ -48,6 +57,117 @@ class DBHook(hooks.PecanHook):
         state.request.alarm_storage_conn = self.alarm_storage_connection
 
 
+class StatisticsCache(object):
+    """A bounded cache of the statistics computed by the storage drivers.
+
+    The statistics of a time window ending before the settle time are not
+    expected to change any more and are kept until they are the least
+    recently used of the cache once full. The other ones, of a window still
+    receiving samples, are only kept for the tail TTL, if any.
+
+    :param size: Maximum number of cached results.
+    :param settle_time: Age in seconds from which the end of a window is
+                        considered settled.
+    :param tail_ttl: Time to live in seconds of the results of the windows
+                     not settled, 0 not to cache them.
+    :param report_interval: Interval in seconds at which the hits and misses
+                            of the cache are logged, 0 not to log them.
+    """
+
+    def __init__(self, size, settle_time, tail_ttl, report_interval=0):
+        self.size = size
+        self.settle_time = datetime.timedelta(seconds=settle_time)
+        self.tail_ttl = datetime.timedelta(seconds=tail_ttl)
+        self.report_interval = datetime.timedelta(seconds=report_interval)
+        self.hits = 0
+        self.misses = 0
+        self._reported = timeutils.utcnow()
+        self._results = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def hit_ratio(self):
+        lookups = self.hits + self.misses
+        return float(self.hits) / lookups if lookups else 0.0
+
+    def _expiry(self, end_timestamp):
+        """Return when a result expires, None if never, False if not cached.
+
+        :param end_timestamp: The end of the window of the result.
+        """
+        now = timeutils.utcnow()
+        if end_timestamp is not None and (end_timestamp <=
+                                          now - self.settle_time):
+            return None
+        if not self.tail_ttl:
+            return False
+        return now + self.tail_ttl
+
+    def _report(self):
+        """Log the hits and misses once per report interval."""
+        if not self.report_interval:
+            return
+        now = timeutils.utcnow()
+        with self._lock:
+            if now - self._reported < self.report_interval:
+                return
+            self._reported = now
+            hits, misses, cached = self.hits, self.misses, len(self._results)
+        LOG.info(_('statistics cache: %(hits)d hits, %(misses)d misses, '
+                   'hit ratio %(ratio).2f, %(cached)d cached results'),
+                 {'hits': hits, 'misses': misses, 'cached': cached,
+                  'ratio': float(hits) / (hits + misses)})
+
+    def get(self, key, end_timestamp, compute):
+        """Return the cached result of a key, or compute and cache it.
+
+        :param key: Hashable normalised statistics request.
+        :param end_timestamp: The end of the window of the request, None if
+                              open ended.
+        :param compute: Function computing the result when not cached.
+        """
+        with self._lock:
+            cached = self._results.pop(key, None)
+            if cached and (cached[0] is None or
+                           cached[0] > timeutils.utcnow()):
+                self._results[key] = cached
+                self.hits += 1
+            else:
+                cached = None
+                self.misses += 1
+        self._report()
+        if cached:
+            return cached[1]
+        result = compute()
+        expiry = self._expiry(end_timestamp)
+        if expiry is not False:
+            with self._lock:
+                self._results[key] = (expiry, result)
+                while len(self._results) > self.size:
+                    self._results.popitem(last=False)
+        return result
+
+
+class StatisticsCacheHook(hooks.PecanHook):
+    """Attach the statistics cache to the request.
+
+    It is shared by the requests to the API, whichever storage driver is
+    used. The cache is disabled when its size is 0.
+    """
+
+    def __init__(self):
+        self.cache = None
+        if cfg.CONF.api.statistics_cache_size:
+            self.cache = StatisticsCache(
+                cfg.CONF.api.statistics_cache_size,
+                cfg.CONF.api.statistics_cache_settle_time,
+                cfg.CONF.api.statistics_cache_tail_ttl,
+                cfg.CONF.api.statistics_cache_report_interval)
+
+    def before(self, state):
+        state.request.statistics_cache = self.cache
+
+
 class PipelineHook(hooks.PecanHook):
     """Create and attach a pipeline to the request.
 
@@ -79,3 +199,35 @@ class TranslationHook(hooks.PecanHook):
         if hasattr(state.response, 'translatable_error'):
             self.local_error.translatable_error = (
                 state.response.translatable_error)
+
+
+class StreamingHook(hooks.PecanHook):
+    """Send the listings streamed by the controllers as chunked JSON.
+
+    Instead of returning a listing, a controller can put its item type and
+    an iterable of its items in the request context under 'json_stream'.
+    The items are then encoded one by one as the response is sent, so the
+    listing is never held in memory as a whole.
+    """
+
+    def after(self, state):
+        stream = state.request.context.pop('json_stream', None)
+        if stream is None or state.response.status_int != 200:
+            return
+        datatype, values = stream
+        state.response.app_iter = self._encode(datatype, values)
+
+    @staticmethod
+    def _encode(datatype, values):
+        # same output as wsme.rest.json.encode_result for a list
+        yield '['
+        try:
+            for i, value in enumerate(values):
+                item = json.dumps(wsme_json.tojson(datatype, value))
+                yield item if i == 0 else ', ' + item
+        except Exception:
+            # the status has already been sent, leave the JSON document
+            # unterminated for the client to notice the failure
+            LOG.exception(_('Failed to stream the response'))
+            return
+        yield ']'
@@ -15,10 +15,11 @@
 # under the License.
 
 from ceilometer.api import app
+from ceilometer.openstack.common import service as os_service
 from ceilometer import service
 
 
 def main():
     service.prepare_service()
-    srv = app.build_server()
-    srv.serve_forever()
+    server = app.WSGIService()
+    os_service.launch(server, workers=server.workers).wait()
@@ -24,6 +24,10 @@ from ceilometer import storage
 
 cfg.CONF.import_opt('time_to_live', 'ceilometer.storage',
                     group='database')
+cfg.CONF.import_opt('expirer_batch_size', 'ceilometer.storage',
+                    group='database')
+cfg.CONF.import_opt('expirer_batch_pause', 'ceilometer.storage',
+                    group='database')
 
 LOG = logging.getLogger(__name__)
 
@@ -41,6 +45,8 @@ def expirer():
         LOG.debug(_("Clearing expired metering data"))
         storage_conn = storage.get_connection_from_config(cfg.CONF)
         storage_conn.clear_expired_metering_data(
-            cfg.CONF.database.time_to_live)
+            cfg.CONF.database.time_to_live,
+            cfg.CONF.database.expirer_batch_size,
+            cfg.CONF.database.expirer_batch_pause)
     else:
         LOG.info(_("Nothing to clean, database time to live is disabled"))
@@ -44,6 +44,7 @@ class CPUPollster(pollsters.BaseComputePollster):
                     type=sample.TYPE_CUMULATIVE,
                     unit='ns',
                     volume=cpu_info.time,
+                    cache=cache,
                     additional_metadata=cpu_num,
                 )
             except virt_inspector.InstanceNotFoundException as err:
@@ -76,6 +77,7 @@ class CPUUtilPollster(pollsters.BaseComputePollster):
                     type=sample.TYPE_GAUGE,
                     unit='%',
                     volume=cpu_info.util,
+                    cache=cache,
                 )
             except virt_inspector.InstanceNotFoundException as err:
                 # Instance was deleted while getting samples. Ignore it.
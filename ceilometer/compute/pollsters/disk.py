@@ -102,7 +102,7 @@ class _Base(pollsters.BaseComputePollster):
         return i_cache[instance.id]
 
     @abc.abstractmethod
-    def _get_samples(instance, c_data):
+    def _get_samples(instance, c_data, cache):
         """Return one or more Sample."""
 
     def get_samples(self, manager, cache, resources):
@@ -114,7 +114,7 @@ class _Base(pollsters.BaseComputePollster):
                     cache,
                     instance,
                 )
-                for s in self._get_samples(instance, c_data):
+                for s in self._get_samples(instance, c_data, cache):
                     yield s
             except virt_inspector.InstanceNotFoundException as err:
                 # Instance was deleted while getting samples. Ignore it.
@@ -138,13 +138,14 @@ class _Base(pollsters.BaseComputePollster):
 class ReadRequestsPollster(_Base):
 
     @staticmethod
-    def _get_samples(instance, c_data):
+    def _get_samples(instance, c_data, cache):
         return [util.make_sample_from_instance(
             instance,
             name='disk.read.requests',
             type=sample.TYPE_CUMULATIVE,
             unit='request',
             volume=c_data.r_requests,
+            cache=cache,
             additional_metadata={
                 'device': c_data.per_disk_requests['read_requests'].keys()}
         )]
@@ -153,7 +154,7 @@ class ReadRequestsPollster(_Base):
 class PerDeviceReadRequestsPollster(_Base):
 
     @staticmethod
-    def _get_samples(instance, c_data):
+    def _get_samples(instance, c_data, cache):
         samples = []
         for disk, value in six.iteritems(c_data.per_disk_requests[
                 'read_requests']):
@@ -163,6 +164,7 @@ class PerDeviceReadRequestsPollster(_Base):
                 type=sample.TYPE_CUMULATIVE,
                 unit='request',
                 volume=value,
+                cache=cache,
                 resource_id="%s-%s" % (instance.id, disk),
             ))
         return samples
@@ -171,13 +173,14 @@ class PerDeviceReadRequestsPollster(_Base):
 class ReadBytesPollster(_Base):
 
     @staticmethod
-    def _get_samples(instance, c_data):
+    def _get_samples(instance, c_data, cache):
         return [util.make_sample_from_instance(
             instance,
             name='disk.read.bytes',
             type=sample.TYPE_CUMULATIVE,
             unit='B',
             volume=c_data.r_bytes,
+            cache=cache,
             additional_metadata={
                 'device': c_data.per_disk_requests['read_bytes'].keys()},
         )]
@@ -186,7 +189,7 @@ class ReadBytesPollster(_Base):
 class PerDeviceReadBytesPollster(_Base):
 
     @staticmethod
-    def _get_samples(instance, c_data):
+    def _get_samples(instance, c_data, cache):
         samples = []
         for disk, value in six.iteritems(c_data.per_disk_requests[
                 'read_bytes']):
@@ -196,6 +199,7 @@ class PerDeviceReadBytesPollster(_Base):
                 type=sample.TYPE_CUMULATIVE,
                 unit='B',
                 volume=value,
+                cache=cache,
                 resource_id="%s-%s" % (instance.id, disk),
             ))
         return samples
@@ -204,13 +208,14 @@ class PerDeviceReadBytesPollster(_Base):
 class WriteRequestsPollster(_Base):
 
     @staticmethod
-    def _get_samples(instance, c_data):
+    def _get_samples(instance, c_data, cache):
         return [util.make_sample_from_instance(
             instance,
             name='disk.write.requests',
             type=sample.TYPE_CUMULATIVE,
             unit='request',
             volume=c_data.w_requests,
+            cache=cache,
             additional_metadata={
                 'device': c_data.per_disk_requests['write_requests'].keys()},
         )]
@@ -219,7 +224,7 @@ class WriteRequestsPollster(_Base):
 class PerDeviceWriteRequestsPollster(_Base):
 
     @staticmethod
-    def _get_samples(instance, c_data):
+    def _get_samples(instance, c_data, cache):
         samples = []
         for disk, value in six.iteritems(c_data.per_disk_requests[
                 'write_requests']):
@@ -229,6 +234,7 @@ class PerDeviceWriteRequestsPollster(_Base):
                 type=sample.TYPE_CUMULATIVE,
                 unit='request',
                 volume=value,
+                cache=cache,
                 resource_id="%s-%s" % (instance.id, disk),
             ))
         return samples
@@ -237,13 +243,14 @@ class PerDeviceWriteRequestsPollster(_Base):
 class WriteBytesPollster(_Base):
 
     @staticmethod
-    def _get_samples(instance, c_data):
+    def _get_samples(instance, c_data, cache):
         return [util.make_sample_from_instance(
             instance,
             name='disk.write.bytes',
             type=sample.TYPE_CUMULATIVE,
             unit='B',
             volume=c_data.w_bytes,
+            cache=cache,
             additional_metadata={
                 'device': c_data.per_disk_requests['write_bytes'].keys()},
         )]
@@ -252,7 +259,7 @@ class WriteBytesPollster(_Base):
 class PerDeviceWriteBytesPollster(_Base):
 
     @staticmethod
-    def _get_samples(instance, c_data):
+    def _get_samples(instance, c_data, cache):
         samples = []
         for disk, value in six.iteritems(c_data.per_disk_requests[
                 'write_bytes']):
@@ -262,6 +269,7 @@ class PerDeviceWriteBytesPollster(_Base):
                 type=sample.TYPE_CUMULATIVE,
                 unit='B',
                 volume=value,
+                cache=cache,
                 resource_id="%s-%s" % (instance.id, disk),
             ))
         return samples
@@ -312,7 +320,7 @@ class _DiskRatesPollsterBase(pollsters.BaseComputePollster):
         return i_cache[instance.id]
 
     @abc.abstractmethod
-    def _get_samples(self, instance, disk_rates_info):
+    def _get_samples(self, instance, disk_rates_info, cache):
         """Return one or more Sample."""
 
     def get_samples(self, manager, cache, resources):
@@ -324,7 +332,8 @@ class _DiskRatesPollsterBase(pollsters.BaseComputePollster):
                     cache,
                     instance,
                 )
-                for disk_rate in self._get_samples(instance, disk_rates_info):
+                for disk_rate in self._get_samples(instance,
+                                                   disk_rates_info, cache):
                     yield disk_rate
             except virt_inspector.InstanceNotFoundException as err:
                 # Instance was deleted while getting samples. Ignore it.
@@ -343,13 +352,14 @@ class _DiskRatesPollsterBase(pollsters.BaseComputePollster):
 
 class ReadBytesRatePollster(_DiskRatesPollsterBase):
 
-    def _get_samples(self, instance, disk_rates_info):
+    def _get_samples(self, instance, disk_rates_info, cache):
         return [util.make_sample_from_instance(
             instance,
             name='disk.read.bytes.rate',
             type=sample.TYPE_GAUGE,
             unit='B/s',
             volume=disk_rates_info.read_bytes_rate,
+            cache=cache,
             additional_metadata={
                 'device': disk_rates_info.per_disk_rate[
                     'read_bytes_rate'].keys()},
@@ -358,7 +368,7 @@ class ReadBytesRatePollster(_DiskRatesPollsterBase):
 
 class PerDeviceReadBytesRatePollster(_DiskRatesPollsterBase):
 
-    def _get_samples(self, instance, disk_rates_info):
+    def _get_samples(self, instance, disk_rates_info, cache):
         samples = []
         for disk, value in six.iteritems(disk_rates_info.per_disk_rate[
                 'read_bytes_rate']):
@@ -368,6 +378,7 @@ class PerDeviceReadBytesRatePollster(_DiskRatesPollsterBase):
                 type=sample.TYPE_GAUGE,
                 unit='B/s',
                 volume=value,
+                cache=cache,
                 resource_id="%s-%s" % (instance.id, disk),
             ))
         return samples
@@ -375,13 +386,14 @@ class PerDeviceReadBytesRatePollster(_DiskRatesPollsterBase):
 
 class ReadRequestsRatePollster(_DiskRatesPollsterBase):
 
-    def _get_samples(self, instance, disk_rates_info):
+    def _get_samples(self, instance, disk_rates_info, cache):
         return [util.make_sample_from_instance(
             instance,
             name='disk.read.requests.rate',
             type=sample.TYPE_GAUGE,
             unit='requests/s',
             volume=disk_rates_info.read_requests_rate,
+            cache=cache,
             additional_metadata={
                 'device': disk_rates_info.per_disk_rate[
                     'read_requests_rate'].keys()},
@@ -390,7 +402,7 @@ class ReadRequestsRatePollster(_DiskRatesPollsterBase):
 
 class PerDeviceReadRequestsRatePollster(_DiskRatesPollsterBase):
 
-    def _get_samples(self, instance, disk_rates_info):
+    def _get_samples(self, instance, disk_rates_info, cache):
         samples = []
         for disk, value in six.iteritems(disk_rates_info.per_disk_rate[
                 'read_requests_rate']):
@@ -400,6 +412,7 @@ class PerDeviceReadRequestsRatePollster(_DiskRatesPollsterBase):
                 type=sample.TYPE_GAUGE,
                 unit='requests/s',
                 volume=value,
+                cache=cache,
                 resource_id="%s-%s" % (instance.id, disk),
             ))
         return samples
@@ -407,13 +420,14 @@ class PerDeviceReadRequestsRatePollster(_DiskRatesPollsterBase):
 
 class WriteBytesRatePollster(_DiskRatesPollsterBase):
 
-    def _get_samples(self, instance, disk_rates_info):
+    def _get_samples(self, instance, disk_rates_info, cache):
         return [util.make_sample_from_instance(
             instance,
             name='disk.write.bytes.rate',
             type=sample.TYPE_GAUGE,
             unit='B/s',
             volume=disk_rates_info.write_bytes_rate,
+            cache=cache,
             additional_metadata={
                 'device': disk_rates_info.per_disk_rate[
                     'write_bytes_rate'].keys()},
@@ -422,7 +436,7 @@ class WriteBytesRatePollster(_DiskRatesPollsterBase):
 
 class PerDeviceWriteBytesRatePollster(_DiskRatesPollsterBase):
 
-    def _get_samples(self, instance, disk_rates_info):
+    def _get_samples(self, instance, disk_rates_info, cache):
         samples = []
         for disk, value in six.iteritems(disk_rates_info.per_disk_rate[
                 'write_bytes_rate']):
@@ -432,6 +446,7 @@ class PerDeviceWriteBytesRatePollster(_DiskRatesPollsterBase):
                 type=sample.TYPE_GAUGE,
                 unit='B/s',
                 volume=value,
+                cache=cache,
                 resource_id="%s-%s" % (instance.id, disk),
             ))
         return samples
@@ -439,13 +454,14 @@ class PerDeviceWriteBytesRatePollster(_DiskRatesPollsterBase):
 
 class WriteRequestsRatePollster(_DiskRatesPollsterBase):
 
-    def _get_samples(self, instance, disk_rates_info):
+    def _get_samples(self, instance, disk_rates_info, cache):
         return [util.make_sample_from_instance(
             instance,
             name='disk.write.requests.rate',
             type=sample.TYPE_GAUGE,
             unit='requests/s',
             volume=disk_rates_info.write_requests_rate,
+            cache=cache,
             additional_metadata={
                 'device': disk_rates_info.per_disk_rate[
                     'write_requests_rate'].keys()},
@@ -454,7 +470,7 @@ class WriteRequestsRatePollster(_DiskRatesPollsterBase):
 
 class PerDeviceWriteRequestsRatePollster(_DiskRatesPollsterBase):
 
-    def _get_samples(self, instance, disk_rates_info):
+    def _get_samples(self, instance, disk_rates_info, cache):
         samples = []
         for disk, value in six.iteritems(disk_rates_info.per_disk_rate[
                 'write_requests_rate']):
@@ -464,6 +480,7 @@ class PerDeviceWriteRequestsRatePollster(_DiskRatesPollsterBase):
                 type=sample.TYPE_GAUGE,
                 unit='requests/s',
                 volume=value,
+                cache=cache,
                 resource_id="%s-%s" % (instance.id, disk),
             ))
         return samples
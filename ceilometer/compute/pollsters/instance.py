@@ -33,6 +33,7 @@ class InstancePollster(pollsters.BaseComputePollster):
                 type=sample.TYPE_GAUGE,
                 unit='instance',
                 volume=1,
+                cache=cache,
             )
 
 
@@ -49,4 +50,5 @@ class InstanceFlavorPollster(pollsters.BaseComputePollster):
                 type=sample.TYPE_GAUGE,
                 unit='instance',
                 volume=1,
+                cache=cache,
             )
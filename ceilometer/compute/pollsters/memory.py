@@ -41,6 +41,7 @@ class MemoryUsagePollster(pollsters.BaseComputePollster):
                     type=sample.TYPE_GAUGE,
                     unit='MB',
                     volume=memory_info.usage,
+                    cache=cache,
                 )
             except virt_inspector.InstanceNotFoundException as err:
                 # Instance was deleted while getting samples. Ignore it.
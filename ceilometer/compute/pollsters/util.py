@@ -33,6 +33,8 @@ INSTANCE_PROPERTIES = [
     'ramdisk_id',
 ]
 
+CACHE_KEY_METADATA = 'instance-metadata'
+
 
 def _get_metadata_from_object(instance):
     """Return a metadata dictionary for the instance."""
@@ -74,11 +76,26 @@ def _get_metadata_from_object(instance):
     return compute_util.add_reserved_user_metadata(instance.metadata, metadata)
 
 
+def _get_cached_metadata(instance, cache):
+    """Return the metadata template of the instance for this interval.
+
+    The template is built once per instance and shared through the polling
+    cache by every compute pollster, so callers must not modify it.
+    """
+    if cache is None:
+        return _get_metadata_from_object(instance)
+    i_cache = cache.setdefault(CACHE_KEY_METADATA, {})
+    if instance.id not in i_cache:
+        i_cache[instance.id] = _get_metadata_from_object(instance)
+    return i_cache[instance.id]
+
+
 def make_sample_from_instance(instance, name, type, unit, volume,
-                              resource_id=None, additional_metadata=None):
-    additional_metadata = additional_metadata or {}
-    resource_metadata = _get_metadata_from_object(instance)
-    resource_metadata.update(additional_metadata)
+                              resource_id=None, additional_metadata=None,
+                              cache=None):
+    resource_metadata = _get_cached_metadata(instance, cache)
+    if additional_metadata:
+        resource_metadata = dict(resource_metadata, **additional_metadata)
     return sample.Sample(
         name=name,
         type=type,
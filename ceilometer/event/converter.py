@@ -15,8 +15,10 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import bisect
 import fnmatch
 import os
+import re
 
 import jsonpath_rw
 from oslo.config import cfg
@@ -44,6 +46,73 @@ cfg.CONF.register_opts(OPTS, group='event')
 
 LOG = log.getLogger(__name__)
 
+# maximum number of event types whose definition is memoised
+EVENT_TYPE_CACHE_SIZE = 1000
+# maximum number of named groups of a regex supported by python 2
+_MAX_REGEX_GROUPS = 99
+
+
+# a JSONPath made of plain field names, e.g. payload.instance_id
+_DOTTED_PATH = re.compile(r'^[A-Za-z_]\w*(\.[A-Za-z_]\w*)*$')
+# names the JSONPath parser does not read as field names
+_JSONPATH_KEYWORDS = frozenset(['where'])
+
+
+def _is_wildcard(event_type):
+    return any(c in event_type for c in '*?[')
+
+
+def _glob_to_regex(pattern):
+    """Translate a glob to a regex usable as an alternative of a regex."""
+    regex = fnmatch.translate(pattern)
+    # the inline flags of some python versions must not be repeated
+    if regex.endswith('\\Z(?ms)'):
+        regex = regex[:-len('(?ms)')]
+    return regex
+
+
+def _dotted_paths(fields):
+    """Split the fields into tuples of keys, None if JSONPath is needed."""
+    paths = []
+    for field in fields:
+        if not _DOTTED_PATH.match(field):
+            return None
+        path = tuple(field.split('.'))
+        if _JSONPATH_KEYWORDS.intersection(path):
+            return None
+        paths.append(path)
+    return paths
+
+
+def _paths_tree(paths):
+    """Merge paths in a tree, the shared prefixes being walked once."""
+    tree = {}
+    for path in paths:
+        node = tree
+        for key in path:
+            node = node.setdefault(key, {})
+    return tree
+
+
+def _walk(data, tree, prefix=(), values=None):
+    """Return the values found at the paths of the tree, by path.
+
+    A key is looked up like JSONPath does, so a value can be extracted
+    from any object supporting the [] operator.
+    """
+    if values is None:
+        values = {}
+    for key, subtree in six.iteritems(tree):
+        try:
+            value = data[key]
+        except (TypeError, KeyError, AttributeError):
+            continue
+        path = prefix + (key,)
+        values[path] = value
+        if subtree:
+            _walk(value, subtree, path, values)
+    return values
+
 
 class EventDefinitionException(Exception):
     def __init__(self, message, definition_cfg):
@@ -97,41 +166,71 @@ class TraitDefinition(object):
                 self.cfg)
 
         fields = trait_cfg['fields']
-        if not isinstance(fields, six.string_types):
-            # NOTE(mdragon): if not a string, we assume a list.
-            if len(fields) == 1:
-                fields = fields[0]
-            else:
-                fields = '|'.join('(%s)' % path for path in fields)
-        try:
-            self.fields = jsonpath_rw.parse(fields)
-        except Exception as e:
-            raise EventDefinitionException(
-                _("Parse error in JSONPath specification "
-                  "'%(jsonpath)s' for %(trait)s: %(err)s")
-                % dict(jsonpath=fields, trait=name, err=e), self.cfg)
+        if isinstance(fields, six.string_types):
+            fields = [fields]
+        # plain dotted paths are read with lookups, without JSONPath
+        self.paths = _dotted_paths(fields)
+        if len(fields) == 1:
+            self._jsonpath = fields[0]
+        else:
+            self._jsonpath = '|'.join('(%s)' % path for path in fields)
+        self._fields = None
+        if self.paths is None:
+            try:
+                self._fields = jsonpath_rw.parse(self._jsonpath)
+            except Exception as e:
+                raise EventDefinitionException(
+                    _("Parse error in JSONPath specification "
+                      "'%(jsonpath)s' for %(trait)s: %(err)s")
+                    % dict(jsonpath=self._jsonpath, trait=name, err=e),
+                    self.cfg)
+        else:
+            self._paths_tree = _paths_tree(self.paths)
         self.trait_type = models.Trait.get_type_by_name(type_name)
         if self.trait_type is None:
             raise EventDefinitionException(
                 _("Invalid trait type '%(type)s' for trait %(trait)s")
                 % dict(type=type_name, trait=name), self.cfg)
 
+    @property
+    def fields(self):
+        """The JSONPath of the fields, parsed on demand for dotted paths."""
+        if self._fields is None:
+            self._fields = jsonpath_rw.parse(self._jsonpath)
+        return self._fields
+
     def _get_path(self, match):
         if match.context is not None:
             for path_element in self._get_path(match.context):
                 yield path_element
             yield str(match.path)
 
-    def to_trait(self, notification_body):
-        values = [match for match in self.fields.find(notification_body)
-                  if match.value is not None]
-
-        if self.plugin is not None:
-            value_map = [('.'.join(self._get_path(match)), match.value) for
-                         match in values]
-            value = self.plugin.trait_value(value_map)
+    def to_trait(self, notification_body, values=None):
+        """Extract the trait from a notification.
+
+        :param notification_body: the notification.
+        :param values: optional values already extracted from the
+                       notification by path, including the paths of
+                       this trait.
+        """
+        if self.paths is None:
+            matches = [match for match in self.fields.find(notification_body)
+                       if match.value is not None]
+            if self.plugin is not None:
+                value_map = [('.'.join(self._get_path(match)), match.value)
+                             for match in matches]
+                value = self.plugin.trait_value(value_map)
+            else:
+                value = matches[0].value if matches else None
         else:
-            value = values[0].value if values else None
+            if values is None:
+                values = _walk(notification_body, self._paths_tree)
+            value_map = [('.'.join(path), values[path]) for path in self.paths
+                         if values.get(path) is not None]
+            if self.plugin is not None:
+                value = self.plugin.trait_value(value_map)
+            else:
+                value = value_map[0][1] if value_map else None
 
         if value is None:
             return None
@@ -178,6 +277,9 @@ class EventDefinition(object):
 
         if self._excluded_types and not self._included_types:
             self._included_types.append('*')
+        # compiled once, as fnmatch only caches a hundred patterns
+        self._included_regex = self._compile(self._included_types)
+        self._excluded_regex = self._compile(self._excluded_types)
 
         for trait_name in self.DEFAULT_TRAITS:
             self.traits[trait_name] = TraitDefinition(
@@ -189,18 +291,29 @@ class EventDefinition(object):
                 trait_name,
                 traits[trait_name],
                 trait_plugin_mgr)
+        # the dotted paths of all the traits, to walk each notification once
+        self._paths_tree = _paths_tree(
+            path for trait in self.traits.values() if trait.paths
+            for path in trait.paths)
+
+    @property
+    def included_types(self):
+        return list(self._included_types)
+
+    @staticmethod
+    def _compile(patterns):
+        if not patterns:
+            return None
+        return re.compile('|'.join(_glob_to_regex(t) for t in patterns),
+                          re.S)
 
     def included_type(self, event_type):
-        for t in self._included_types:
-            if fnmatch.fnmatch(event_type, t):
-                return True
-        return False
+        return bool(self._included_regex and
+                    self._included_regex.match(event_type))
 
     def excluded_type(self, event_type):
-        for t in self._excluded_types:
-            if fnmatch.fnmatch(event_type, t):
-                return True
-        return False
+        return bool(self._excluded_regex and
+                    self._excluded_regex.match(event_type))
 
     def match_type(self, event_type):
         return (self.included_type(event_type)
@@ -230,7 +343,8 @@ class EventDefinition(object):
         message_id = notification_body['message_id']
         when = self._extract_when(notification_body)
 
-        traits = (self.traits[t].to_trait(notification_body)
+        values = _walk(notification_body, self._paths_tree)
+        traits = (self.traits[t].to_trait(notification_body, values)
                   for t in self.traits)
         # Only accept non-None value traits ...
         traits = [trait for trait in traits if trait is not None]
@@ -329,15 +443,68 @@ class NotificationEventsConverter(object):
             event_def = dict(event_type='*', traits={})
             self.definitions.append(EventDefinition(event_def,
                                                     trait_plugin_mgr))
+        self._build_index()
+
+    def _build_index(self):
+        """Index the definitions by the event types they include.
+
+        The positions of the definitions including an event type
+        literally are kept by event type, while the wildcarded event types
+        are combined in regexes, one named group per definition.
+        """
+        self._literal_types = {}
+        wildcards = []
+        for i, d in enumerate(self.definitions):
+            patterns = []
+            for t in d.included_types:
+                if _is_wildcard(t):
+                    patterns.append(_glob_to_regex(t))
+                else:
+                    self._literal_types.setdefault(t, []).append(i)
+            if patterns:
+                wildcards.append('(?P<d%d>%s)' % (i, '|'.join(patterns)))
+        self._wildcard_types = [
+            re.compile('|'.join(wildcards[i:i + _MAX_REGEX_GROUPS]), re.S)
+            for i in six.moves.range(0, len(wildcards), _MAX_REGEX_GROUPS)]
+        self._definitions_cache = {}
+
+    def _get_event_definition(self, event_type):
+        """Return the first definition matching the event type, if any."""
+        try:
+            return self._definitions_cache[event_type]
+        except KeyError:
+            pass
+
+        # the first definition with a wildcard matching the event type
+        first_wildcard = len(self.definitions)
+        for regex in self._wildcard_types:
+            match = regex.match(event_type)
+            if match:
+                first_wildcard = int(match.lastgroup[1:])
+                break
+        edef = None
+        literals = self._literal_types.get(event_type, [])
+        for i in literals[:bisect.bisect_left(literals, first_wildcard)]:
+            if self.definitions[i].match_type(event_type):
+                edef = self.definitions[i]
+                break
+        else:
+            # the definitions from the first with a wildcard matching are
+            # checked in turn, as they may exclude the event type
+            for d in self.definitions[first_wildcard:]:
+                if d.match_type(event_type):
+                    edef = d
+                    break
+
+        if len(self._definitions_cache) >= EVENT_TYPE_CACHE_SIZE:
+            self._definitions_cache.clear()
+        self._definitions_cache[event_type] = edef
+        return edef
 
     def to_event(self, notification_body):
         event_type = notification_body['event_type']
         message_id = notification_body['message_id']
-        edef = None
-        for d in self.definitions:
-            if d.match_type(event_type):
-                edef = d
-                break
+        edef = self._get_event_definition(event_type)
 
         if edef is None:
             msg = (_('Dropping Notification %(type)s (uuid:%(msgid)s)')
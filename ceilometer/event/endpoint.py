@@ -17,6 +17,7 @@
 
 import logging
 
+import eventlet
 from oslo.config import cfg
 import oslo.messaging
 from stevedore import extension
@@ -39,6 +40,10 @@ class EventsNotificationEndpoint(object):
         self.event_converter = event_converter.setup_events(
             extension.ExtensionManager(
                 namespace='ceilometer.event.trait_plugin'))
+        # the converted events waiting to be recorded, with the eventlet
+        # events their notifications wait on for the result
+        self._batch = []
+        self._batch_full = None
 
     def info(self, ctxt, publisher_id, event_type, payload, metadata):
         """Convert message to Ceilometer Event.
@@ -58,19 +63,64 @@ class EventsNotificationEndpoint(object):
         self.process_notification(notification)
 
     def process_notification(self, notification):
+        """Convert the notification and record its event.
+
+        The events of the notifications processed concurrently by the
+        executor are recorded together: the first one waits for the batch
+        to be full, or for the batch timeout, and records it, the others
+        wait for their own result. The notification is requeued if its
+        event could not be recorded.
+        """
         event = self.event_converter.to_event(notification)
+        if event is None:
+            return oslo.messaging.NotificationResult.HANDLED
+
+        LOG.debug(_('Saving event "%s"'), event.event_type)
+        recorded = eventlet.event.Event()
+        leader = not self._batch
+        if leader:
+            self._batch_full = eventlet.event.Event()
+        batch, batch_full = self._batch, self._batch_full
+        batch.append((event, recorded))
+        if len(batch) >= cfg.CONF.notification.event_batch_size:
+            # the next notifications start a new batch
+            self._batch = []
+            batch_full.send()
 
-        if event is not None:
-            LOG.debug(_('Saving event "%s"'), event.event_type)
-            problem_events = []
+        if leader:
+            with eventlet.Timeout(cfg.CONF.notification.event_batch_timeout,
+                                  False):
+                batch_full.wait()
+            if self._batch is batch:
+                self._batch = []
+            self._record_events(batch)
+
+        if models.Event.UNKNOWN_PROBLEM in recorded.wait():
+            if not cfg.CONF.notification.ack_on_event_error:
+                return oslo.messaging.NotificationResult.REQUEUE
+        return oslo.messaging.NotificationResult.HANDLED
+
+    def _record_events(self, batch):
+        """Record the events with each dispatcher and wake up their waiters.
+
+        :param batch: list of (event, eventlet event) tuples.
+        """
+        events = [event for event, recorded in batch]
+        problems = dict((id(event), set()) for event in events)
+        try:
             for dispatcher_ext in self.dispatcher_manager:
                 try:
-                    problem_events.extend(
-                        dispatcher_ext.obj.record_events(event))
+                    problem_events = dispatcher_ext.obj.record_events(events)
                 except ceilometer.NotImplementedError:
                     LOG.warn(_('Event is not implemented with the storage'
                                ' backend'))
-            if models.Event.UNKNOWN_PROBLEM in [x[0] for x in problem_events]:
-                if not cfg.CONF.notification.ack_on_event_error:
-                    return oslo.messaging.NotificationResult.REQUEUE
-        return oslo.messaging.NotificationResult.HANDLED
+                    continue
+                for reason, event in problem_events or []:
+                    if id(event) in problems:
+                        problems[id(event)].add(reason)
+        except Exception as e:
+            for event, recorded in batch:
+                recorded.send_exception(e)
+            raise
+        for event, recorded in batch:
+            recorded.send(problems[id(event)])
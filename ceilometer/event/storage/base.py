@@ -45,8 +45,14 @@ class Connection(object):
         raise ceilometer.NotImplementedError('Events not implemented.')
 
     @staticmethod
-    def get_events(event_filter):
-        """Return an iterable of model.Event objects."""
+    def get_events(event_filter, limit=None, marker=None):
+        """Return an iterable of model.Event objects, in generated order.
+
+        :param event_filter: EventFilter instance
+        :param limit: maximum number of events to return.
+        :param marker: message id of the last event of the previous page,
+                       only the events following it are returned.
+        """
         raise ceilometer.NotImplementedError('Events not implemented.')
 
     @staticmethod
@@ -17,6 +17,7 @@ from ceilometer.event.storage import base
 from ceilometer.event.storage import models
 from ceilometer.i18n import _
 from ceilometer.openstack.common import log
+from ceilometer.storage import base as storage_base
 from ceilometer.storage.hbase import base as hbase_base
 from ceilometer.storage.hbase import utils as hbase_utils
 from ceilometer import utils
@@ -125,18 +126,32 @@ class Connection(hbase_base.Connection, base.Connection):
                                            event_model))
         return problem_events
 
-    def get_events(self, event_filter):
-        """Return an iter of models.Event objects.
+    def get_events(self, event_filter, limit=None, marker=None):
+        """Return an iter of models.Event objects, in generated order.
 
         :param event_filter: storage.EventFilter object, consists of filters
           for events that are stored in database.
+        :param limit: maximum number of events to return.
+        :param marker: message id of the last event of the previous page,
+          only the events following it are returned.
         """
         q, start, stop = hbase_utils.make_events_query_from_filter(
             event_filter)
         with self.conn_pool.connection() as conn:
             events_table = conn.table(self.EVENT_TABLE)
 
-            gen = events_table.scan(filter=q, row_start=start, row_stop=stop)
+            if marker:
+                rows = list(events_table.scan(
+                    filter=hbase_utils.make_query(event_id=marker),
+                    limit=1))
+                if not rows:
+                    raise storage_base.NoResultFound(marker)
+                # the rows are sorted by generation time, the next page
+                # starts right after the row of the marker
+                start = max(start, rows[0][0] + '\x00')
+
+            gen = events_table.scan(filter=q, row_start=start, row_stop=stop,
+                                    limit=limit)
 
         for event_id, data in gen:
             traits = []
@@ -46,6 +46,12 @@ class Connection(pymongo_base.Connection):
         # needed.
         self.upgrade()
 
+    def upgrade(self):
+        # the events are listed and paginated in generated order
+        self.db.event.ensure_index([('timestamp', pymongo.ASCENDING),
+                                    ('_id', pymongo.ASCENDING)],
+                                   name='event_timestamp_idx')
+
     def clear(self):
         self.conn.drop_database(self.db.name)
         # Connection will be reopened automatically if needed
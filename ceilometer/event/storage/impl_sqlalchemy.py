@@ -14,6 +14,7 @@
 """SQLAlchemy storage backend."""
 
 from __future__ import absolute_import
+import itertools
 import operator
 import os
 
@@ -27,6 +28,7 @@ from ceilometer.event.storage import base
 from ceilometer.event.storage import models as api_models
 from ceilometer.i18n import _
 from ceilometer.openstack.common import log
+from ceilometer.storage import base as storage_base
 from ceilometer.storage.sqlalchemy import models
 from ceilometer.storage.sqlalchemy import utils as sql_utils
 from ceilometer import utils
@@ -43,6 +45,19 @@ AVAILABLE_STORAGE_CAPABILITIES = {
     'storage': {'production_ready': True},
 }
 
+# rows per multi-row INSERT or IN clause, keeping the trait inserts under
+# the 999 bound parameters allowed by SQLite
+_CHUNK_SIZE = 100
+
+
+# events read by each query of a listing
+_READ_CHUNK_SIZE = 100
+
+
+def _chunks(items, size=_CHUNK_SIZE):
+    for i in six.moves.range(0, len(items), size):
+        yield items[i:i + size]
+
 
 class Connection(base.Connection):
     """Put the event data into a SQLAlchemy database.
@@ -89,6 +104,10 @@ class Connection(base.Connection):
             url,
             **dict(cfg.CONF.database.items())
         )
+        # ids of the event types by name, and of the trait types by
+        # (name, data type), they are never deleted once created
+        self._event_type_ids = {}
+        self._trait_type_ids = {}
 
     def upgrade(self):
         # NOTE(gordc): to minimise memory, only import migration when needed
@@ -104,6 +123,8 @@ class Connection(base.Connection):
             engine.execute(table.delete())
         self._engine_facade._session_maker.close_all()
         engine.dispose()
+        self._event_type_ids = {}
+        self._trait_type_ids = {}
 
     def _get_or_create_trait_type(self, trait_type, data_type, session=None):
         """Find if this trait already exists in the database.
@@ -172,6 +193,126 @@ class Connection(base.Connection):
         # does it). Otherwise, just wait until all the Events are staged.
         return event, new_traits
 
+    def _create_type(self, type_, query):
+        """Insert a new event or trait type and return its id.
+
+        The type may be created at the same time by another collector, in
+        which case the id of the existing row is returned.
+        """
+        session = self._engine_facade.get_session()
+        try:
+            with session.begin():
+                session.add(type_)
+            return type_.id
+        except dbexc.DBDuplicateEntry:
+            with session.begin():
+                return query(session).one().id
+
+    def _get_event_type_ids(self, names):
+        """Return the ids of the event types, creating the missing ones."""
+        missing = sorted(set(names) - set(self._event_type_ids))
+        if missing:
+            session = self._engine_facade.get_session()
+            with session.begin():
+                for chunk in _chunks(missing):
+                    self._event_type_ids.update(
+                        session.query(models.EventType.desc,
+                                      models.EventType.id).
+                        filter(models.EventType.desc.in_(chunk)))
+        for name in missing:
+            if name not in self._event_type_ids:
+                self._event_type_ids[name] = self._create_type(
+                    models.EventType(name),
+                    lambda s, name=name: s.query(models.EventType).filter(
+                        models.EventType.desc == name))
+        return self._event_type_ids
+
+    def _get_trait_type_ids(self, keys):
+        """Return the ids of the (name, data type) trait types.
+
+        The missing trait types are created.
+        """
+        missing = set(keys) - set(self._trait_type_ids)
+        if missing:
+            session = self._engine_facade.get_session()
+            names = sorted(set(name for name, dtype in missing))
+            with session.begin():
+                for chunk in _chunks(names):
+                    query = (session.query(models.TraitType.desc,
+                                           models.TraitType.data_type,
+                                           models.TraitType.id).
+                             filter(models.TraitType.desc.in_(chunk)))
+                    for name, dtype, id_ in query:
+                        self._trait_type_ids[(name, dtype)] = id_
+        for name, dtype in sorted(missing):
+            if (name, dtype) not in self._trait_type_ids:
+                self._trait_type_ids[(name, dtype)] = self._create_type(
+                    models.TraitType(name, dtype),
+                    lambda s, name=name, dtype=dtype: s.query(
+                        models.TraitType).filter(
+                            models.TraitType.desc == name,
+                            models.TraitType.data_type == dtype))
+        return self._trait_type_ids
+
+    def _insert_events(self, event_models):
+        """Store the events and their traits in a single transaction.
+
+        The events and the traits are written with multi-row inserts, the
+        events whose message id is already stored, or repeated in the
+        batch, are skipped and returned.
+        """
+        session = self._engine_facade.get_session()
+        message_ids = set()
+        with session.begin():
+            for chunk in _chunks([e.message_id for e in event_models]):
+                message_ids.update(
+                    m for m, in session.query(models.Event.message_id).
+                    filter(models.Event.message_id.in_(chunk)))
+        new_events = []
+        duplicates = []
+        for event_model in event_models:
+            if event_model.message_id in message_ids:
+                duplicates.append(event_model)
+            else:
+                message_ids.add(event_model.message_id)
+                new_events.append(event_model)
+
+        event_type_ids = self._get_event_type_ids(
+            [e.event_type for e in new_events])
+        trait_type_ids = self._get_trait_type_ids(
+            [(t.name, t.dtype) for e in new_events for t in e.traits or []])
+
+        # an event stored concurrently since the check fails the whole
+        # transaction, record_events() then finds it one by one
+        with session.begin():
+            events = models.Event.__table__
+            for chunk in _chunks(new_events):
+                session.execute(events.insert().values([
+                    {'message_id': e.message_id,
+                     'event_type_id': event_type_ids[e.event_type],
+                     'generated': e.generated} for e in chunk]))
+
+            event_ids = {}
+            for chunk in _chunks([e.message_id for e in new_events]):
+                event_ids.update(
+                    session.query(models.Event.message_id, models.Event.id).
+                    filter(models.Event.message_id.in_(chunk)))
+
+            value_map = models.Trait._value_map
+            traits = []
+            for event_model in new_events:
+                for trait in event_model.traits or []:
+                    row = {'event_id': event_ids[event_model.message_id],
+                           'trait_type_id': trait_type_ids[(trait.name,
+                                                            trait.dtype)],
+                           't_string': None, 't_float': None,
+                           't_int': None, 't_datetime': None}
+                    row[value_map[trait.dtype]] = trait.value
+                    traits.append(row)
+            for chunk in _chunks(traits):
+                session.execute(models.Trait.__table__.insert().values(chunk))
+        return duplicates
+
     def record_events(self, event_models):
         """Write the events to SQL database via sqlalchemy.
 
@@ -181,17 +322,30 @@ class Connection(base.Connection):
         (reason, event) tuple. Reasons are enumerated in
         storage.model.Event
 
-        Flush when they're all added, unless new EventTypes or
-        TraitTypes are added along the way.
+        The events are written in bulk, if that fails they are written
+        again one by one, to find the ones causing the failure.
         """
+        try:
+            duplicates = self._insert_events(event_models)
+        except Exception as e:
+            LOG.warn(_('Failed to record events in bulk, recording them '
+                       'one by one: %s') % e)
+            # do not trust the cached type ids on the way back
+            self._event_type_ids = {}
+            self._trait_type_ids = {}
+        else:
+            for event_model in duplicates:
+                LOG.warn(_("Failed to record duplicated event: %s") %
+                         event_model.message_id)
+            return [(api_models.Event.DUPLICATE, event_model)
+                    for event_model in duplicates]
+
         session = self._engine_facade.get_session()
-        events = []
         problem_events = []
         for event_model in event_models:
-            event = None
             try:
                 with session.begin():
-                    event = self._record_event(session, event_model)
+                    self._record_event(session, event_model)
             except dbexc.DBDuplicateEntry as e:
                 LOG.exception(_("Failed to record duplicated event: %s") % e)
                 problem_events.append((api_models.Event.DUPLICATE,
@@ -200,13 +354,21 @@ class Connection(base.Connection):
                 LOG.exception(_('Failed to record event: %s') % e)
                 problem_events.append((api_models.Event.UNKNOWN_PROBLEM,
                                        event_model))
-            events.append(event)
         return problem_events
 
-    def get_events(self, event_filter):
-        """Return an iterable of model.Event objects.
+    def get_events(self, event_filter, limit=None, marker=None):
+        """Return an iterable of model.Event objects, in generated order.
+
+        The events and their traits are read by chunks of events, with a
+        query per chunk starting after the last event of the previous chunk,
+        the rows of each event following each other. Only a chunk of rows is
+        then held in memory as the events are consumed, whereas most DBAPIs,
+        MySQLdb included, buffer the whole result of a query.
 
         :param event_filter: EventFilter instance
+        :param limit: maximum number of events to return.
+        :param marker: message id of the last event of the previous page,
+                       only the events following it are returned.
         """
 
         start = event_filter.start_timestamp
@@ -214,18 +376,16 @@ class Connection(base.Connection):
         session = self._engine_facade.get_session()
         LOG.debug(_("Getting events that match filter: %s") % event_filter)
         with session.begin():
-            event_query = session.query(models.Event)
-
-            # Build up the join conditions
-            event_join_conditions = [models.EventType.id ==
-                                     models.Event.event_type_id]
+            event_query = session.query(models.Event.id,
+                                        models.Event.generated)
 
             if event_filter.event_type:
-                event_join_conditions.append(models.EventType.desc ==
-                                             event_filter.event_type)
-
-            event_query = event_query.join(models.EventType,
-                                           sa.and_(*event_join_conditions))
+                event_query = event_query.join(
+                    models.EventType,
+                    sa.and_(models.EventType.id ==
+                            models.Event.event_type_id,
+                            models.EventType.desc ==
+                            event_filter.event_type))
 
             # Build up the where conditions
             event_filter_conditions = []
@@ -236,74 +396,105 @@ class Connection(base.Connection):
                 event_filter_conditions.append(models.Event.generated >= start)
             if end:
                 event_filter_conditions.append(models.Event.generated <= end)
+            last = None
+            if marker:
+                last = (session.query(models.Event.generated,
+                                      models.Event.id).
+                        filter(models.Event.message_id == marker).first())
+                if last is None:
+                    raise storage_base.NoResultFound(marker)
 
             if event_filter_conditions:
                 event_query = (event_query.
                                filter(sa.and_(*event_filter_conditions)))
 
-            event_models_dict = {}
-            if event_filter.traits_filter:
-                for trait_filter in event_filter.traits_filter:
-
-                    # Build a sub query that joins Trait to TraitType
-                    # where the trait name matches
-                    trait_name = trait_filter.pop('key')
-                    op = trait_filter.pop('op', 'eq')
-                    conditions = [models.Trait.trait_type_id ==
-                                  models.TraitType.id,
-                                  models.TraitType.desc == trait_name]
-
-                    for key, value in six.iteritems(trait_filter):
-                        sql_utils.trait_op_condition(conditions,
-                                                     key, value, op)
-
-                    trait_query = (session.query(models.Trait.event_id).
-                                   join(models.TraitType,
-                                        sa.and_(*conditions)).subquery())
-
-                    event_query = (event_query.
-                                   join(trait_query, models.Event.id ==
-                                        trait_query.c.event_id))
-            else:
-                # If there are no trait filters, grab the events from the db
-                query = (session.query(models.Event.id,
-                                       models.Event.generated,
-                                       models.Event.message_id,
-                                       models.EventType.desc).
-                         join(models.EventType,
-                              sa.and_(*event_join_conditions)))
-                if event_filter_conditions:
-                    query = query.filter(sa.and_(*event_filter_conditions))
-                for (id_, generated, message_id, desc_) in query.all():
-                    event_models_dict[id_] = api_models.Event(message_id,
-                                                              desc_,
-                                                              generated,
-                                                              [])
-
-            # Build event models for the events
-            event_query = event_query.subquery()
-            query = (session.query(models.Trait).
-                     join(models.TraitType, models.Trait.trait_type_id ==
-                          models.TraitType.id).
-                     join(event_query, models.Trait.event_id ==
-                          event_query.c.id))
-
-            # Now convert the sqlalchemy objects back into Models ...
-            for trait in query.all():
-                event = event_models_dict.get(trait.event_id)
-                if not event:
-                    event = api_models.Event(
-                        trait.event.message_id,
-                        trait.event.event_type.desc,
-                        trait.event.generated, [])
-                    event_models_dict[trait.event_id] = event
-                trait_model = api_models.Trait(trait.trait_type.desc,
-                                               trait.trait_type.data_type,
-                                               trait.get_value())
-                event.append_trait(trait_model)
-
-        event_models = event_models_dict.values()
-        return sorted(event_models, key=operator.attrgetter('generated'))
+            for trait_filter in event_filter.traits_filter:
+
+                # Build a sub query that joins Trait to TraitType
+                # where the trait name matches
+                trait_name = trait_filter.pop('key')
+                op = trait_filter.pop('op', 'eq')
+                conditions = [models.Trait.trait_type_id ==
+                              models.TraitType.id,
+                              models.TraitType.desc == trait_name]
+
+                for key, value in six.iteritems(trait_filter):
+                    sql_utils.trait_op_condition(conditions,
+                                                 key, value, op)
+
+                trait_query = (session.query(models.Trait.event_id).
+                               join(models.TraitType,
+                                    sa.and_(*conditions)).subquery())
+
+                event_query = (event_query.
+                               join(trait_query, models.Event.id ==
+                                    trait_query.c.event_id))
+
+            event_query = event_query.order_by(models.Event.generated,
+                                               models.Event.id)
+            while True:
+                size = (min(_READ_CHUNK_SIZE, limit) if limit
+                        else _READ_CHUNK_SIZE)
+                chunk_query = event_query
+                if last:
+                    chunk_query = chunk_query.filter(
+                        sql_utils.keyset_criterion(
+                            [models.Event.generated, models.Event.id],
+                            last))
+                events = list(self._retrieve_events(
+                    session, chunk_query.limit(size).subquery()))
+                for event in events:
+                    yield event[1]
+                if len(events) < size:
+                    return
+                if limit:
+                    limit -= len(events)
+                    if not limit:
+                        return
+                last = events[-1][0]
+
+    @staticmethod
+    def _retrieve_events(session, event_query):
+        """Read the events of a query with their type and traits.
+
+        Return the ((generated, id), Event) pairs of the events.
+        """
+        # Join the events with their type and traits
+        query = (session.query(event_query.c.id,
+                               models.Event.message_id,
+                               models.Event.generated,
+                               models.EventType.desc,
+                               models.TraitType.desc,
+                               models.TraitType.data_type,
+                               models.Trait.t_string,
+                               models.Trait.t_float,
+                               models.Trait.t_int,
+                               models.Trait.t_datetime).
+                 join(models.Event,
+                      models.Event.id == event_query.c.id).
+                 join(models.EventType,
+                      models.EventType.id == models.Event.event_type_id).
+                 outerjoin(models.Trait,
+                           models.Trait.event_id == event_query.c.id).
+                 outerjoin(models.TraitType,
+                           models.TraitType.id ==
+                           models.Trait.trait_type_id).
+                 order_by(event_query.c.generated, event_query.c.id,
+                          models.Trait.id))
+
+        value_map = models.Trait._value_map
+        for event_id, rows in itertools.groupby(
+                query.all(), key=operator.itemgetter(0)):
+            rows = list(rows)
+            event = api_models.Event(rows[0][1], rows[0][3], rows[0][2],
+                                     [])
+            for row in rows:
+                dtype = row[5]
+                if dtype is not None:
+                    value = getattr(row, value_map[dtype])
+                    event.append_trait(
+                        api_models.Trait(row[4], dtype, value))
+            yield (rows[0][2], event_id), event
 
     def get_event_types(self):
         """Return all event types as an iterable of strings."""
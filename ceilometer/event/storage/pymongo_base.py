@@ -18,6 +18,7 @@ from ceilometer.event.storage import base
 from ceilometer.event.storage import models
 from ceilometer.i18n import _
 from ceilometer.openstack.common import log
+from ceilometer.storage import base as storage_base
 from ceilometer.storage.mongo import utils as pymongo_utils
 from ceilometer import utils
 
@@ -78,14 +79,28 @@ class Connection(base.Connection):
                                        event_model))
         return problem_events
 
-    def get_events(self, event_filter):
-        """Return an iter of models.Event objects.
+    def get_events(self, event_filter, limit=None, marker=None):
+        """Return an iter of models.Event objects, in generated order.
 
         :param event_filter: storage.EventFilter object, consists of filters
                              for events that are stored in database.
+        :param limit: maximum number of events to return.
+        :param marker: message id of the last event of the previous page,
+                       only the events following it are returned.
         """
         q = pymongo_utils.make_events_query_from_filter(event_filter)
-        for event in self.db.event.find(q):
+        if marker:
+            last = self.db.event.find_one({'_id': marker})
+            if last is None:
+                raise storage_base.NoResultFound(marker)
+            q = {'$and': [q, {'$or': [
+                {'timestamp': {'$gt': last['timestamp']}},
+                {'timestamp': last['timestamp'], '_id': {'$gt': marker}}]}]}
+        events = self.db.event.find(q).sort([('timestamp', pymongo.ASCENDING),
+                                            ('_id', pymongo.ASCENDING)])
+        if limit:
+            events = events.limit(limit)
+        for event in events:
             traits = []
             for trait in event['traits']:
                 traits.append(models.Trait(name=trait['trait_name'],
@@ -37,3 +37,15 @@ class Inspector(object):
         :return metadata: dict to construct sample's metadata
         :return extra: dict of extra metadata to help constructing sample
         """
+
+    def prefetch(self, host, identifiers, cache):
+        """Gather the data of several metrics at once.
+
+        Inspectors able to query a host for multiple metrics in a single
+        request can override this to fill the cache before inspect_generic
+        is called for each identifier.
+
+        :param host: the target host
+        :param identifiers: the identifiers of the metrics to be inspected
+        :param cache: cache passed from the pollster
+        """
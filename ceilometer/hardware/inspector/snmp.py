@@ -19,10 +19,15 @@
 # under the License.
 """Inspector for collecting data over SNMP"""
 
+from eventlet import pools
+from oslo.config import cfg
 from pysnmp.entity.rfc3413.oneliner import cmdgen
 
 from ceilometer.hardware.inspector import base
 
+cfg.CONF.import_opt('polling_workers', 'ceilometer.hardware.plugin',
+                    group='hardware')
+
 
 class SNMPException(Exception):
     pass
@@ -107,6 +112,11 @@ class SNMPInspector(base.Inspector):
 
     _CACHE_KEY_OID = "snmp_cached_oid"
 
+    # additional oids needed by the post_op of a meter
+    _POST_OP_OIDS = {
+        '_post_op_net': [_interface_ip_oid],
+    }
+
     '''
 
      The following mapping define how to construct
@@ -271,7 +281,11 @@ class SNMPInspector(base.Inspector):
 
     def __init__(self):
         super(SNMPInspector, self).__init__()
-        self._cmdGen = cmdgen.CommandGenerator()
+        # a command generator runs its own dispatcher loop, so hosts
+        # polled concurrently must not share one
+        self._cmdGen_pool = pools.Pool(
+            max_size=cfg.CONF.hardware.polling_workers,
+            create=cmdgen.CommandGenerator)
 
     def _query_oids(self, host, oids, cache, is_bulk):
         # send GetRequest or GetBulkRequest to get oid values and
@@ -281,17 +295,18 @@ class SNMPInspector(base.Inspector):
                                                host.port or self._port))
         oid_cache = cache.setdefault(self._CACHE_KEY_OID, {})
 
-        if is_bulk:
-            ret = self._cmdGen.bulkCmd(authData,
-                                       transport,
-                                       0, 100,
-                                       *oids,
-                                       lookupValues=True)
-        else:
-            ret = self._cmdGen.getCmd(authData,
+        with self._cmdGen_pool.item() as cmd_gen:
+            if is_bulk:
+                ret = cmd_gen.bulkCmd(authData,
                                       transport,
+                                      0, 100,
                                       *oids,
                                       lookupValues=True)
+            else:
+                ret = cmd_gen.getCmd(authData,
+                                     transport,
+                                     *oids,
+                                     lookupValues=True)
         (error, data) = parse_snmp_return(ret, is_bulk)
         if error:
             raise SNMPException("An error occurred, oids %(oid)s, "
@@ -302,8 +317,12 @@ class SNMPInspector(base.Inspector):
         # save result into cache
         if is_bulk:
             for var_bind_table_row in data:
-                for name, val in var_bind_table_row:
-                    oid_cache[name.prettyPrint()] = val
+                # when several tables are walked at once, the columns of
+                # the shorter ones run past their own subtree
+                for oid, (name, val) in zip(oids, var_bind_table_row):
+                    name = name.prettyPrint()
+                    if name.startswith(oid + '.'):
+                        oid_cache[name] = val
         else:
             for name, val in data:
                 oid_cache[name.prettyPrint()] = val
@@ -354,6 +373,32 @@ class SNMPInspector(base.Inspector):
                 new_oids.append(metadata[0])
         return new_oids
 
+    def prefetch(self, host, identifiers, cache):
+        # query the oids of all the meters at once: one GetRequest for
+        # the EXACT ones and one GetBulkRequest for the PREFIX ones
+        exact_oids = []
+        prefix_oids = []
+        oid_cache = cache.setdefault(self._CACHE_KEY_OID, {})
+        for identifier in identifiers:
+            meter_def = self.MAPPING.get(identifier)
+            if meter_def is None:
+                continue
+            if meter_def['matching_type'] == PREFIX:
+                new_oids = prefix_oids
+            else:
+                new_oids = exact_oids
+            new_oids.extend(oid for oid in
+                            self._find_missing_oids(meter_def, cache)
+                            if oid not in new_oids)
+            for oid in self._POST_OP_OIDS.get(meter_def['post_op'], []):
+                if (oid not in prefix_oids and
+                        not self.find_matching_oids(oid_cache, oid, PREFIX)):
+                    prefix_oids.append(oid)
+        if exact_oids:
+            self._query_oids(host, exact_oids, cache, False)
+        if prefix_oids:
+            self._query_oids(host, prefix_oids, cache, True)
+
     def inspect_generic(self, host, identifier, cache, extra_metadata=None):
         # the snmp definition for the corresponding meter
         meter_def = self.MAPPING[identifier]
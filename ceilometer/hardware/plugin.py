@@ -22,16 +22,64 @@
 import abc
 import itertools
 
+from eventlet import greenpool
+from oslo.config import cfg
 from oslo.utils import netutils
+from oslo.utils import timeutils
 import six
 
 from ceilometer.agent import plugin_base
 from ceilometer.hardware import inspector as insloader
-from ceilometer.i18n import _
+from ceilometer.i18n import _, _LW
 from ceilometer.openstack.common import log
 
 LOG = log.getLogger(__name__)
 
+OPTS = [
+    cfg.IntOpt('polling_workers',
+               default=16,
+               help='Maximum number of hardware hosts polled concurrently.'),
+    cfg.IntOpt('host_failure_threshold',
+               default=3,
+               help='Number of consecutive polling failures after which '
+                    'a host is skipped, 0 to never skip a host.'),
+    cfg.IntOpt('host_failure_cooldown',
+               default=300,
+               help='Number of seconds a failing host is skipped before '
+                    'it is polled again.'),
+]
+cfg.CONF.register_opts(OPTS, group='hardware')
+
+
+class HostCircuitBreaker(object):
+    """Keep track of the hosts which repeatedly fail to answer.
+
+    Once a host has failed host_failure_threshold times in a row it is not
+    polled anymore for host_failure_cooldown seconds, then a single
+    attempt decides whether it is polled again or skipped for another
+    cooldown period.
+    """
+
+    def __init__(self):
+        self._failures = {}
+        self._open_until = {}
+
+    def allow(self, host):
+        open_until = self._open_until.get(host)
+        return open_until is None or timeutils.utcnow_ts() >= open_until
+
+    def record_success(self, host):
+        self._failures.pop(host, None)
+        self._open_until.pop(host, None)
+
+    def record_failure(self, host):
+        threshold = cfg.CONF.hardware.host_failure_threshold
+        failures = self._failures.get(host, 0) + 1
+        self._failures[host] = failures
+        if threshold and failures >= threshold:
+            self._open_until[host] = (timeutils.utcnow_ts() +
+                                      cfg.CONF.hardware.host_failure_cooldown)
+
 
 @six.add_metaclass(abc.ABCMeta)
 class HardwarePollster(plugin_base.PollsterBase):
@@ -40,6 +88,14 @@ class HardwarePollster(plugin_base.PollsterBase):
     CACHE_KEY = None
     IDENTIFIER = None
 
+    # inspector cache of each host, shared by all the hardware pollsters
+    HOST_CACHE_KEY = 'hardware.hosts'
+    _PREFETCHED = 'prefetched'
+    _FAILED = 'failed'
+
+    # shared by all the hardware pollsters across polling intervals
+    circuit_breaker = HostCircuitBreaker()
+
     def __init__(self):
         super(HardwarePollster, self).__init__()
         self.inspectors = {}
@@ -80,39 +136,73 @@ class HardwarePollster(plugin_base.PollsterBase):
     def get_samples(self, manager, cache, resources=None):
         """Return an iterable of Sample instances from polling the resources.
 
+        The resources are polled concurrently, at most polling_workers at
+        a time.
+
         :param manager: The service manager invoking the plugin
         :param cache: A dictionary for passing data between plugins
         :param resources: end point to poll data from
         """
         resources = resources or []
-        h_cache = cache.setdefault(self.CACHE_KEY, {})
+        identifiers = self._get_identifiers(manager)
+        pool = greenpool.GreenPool(cfg.CONF.hardware.polling_workers)
         sample_iters = []
-        for resource in resources:
-            parsed_url, res, extra_metadata = self._parse_resource(resource)
-            ins = self._get_inspector(parsed_url)
-            try:
-                # Call hardware inspector to poll for the data
-                i_cache = h_cache.setdefault(res, {})
-
-                if self.IDENTIFIER not in i_cache:
-                    i_cache[self.IDENTIFIER] = list(ins.inspect_generic(
-                        parsed_url,
-                        self.IDENTIFIER,
-                        i_cache,
-                        extra_metadata))
-                # Generate samples
-                if i_cache[self.IDENTIFIER]:
-                    sample_iters.append(self.generate_samples(
-                        parsed_url,
-                        i_cache[self.IDENTIFIER]))
-            except Exception as err:
-                LOG.exception(_('inspector call failed for %(ident)s '
-                                'host %(host)s: %(err)s'),
-                              dict(ident=self.IDENTIFIER,
-                                   host=parsed_url.hostname,
-                                   err=err))
+        for parsed_url, data in pool.imap(
+                lambda res: self._inspect_resource(identifiers, cache, res),
+                resources):
+            if data:
+                sample_iters.append(self.generate_samples(parsed_url, data))
         return itertools.chain(*sample_iters)
 
+    def _get_identifiers(self, manager):
+        """Return the identifiers of all the hardware pollsters loaded."""
+        identifiers = set([self.IDENTIFIER])
+        for ext in getattr(manager, 'extensions', []):
+            if isinstance(ext.obj, HardwarePollster):
+                identifiers.add(ext.obj.IDENTIFIER)
+        return identifiers
+
+    def _inspect_resource(self, identifiers, cache, resource):
+        parsed_url, res, extra_metadata = self._parse_resource(resource)
+        i_cache = cache.setdefault(self.CACHE_KEY, {}).setdefault(res, {})
+        if self.IDENTIFIER in i_cache:
+            return parsed_url, i_cache[self.IDENTIFIER]
+        host_cache = cache.setdefault(self.HOST_CACHE_KEY,
+                                      {}).setdefault(res, {})
+        if host_cache.get(self._FAILED):
+            return parsed_url, None
+        try:
+            ins = self._get_inspector(parsed_url)
+            if not host_cache.get(self._PREFETCHED):
+                if not self.circuit_breaker.allow(res):
+                    LOG.warn(_LW('Skipping host %s after repeated polling '
+                                 'failures'), parsed_url.hostname)
+                    host_cache[self._FAILED] = True
+                    return parsed_url, None
+                host_cache[self._PREFETCHED] = True
+                try:
+                    # Gather the data of all the meters in one go
+                    ins.prefetch(parsed_url, identifiers, host_cache)
+                except Exception:
+                    host_cache[self._FAILED] = True
+                    self.circuit_breaker.record_failure(res)
+                    raise
+                self.circuit_breaker.record_success(res)
+            # Call hardware inspector to poll for the data
+            i_cache[self.IDENTIFIER] = list(ins.inspect_generic(
+                parsed_url,
+                self.IDENTIFIER,
+                host_cache,
+                extra_metadata))
+            return parsed_url, i_cache[self.IDENTIFIER]
+        except Exception as err:
+            LOG.exception(_('inspector call failed for %(ident)s '
+                            'host %(host)s: %(err)s'),
+                          dict(ident=self.IDENTIFIER,
+                               host=parsed_url.hostname,
+                               err=err))
+            return parsed_url, None
+
     def generate_samples(self, host_url, data):
         """Generate an iterable Sample from the data returned by inspector
 
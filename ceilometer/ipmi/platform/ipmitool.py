@@ -47,12 +47,10 @@ def _process_sensor(sensor_data):
     sensor_data_fields = sensor_data.split('\n')
     sensor_data_dict = {}
     for field in sensor_data_fields:
-        if not field:
+        if field.count(':') != 1:
             continue
-        kv_value = field.split(':')
-        if len(kv_value) != 2:
-            continue
-        sensor_data_dict[kv_value[0].strip()] = kv_value[1].strip()
+        key, __, value = field.partition(':')
+        sensor_data_dict[key.strip()] = value.strip()
 
     return sensor_data_dict
 
@@ -70,7 +68,12 @@ def _translate_output(output):
         if not sensor_data_dict:
             continue
 
-        sensor_type = _get_sensor_type(sensor_data_dict)
+        # an untyped listing also holds the locator and event-only records,
+        # which are not sensors and have no such sensor type
+        try:
+            sensor_type = _get_sensor_type(sensor_data_dict)
+        except ipmiexcept.IPMIException:
+            continue
 
         # ignore the sensors which have no current 'Sensor Reading' data
         sensor_id = sensor_data_dict['Sensor ID']
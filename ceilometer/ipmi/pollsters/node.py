@@ -33,6 +33,8 @@ class _Base(plugin_base.PollsterBase):
 
     no_resources = True
 
+    CACHE_KEY_NODE = 'ipmi.node'
+
     def __init__(self):
         self.nodemanager = node_manager.NodeManager()
 
@@ -44,8 +46,16 @@ class _Base(plugin_base.PollsterBase):
     def read_data(self):
         """Return data sample for IPMI."""
 
+    def _read_node(self, cache):
+        # Read the Node Manager statistics at most once per interval, even
+        # when the pollster is polled on behalf of several sources.
+        n_cache = cache.setdefault(self.CACHE_KEY_NODE, {})
+        if self.NAME not in n_cache:
+            n_cache[self.NAME] = self.read_data()
+        return n_cache[self.NAME]
+
     def get_samples(self, manager, cache, resources):
-        stats = self.read_data()
+        stats = self._read_node(cache)
 
         metadata = {
             'node': CONF.host
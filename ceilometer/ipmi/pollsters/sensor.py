@@ -36,6 +36,8 @@ class SensorPollster(plugin_base.PollsterBase):
 
     METRIC = None
 
+    CACHE_KEY_SENSORS = 'ipmi.sensors'
+
     def __init__(self):
         self.ipmi = ipmi_sensor.IPMISensor()
 
@@ -51,8 +53,15 @@ class SensorPollster(plugin_base.PollsterBase):
         except KeyError:
             return []
 
+    def _read_sensors(self, cache):
+        # A single "sdr -v" returns the sensors of every type, so run it
+        # once per interval and share it with the other sensor pollsters.
+        if self.CACHE_KEY_SENSORS not in cache:
+            cache[self.CACHE_KEY_SENSORS] = self.ipmi.read_sensor_any('')
+        return cache[self.CACHE_KEY_SENSORS]
+
     def get_samples(self, manager, cache, resources):
-        stats = self.ipmi.read_sensor_any(self.METRIC)
+        stats = self._read_sensors(cache)
 
         sensor_type_data = self._get_sensor_types(stats, self.METRIC)
 
@@ -15,15 +15,56 @@
 
 import abc
 
+import eventlet
+from eventlet import greenpool
+from oslo.config import cfg
 import six
 
+from ceilometer.i18n import _
+from ceilometer.openstack.common import log
+
+CONF = cfg.CONF
+CONF.import_opt('http_timeout', 'ceilometer.service')
+
+LOG = log.getLogger(__name__)
+
+_FAILED = object()
+
 
 @six.add_metaclass(abc.ABCMeta)
 class Driver():
 
+    # maximum number of requests sent at the same time by _fetch_all
+    max_parallel_requests = 8
+
     @abc.abstractmethod
     def get_sample_data(self, meter_name, parse_url, params, cache):
         """Return volume, resource_id, resource_metadata, timestamp in tuple.
 
         If not implemented for meter_name, returns None
         """
+
+    @classmethod
+    def _fetch_all(cls, requests):
+        """Run independent requests concurrently.
+
+        Each request is given http_timeout seconds to complete, and a
+        failed request does not prevent the other ones from completing.
+
+        :param requests: dict of key -> (function, args) of the requests
+        :return: dict of key -> result of the requests which succeeded
+        """
+        def _fetch(item):
+            key, (func, args) = item
+            try:
+                with eventlet.Timeout(CONF.http_timeout):
+                    return key, func(*args)
+            except (Exception, eventlet.Timeout) as err:
+                LOG.exception(_('Request %(key)s failed: %(err)s'),
+                              {'key': key, 'err': err})
+                return key, _FAILED
+
+        pool = greenpool.GreenPool(cls.max_parallel_requests)
+        return dict((key, result) for key, result
+                    in pool.imap(_fetch, six.iteritems(requests))
+                    if result is not _FAILED)
@@ -44,6 +44,8 @@ class AnalyticsAPIBaseClient(object):
         self.domain = domain
         self.verify_ssl = verify_ssl
         self.sid = None
+        # keep the connections to the analytics API alive between requests
+        self.session = requests.Session()
 
     def authenticate(self):
         path = '/authenticate'
@@ -53,7 +55,7 @@ class AnalyticsAPIBaseClient(object):
 
         req_params = self._get_req_params(data=data)
         url = urlparse.urljoin(self.endpoint, path)
-        resp = requests.post(url, **req_params)
+        resp = self.session.post(url, **req_params)
         if resp.status_code != 302:
             raise OpencontrailAPIFailed(
                 _('Opencontrail API returned %(status)s %(reason)s') %
@@ -74,7 +76,7 @@ class AnalyticsAPIBaseClient(object):
 
         url = urlparse.urljoin(self.endpoint, path)
         self._log_req(url, req_params)
-        resp = requests.get(url, **req_params)
+        resp = self.session.get(url, **req_params)
         self._log_res(resp)
 
         # it seems that the sid token has to be renewed
@@ -14,6 +14,7 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 from oslo.utils import timeutils
+import six
 from six.moves.urllib import parse as urlparse
 
 from ceilometer.network.statistics import driver
@@ -51,19 +52,47 @@ class OpencontrailDriver(driver.Driver):
       opencontrail://localhost:8143/?username=admin&password=admin&
       scheme=https&domain=&verify_ssl=true
     """
-    @staticmethod
-    def _prepare_cache(endpoint, params, cache):
+    def __init__(self):
+        self._clients = {}
+
+    def _get_client(self, endpoint, params):
+        # keep one client, and so one HTTP session and authentication,
+        # per analytics endpoint to reuse them between intervals
+        key = (endpoint, params['username'][0], params['password'][0],
+               params.get('domain', [None])[0],
+               params.get('verify_ssl', ['false'])[0])
+        if key not in self._clients:
+            self._clients[key] = client.Client(endpoint, *key[1:4],
+                                               verify_ssl=key[4] == 'true')
+        return self._clients[key]
+
+    def _prepare_cache(self, endpoint, params, cache):
 
         if 'network.statistics.opencontrail' in cache:
             return cache['network.statistics.opencontrail']
 
+        o_client = self._get_client(endpoint, params)
+        n_client = neutron_client.Client()
+
+        resources = self._fetch_all({
+            'ports': (n_client.port_get_all, ()),
+            'networks': (n_client.network_get_all, ()),
+        })
+        ports = resources.get('ports', [])
+        networks = resources.get('networks', [])
+
+        # the statistics of the networks are independent, request them
+        # all concurrently, a network whose request failed is skipped
+        statistics = self._fetch_all(dict(
+            (network['id'], (o_client.networks.get_port_statistics,
+                             (network['id'],)))
+            for network in networks))
+
         data = {
-            'o_client': client.Client(endpoint,
-                                      params['username'],
-                                      params['password'],
-                                      params.get('domain'),
-                                      params.get('verify_ssl') == 'true'),
-            'n_client': neutron_client.Client()
+            'ports_map': dict((port['id'], port['tenant_id'])
+                              for port in ports),
+            'statistics': statistics,
+            'timestamp': timeutils.utcnow().isoformat(),
         }
 
         cache['network.statistics.opencontrail'] = data
@@ -94,16 +123,10 @@ class OpencontrailDriver(driver.Driver):
 
         data = self._prepare_cache(endpoint, params, cache)
 
-        ports = data['n_client'].port_get_all()
-        ports_map = dict((port['id'], port['tenant_id']) for port in ports)
-
-        networks = data['n_client'].network_get_all()
-
-        for network in networks:
-            net_id = network['id']
+        ports_map = data['ports_map']
+        timestamp = data['timestamp']
 
-            timestamp = timeutils.utcnow().isoformat()
-            statistics = data['o_client'].networks.get_port_statistics(net_id)
+        for net_id, statistics in six.iteritems(data['statistics']):
             if not statistics:
                 continue
 
@@ -166,6 +166,9 @@ class Client():
 
         self._req_params = self._get_req_params(params)
 
+        # keep the connections to the controller alive between requests
+        self._session = requests.Session()
+
     @staticmethod
     def _get_req_params(params):
         req_params = {
@@ -224,7 +227,7 @@ class Client():
     def _http_request(self, url):
         if CONF.debug:
             self._log_req(url)
-        resp = requests.get(url, **self._req_params)
+        resp = self._session.get(url, **self._req_params)
         if CONF.debug:
             self._log_res(resp)
         if resp.status_code / 100 != 2:
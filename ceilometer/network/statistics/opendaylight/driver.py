@@ -81,8 +81,62 @@ class OpenDayLightDriver(driver.Driver):
       http://127.0.0.1:8080/controller/nb/v2/statistics/default/flow
       http://127.0.0.1:8080/controller/nb/v2/statistics/egg/flow
     """
+    # data fetched for each container, with the client API and method
+    # used to request it
+    _REQUESTS = {
+        'flow': ('statistics', 'get_flow_statistics'),
+        'port': ('statistics', 'get_port_statistics'),
+        'table': ('statistics', 'get_table_statistics'),
+        'topology': ('topology', 'get_topology'),
+        'switch': ('switch_manager', 'get_nodes'),
+        'user_links': ('topology', 'get_user_links'),
+        'active_hosts': ('host_tracker', 'get_active_hosts'),
+        'inactive_hosts': ('host_tracker', 'get_inactive_hosts'),
+    }
+
+    def __init__(self):
+        self._clients = {}
+
+    def _get_client(self, endpoint, odl_params):
+        # keep one client, and so one HTTP session, per controller to
+        # reuse the connections between intervals
+        key = (endpoint, tuple(sorted(odl_params.items())))
+        if key not in self._clients:
+            self._clients[key] = client.Client(endpoint, odl_params)
+        return self._clients[key]
+
     @staticmethod
-    def _prepare_cache(endpoint, params, cache):
+    def _optimize_user_links(user_links_raw):
+        # e.g.
+        # before:
+        #   "OF|2@OF|00:00:00:00:00:00:00:02"
+        # after:
+        #   {
+        #       'port': {
+        #           'type': 'OF',
+        #           'id': '2'},
+        #       'node': {
+        #           'type': 'OF',
+        #           'id': '00:00:00:00:00:00:00:02'
+        #       }
+        #   }
+        user_links = []
+        for user_link_row in user_links_raw['userLinks']:
+            user_link = {}
+            for k, v in six.iteritems(user_link_row):
+                if (k == "dstNodeConnector" or
+                        k == "srcNodeConnector"):
+                    port_raw, node_raw = v.split('@')
+                    port = {}
+                    port['type'], port['id'] = port_raw.split('|')
+                    node = {}
+                    node['type'], node['id'] = node_raw.split('|')
+                    v = {'port': port, 'node': node}
+                user_link[k] = v
+            user_links.append(user_link)
+        return user_links
+
+    def _prepare_cache(self, endpoint, params, cache):
 
         if 'network.statistics.opendaylight' in cache:
             return cache['network.statistics.opendaylight']
@@ -98,75 +152,34 @@ class OpenDayLightDriver(driver.Driver):
             odl_params['user'] = params['user'][0]
         if 'password' in params:
             odl_params['password'] = params['password'][0]
-        cs = client.Client(endpoint, odl_params)
+        cs = self._get_client(endpoint, odl_params)
 
+        # the data of all the containers are independent, request them
+        # all concurrently
+        requests = {}
         for container_name in container_names:
-            try:
-                container_data = {}
-
-                # get flow statistics
-                container_data['flow'] = cs.statistics.get_flow_statistics(
-                    container_name)
-
-                # get port statistics
-                container_data['port'] = cs.statistics.get_port_statistics(
-                    container_name)
-
-                # get table statistics
-                container_data['table'] = cs.statistics.get_table_statistics(
-                    container_name)
-
-                # get topology
-                container_data['topology'] = cs.topology.get_topology(
-                    container_name)
-
-                # get switch informations
-                container_data['switch'] = cs.switch_manager.get_nodes(
-                    container_name)
-
-                # get and optimize user links
-                # e.g.
-                # before:
-                #   "OF|2@OF|00:00:00:00:00:00:00:02"
-                # after:
-                #   {
-                #       'port': {
-                #           'type': 'OF',
-                #           'id': '2'},
-                #       'node': {
-                #           'type': 'OF',
-                #           'id': '00:00:00:00:00:00:00:02'
-                #       }
-                #   }
-                user_links_raw = cs.topology.get_user_links(container_name)
-                user_links = []
-                container_data['user_links'] = user_links
-                for user_link_row in user_links_raw['userLinks']:
-                    user_link = {}
-                    for k, v in six.iteritems(user_link_row):
-                        if (k == "dstNodeConnector" or
-                                k == "srcNodeConnector"):
-                            port_raw, node_raw = v.split('@')
-                            port = {}
-                            port['type'], port['id'] = port_raw.split('|')
-                            node = {}
-                            node['type'], node['id'] = node_raw.split('|')
-                            v = {'port': port, 'node': node}
-                        user_link[k] = v
-                    user_links.append(user_link)
-
-                # get link status to hosts
-                container_data['active_hosts'] = (
-                    cs.host_tracker.get_active_hosts(container_name))
-                container_data['inactive_hosts'] = (
-                    cs.host_tracker.get_inactive_hosts(container_name))
-
-                container_data['timestamp'] = timeutils.isotime()
-
-                data[container_name] = container_data
-            except Exception:
-                LOG.exception(_('Request failed to connect to OpenDaylight'
-                                ' with NorthBound REST API'))
+            for name, (api, method) in six.iteritems(self._REQUESTS):
+                requests[(container_name, name)] = (
+                    getattr(getattr(cs, api), method), (container_name,))
+        results = self._fetch_all(requests)
+        if len(results) < len(requests):
+            LOG.error(_('Request failed to connect to OpenDaylight'
+                        ' with NorthBound REST API'))
+
+        # keep what has been retrieved, the meters whose data is missing
+        # are skipped for the container
+        timestamp = timeutils.isotime()
+        for (container_name, name), result in six.iteritems(results):
+            container_data = data.setdefault(container_name,
+                                             {'timestamp': timestamp})
+            if name == 'user_links':
+                try:
+                    result = self._optimize_user_links(result)
+                except Exception:
+                    LOG.exception(_('Invalid user links returned by '
+                                    'OpenDaylight'))
+                    continue
+            container_data[name] = result
 
         cache['network.statistics.opendaylight'] = data
 
@@ -198,6 +211,9 @@ class OpenDayLightDriver(driver.Driver):
 
         samples = []
         for name, value in six.iteritems(data):
+            if self._get_required_data(meter_name) not in value:
+                # the request for this data failed during this interval
+                continue
             timestamp = value['timestamp']
             for sample in iter(extractor, value):
                 if sample is not None:
@@ -220,6 +236,12 @@ class OpenDayLightDriver(driver.Driver):
         elif meter_name.startswith('switch.port'):
             return self._iter_port
 
+    @staticmethod
+    def _get_required_data(meter_name):
+        if meter_name == 'switch':
+            return 'switch'
+        return meter_name.split('.')[1]
+
     def _get_extractor(self, meter_name):
         method_name = '_' + meter_name.replace('.', '_')
         return getattr(self, method_name, None)
@@ -250,7 +272,7 @@ class OpenDayLightDriver(driver.Driver):
         my_port_id = statistic['nodeConnector']['id']
 
         # link status from topology
-        edge_properties = data['topology']['edgeProperties']
+        edge_properties = data.get('topology', {}).get('edgeProperties', [])
         for edge_property in edge_properties:
             edge = edge_property['edge']
 
@@ -273,7 +295,7 @@ class OpenDayLightDriver(driver.Driver):
             break
 
         # link status from user links
-        for user_link in data['user_links']:
+        for user_link in data.get('user_links', []):
             if (user_link['dstNodeConnector']['node']['id'] == my_node_id and
                     user_link['dstNodeConnector']['port']['id'] == my_port_id):
                 target_node = user_link['srcNodeConnector']
@@ -292,9 +314,9 @@ class OpenDayLightDriver(driver.Driver):
 
         # link status to hosts
         for hosts, status in moves.zip(
-                [data['active_hosts'], data['inactive_hosts']],
+                [data.get('active_hosts', {}), data.get('inactive_hosts', {})],
                 ['active', 'inactive']):
-            for host_config in hosts['hostConfig']:
+            for host_config in hosts.get('hostConfig', []):
                 if (host_config['nodeId'] != my_node_id or
                         host_config['nodeConnectorId'] != my_port_id):
                     continue
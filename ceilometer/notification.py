@@ -41,6 +41,15 @@ OPTS = [
                 deprecated_group='collector',
                 default=False,
                 help='Save event details.'),
+    cfg.IntOpt('event_batch_size',
+               default=50,
+               help='Maximum number of events converted from concurrent '
+                    'notifications and recorded together by the '
+                    'dispatchers.'),
+    cfg.FloatOpt('event_batch_timeout',
+                 default=0.1,
+                 help='Maximum time, in seconds, a converted event waits '
+                      'for others to be recorded with.'),
     cfg.BoolOpt('workload_partitioning',
                 default=False,
                 help='Enable workload partitioning, allowing multiple '
@@ -19,6 +19,8 @@
 
 from __future__ import absolute_import
 
+from eventlet import greenpool
+from eventlet import pools
 from keystoneclient import exceptions
 from oslo.config import cfg
 from oslo.utils import timeutils
@@ -26,7 +28,7 @@ import six.moves.urllib.parse as urlparse
 from swiftclient import client as swift
 
 from ceilometer.agent import plugin_base
-from ceilometer.i18n import _
+from ceilometer.i18n import _, _LW
 from ceilometer.openstack.common import log
 from ceilometer import sample
 
@@ -38,6 +40,11 @@ OPTS = [
                default='AUTH_',
                help="Swift reseller prefix. Must be on par with "
                "reseller_prefix in proxy-server.conf."),
+    cfg.IntOpt('swift_polling_workers',
+               default=16,
+               help="Number of Swift accounts polled concurrently, each "
+               "one using a connection to the Swift endpoint kept "
+               "between polling intervals."),
 ]
 
 SERVICE_OPTS = [
@@ -55,6 +62,7 @@ class _Base(plugin_base.PollsterBase):
 
     METHOD = 'head'
     _ENDPOINT = None
+    _CONN_POOL = None
 
     @property
     def default_discovery(self):
@@ -78,6 +86,16 @@ class _Base(plugin_base.PollsterBase):
                 LOG.debug(_("Swift endpoint not found"))
         return _Base._ENDPOINT
 
+    @staticmethod
+    def _get_connection_pool(endpoint):
+        # the connections are shared by all the pollsters and kept between
+        # polling intervals, so the HTTP connections to Swift are reused
+        if _Base._CONN_POOL is None:
+            _Base._CONN_POOL = pools.Pool(
+                max_size=cfg.CONF.swift_polling_workers,
+                create=lambda: swift.http_connection(endpoint))
+        return _Base._CONN_POOL
+
     def _iter_accounts(self, ksclient, cache, tenants):
         if self.CACHE_KEY_METHOD not in cache:
             cache[self.CACHE_KEY_METHOD] = list(self._get_account_info(
@@ -89,11 +107,26 @@ class _Base(plugin_base.PollsterBase):
         if not endpoint:
             raise StopIteration()
 
-        for t in tenants:
-            api_method = '%s_account' % self.METHOD
-            yield (t.id, getattr(swift, api_method)
-                                (self._neaten_url(endpoint, t.id),
-                                 ksclient.auth_token))
+        api_method = getattr(swift, '%s_account' % self.METHOD)
+        conn_pool = self._get_connection_pool(endpoint)
+        token = ksclient.auth_token
+
+        def _get_account(tenant):
+            url = self._neaten_url(endpoint, tenant.id)
+            try:
+                with conn_pool.item() as (parsed, conn):
+                    return tenant.id, api_method(
+                        url, token, http_conn=(urlparse.urlparse(url), conn))
+            except Exception as err:
+                LOG.warning(_LW('Unable to get account %(tenant)s from '
+                                'Swift: %(err)s'),
+                            {'tenant': tenant.id, 'err': err})
+                return tenant.id, None
+
+        pool = greenpool.GreenPool(cfg.CONF.swift_polling_workers)
+        for tenant_id, account in pool.imap(_get_account, tenants):
+            if account is not None:
+                yield tenant_id, account
 
     @staticmethod
     def _neaten_url(endpoint, tenant_id):
@@ -37,11 +37,26 @@ before "proxy-server" and add the following filter in the file:
 
     # Set reseller prefix (defaults to "AUTH_" if not set)
     reseller_prefix = AUTH_
+
+    # Publish the samples in a background green thread instead of the
+    # request path (defaults to false)
+    nonblocking_publish = true
+
+    # Size of the queue of the requests waiting to be published, and what
+    # to drop when it is full: "drop_newest" or "drop_oldest" request
+    send_queue_size = 1000
+    send_queue_overflow = drop_newest
+
+    # Maximum number of requests published at once
+    send_batch_size = 100
 """
 
 from __future__ import absolute_import
 import logging
 
+import eventlet
+from eventlet import queue
+from oslo.utils import strutils
 from oslo.utils import timeutils
 from oslo_context import context
 import six
@@ -103,6 +118,21 @@ class CeilometerMiddleware(object):
         if self.reseller_prefix and self.reseller_prefix[-1] != '_':
             self.reseller_prefix += '_'
 
+        self.nonblocking_publish = strutils.bool_from_string(
+            conf.get('nonblocking_publish', False))
+        self.send_queue_size = int(conf.get('send_queue_size', 1000))
+        self.send_queue_overflow = conf.get('send_queue_overflow',
+                                            'drop_newest')
+        if self.send_queue_overflow not in ('drop_newest', 'drop_oldest'):
+            raise ValueError('Invalid send_queue_overflow: %s' %
+                             self.send_queue_overflow)
+        self.send_batch_size = int(conf.get('send_batch_size', 100))
+        self.send_queue = None
+        self.send_thread = None
+        # number of requests dropped because the send queue was full
+        self.dropped_requests = 0
+        self._reported_drops = 0
+
     def __call__(self, env, start_response):
         start_response_args = [None]
         input_proxy = InputProxy(env['wsgi.input'])
@@ -145,6 +175,62 @@ class CeilometerMiddleware(object):
             return iter_response(iterable)
 
     def publish_sample(self, env, bytes_received, bytes_sent):
+        now = timeutils.utcnow().isoformat()
+        if not self.nonblocking_publish:
+            self._publish([(env, bytes_received, bytes_sent, now)])
+            return
+
+        # only keep what is needed from the environment of the request,
+        # the samples are built later by the sender thread
+        env = dict((k, v) for k, v in six.iteritems(env)
+                   if k.startswith('HTTP_') or
+                   k in ('PATH_INFO', 'REQUEST_METHOD'))
+        self._enqueue((env, bytes_received, bytes_sent, now))
+
+    def _enqueue(self, request):
+        if self.send_queue is None:
+            self.send_queue = queue.LightQueue(self.send_queue_size)
+            self.send_thread = eventlet.spawn(self._send_samples)
+        try:
+            self.send_queue.put_nowait(request)
+        except queue.Full:
+            self.dropped_requests += 1
+            if self.send_queue_overflow == 'drop_oldest':
+                try:
+                    self.send_queue.get_nowait()
+                except queue.Empty:
+                    pass
+                self.send_queue.put_nowait(request)
+
+    def _send_samples(self):
+        while True:
+            requests = [self.send_queue.get()]
+            while len(requests) < self.send_batch_size:
+                try:
+                    requests.append(self.send_queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._publish(requests)
+            except Exception:
+                self.logger.exception('Failed to publish samples')
+            if self.dropped_requests != self._reported_drops:
+                self.logger.warning(
+                    '%d request(s) not metered, the send queue is full',
+                    self.dropped_requests - self._reported_drops)
+                self._reported_drops = self.dropped_requests
+
+    def _publish(self, requests):
+        samples = []
+        for env, bytes_received, bytes_sent, now in requests:
+            samples.extend(self._make_samples(env, bytes_received,
+                                              bytes_sent, now))
+        if samples:
+            with self.pipeline_manager.publisher(
+                    context.get_admin_context()) as publisher:
+                publisher(samples)
+
+    def _make_samples(self, env, bytes_received, bytes_sent, now):
         path = urlparse.quote(env['PATH_INFO'])
         method = env['REQUEST_METHOD']
         headers = {}
@@ -168,9 +254,7 @@ class CeilometerMiddleware(object):
                 else:
                     container = remainder
         except ValueError:
-            return
-
-        now = timeutils.utcnow().isoformat()
+            return []
 
         resource_metadata = {
             "path": path,
@@ -184,45 +268,46 @@ class CeilometerMiddleware(object):
                 resource_metadata['http_header_%s' % header] = headers.get(
                     header.upper())
 
-        with self.pipeline_manager.publisher(
-                context.get_admin_context()) as publisher:
-            if bytes_received:
-                publisher([sample.Sample(
-                    name='storage.objects.incoming.bytes',
-                    type=sample.TYPE_DELTA,
-                    unit='B',
-                    volume=bytes_received,
-                    user_id=env.get('HTTP_X_USER_ID'),
-                    project_id=env.get('HTTP_X_TENANT_ID'),
-                    resource_id=account.partition(self.reseller_prefix)[2],
-                    timestamp=now,
-                    resource_metadata=resource_metadata)])
-
-            if bytes_sent:
-                publisher([sample.Sample(
-                    name='storage.objects.outgoing.bytes',
-                    type=sample.TYPE_DELTA,
-                    unit='B',
-                    volume=bytes_sent,
-                    user_id=env.get('HTTP_X_USER_ID'),
-                    project_id=env.get('HTTP_X_TENANT_ID'),
-                    resource_id=account.partition(self.reseller_prefix)[2],
-                    timestamp=now,
-                    resource_metadata=resource_metadata)])
-
-            # publish the event for each request
-            # request method will be recorded in the metadata
-            resource_metadata['method'] = method.lower()
-            publisher([sample.Sample(
-                name='storage.api.request',
+        samples = []
+        if bytes_received:
+            samples.append(sample.Sample(
+                name='storage.objects.incoming.bytes',
+                type=sample.TYPE_DELTA,
+                unit='B',
+                volume=bytes_received,
+                user_id=env.get('HTTP_X_USER_ID'),
+                project_id=env.get('HTTP_X_TENANT_ID'),
+                resource_id=account.partition(self.reseller_prefix)[2],
+                timestamp=now,
+                resource_metadata=resource_metadata))
+
+        if bytes_sent:
+            samples.append(sample.Sample(
+                name='storage.objects.outgoing.bytes',
                 type=sample.TYPE_DELTA,
-                unit='request',
-                volume=1,
+                unit='B',
+                volume=bytes_sent,
                 user_id=env.get('HTTP_X_USER_ID'),
                 project_id=env.get('HTTP_X_TENANT_ID'),
                 resource_id=account.partition(self.reseller_prefix)[2],
                 timestamp=now,
-                resource_metadata=resource_metadata)])
+                resource_metadata=resource_metadata))
+
+        # publish the event for each request
+        # request method will be recorded in the metadata, of this sample
+        # only as the bytes ones share the other items
+        samples.append(sample.Sample(
+            name='storage.api.request',
+            type=sample.TYPE_DELTA,
+            unit='request',
+            volume=1,
+            user_id=env.get('HTTP_X_USER_ID'),
+            project_id=env.get('HTTP_X_TENANT_ID'),
+            resource_id=account.partition(self.reseller_prefix)[2],
+            timestamp=now,
+            resource_metadata=dict(resource_metadata,
+                                   method=method.lower())))
+        return samples
 
 
 def filter_factory(global_conf, **local_conf):
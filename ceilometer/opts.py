@@ -17,6 +17,7 @@ import ceilometer.agent.manager
 import ceilometer.alarm.notifier.rest
 import ceilometer.alarm.rpc
 import ceilometer.alarm.service
+import ceilometer.alarm.storage_client
 import ceilometer.api
 import ceilometer.api.app
 import ceilometer.api.controllers.v2
@@ -37,6 +38,7 @@ import ceilometer.dispatcher.file
 import ceilometer.energy.kwapi
 import ceilometer.event.converter
 import ceilometer.hardware.discovery
+import ceilometer.hardware.plugin
 import ceilometer.identity.notifications
 import ceilometer.image.glance
 import ceilometer.image.notifications
@@ -101,6 +103,7 @@ def list_opts():
          itertools.chain(ceilometer.alarm.notifier.rest.OPTS,
                          ceilometer.alarm.service.OPTS,
                          ceilometer.alarm.rpc.OPTS,
+                         ceilometer.alarm.storage_client.OPTS,
                          ceilometer.api.controllers.v2.ALARM_API_OPTS,
                          ceilometer.cmd.alarm.OPTS)),
         ('api',
@@ -114,7 +117,9 @@ def list_opts():
         ('database', ceilometer.storage.OPTS),
         ('dispatcher_file', ceilometer.dispatcher.file.OPTS),
         ('event', ceilometer.event.converter.OPTS),
-        ('hardware', ceilometer.hardware.discovery.OPTS),
+        ('hardware',
+         itertools.chain(ceilometer.hardware.discovery.OPTS,
+                         ceilometer.hardware.plugin.OPTS,)),
         ('impi', ceilometer.ipmi.platform.intel_node_manager.OPTS),
         ('notification', ceilometer.notification.OPTS),
         ('polling', ceilometer.agent.manager.OPTS),
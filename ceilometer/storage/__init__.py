@@ -46,6 +46,15 @@ OPTS = [
                default=-1,
                help="Number of seconds that samples are kept "
                "in the database for (<= 0 means forever)."),
+    cfg.IntOpt('expirer_batch_size',
+               default=10000,
+               help="Number of expired records deleted in each transaction "
+               "of the expirer, from the oldest ones (0 means all at once)."),
+    cfg.FloatOpt('expirer_batch_pause',
+                 default=0,
+                 help="Number of seconds the expirer waits between two "
+                 "batches of deletions, to leave room to the other "
+                 "database clients."),
     cfg.StrOpt('metering_connection',
                default=None,
                help='The connection string used to connect to the metering '
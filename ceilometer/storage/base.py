@@ -192,12 +192,14 @@ class Connection(object):
             'Recording metering data is not implemented')
 
     @staticmethod
-    def clear_expired_metering_data(ttl):
+    def clear_expired_metering_data(ttl, batch_size=None, pause=0):
         """Clear expired data from the backend storage system.
 
         Clearing occurs according to the time-to-live.
 
         :param ttl: Number of seconds to keep records for.
+        :param batch_size: Optional number of records deleted at once.
+        :param pause: Number of seconds to wait between two batches.
         """
         raise ceilometer.NotImplementedError(
             'Clearing samples not implemented')
@@ -62,8 +62,13 @@ class MTable(object):
             else:
                 self._rows_with_ts[key].update({ts: data})
 
-    def delete(self, key):
-        del self._rows_with_ts[key]
+    def delete(self, key, columns=None):
+        if columns is None:
+            del self._rows_with_ts[key]
+            return
+        for data in self._rows_with_ts[key].values():
+            for column in columns:
+                data.pop(column, None)
 
     def _get_latest_dict(self, row):
         # The idea here is to return latest versions of columns.
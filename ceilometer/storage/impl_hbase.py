@@ -31,11 +31,14 @@ LOG = log.getLogger(__name__)
 
 
 AVAILABLE_CAPABILITIES = {
-    'meters': {'query': {'simple': True,
+    'meters': {'pagination': True,
+               'query': {'simple': True,
                          'metadata': True}},
-    'resources': {'query': {'simple': True,
+    'resources': {'pagination': True,
+                  'query': {'simple': True,
                             'metadata': True}},
-    'samples': {'query': {'simple': True,
+    'samples': {'pagination': True,
+                'query': {'simple': True,
                           'metadata': True}},
     'statistics': {'query': {'simple': True,
                              'metadata': True},
@@ -183,6 +186,95 @@ class Connection(hbase_base.Connection, base.Connection):
                          'message': data, 'recorded_at': timeutils.utcnow()})
             meter_table.put(row, record)
 
+    def clear_expired_metering_data(self, ttl, batch_size=None, pause=0):
+        """Clear expired data from the backend storage system.
+
+        Clearing occurs according to the time-to-live. The expired samples
+        are deleted batch after batch, then the expired meters of the
+        resources, a resource being deleted along with its last meter. An
+        interrupted expiry resumes where it stopped when run again.
+
+        :param ttl: Number of seconds to keep records for.
+        :param batch_size: Optional number of rows deleted per scan.
+        :param pause: Number of seconds to wait between two batches.
+        """
+        end = timeutils.utcnow() - datetime.timedelta(seconds=ttl)
+        # the timestamps being reversed, the expired ones are the greatest
+        rts_end = hbase_utils.timestamp(end)
+        q = ("SingleColumnValueFilter ('f', 'rts', %s, 'binary:%s')" %
+             (hbase_utils.OP_SIGN_REV['lt'], rts_end))
+        with self.conn_pool.connection() as conn:
+            meter_table = conn.table(self.METER_TABLE)
+            resource_table = conn.table(self.RESOURCE_TABLE)
+
+            rows = 0
+            for batch in self._scan_batches(meter_table, batch_size, pause,
+                                            filter=q, columns=['f:rts']):
+                for row, data in batch:
+                    meter_table.delete(row)
+                rows += len(batch)
+                LOG.info(_("%(deleted)d samples removed, %(total)d so far"),
+                         {'deleted': len(batch), 'total': rows})
+            LOG.info(_("%d samples removed from database"), rows)
+
+            resources = 0
+            for batch in self._scan_batches(resource_table, batch_size,
+                                            pause):
+                deleted = 0
+                for row, data in batch:
+                    meters = [k for k in data if k.startswith('f:m_')]
+                    expired = [k for k in meters
+                               if int(k[4:].split(':')[0]) > rts_end]
+                    if len(expired) == len(meters):
+                        resource_table.delete(row)
+                        deleted += 1
+                    elif expired:
+                        resource_table.delete(row, columns=expired)
+                resources += deleted
+                if deleted:
+                    LOG.info(_("%(deleted)d resources removed, "
+                               "%(total)d so far"),
+                             {'deleted': deleted, 'total': resources})
+            LOG.info(_("%d resources removed from database"), resources)
+
+    @staticmethod
+    def _scan_batches(table, batch_size, pause, **kwargs):
+        """Yield the rows of a table scan by lists of batch_size rows.
+
+        Each scan starts from the row following the last one of the previous
+        batch, so the rows of a batch may be deleted before the next one is
+        read.
+
+        :param batch_size: Number of rows per batch, all rows if None or 0.
+        :param pause: Number of seconds to wait between two batches.
+        """
+        row_start = None
+        while True:
+            batch = list(table.scan(row_start=row_start,
+                                    limit=batch_size or None, **kwargs))
+            if batch:
+                yield batch
+            if not batch_size or len(batch) < batch_size:
+                return
+            row_start = batch[-1][0] + '\x00'
+            if pause:
+                time.sleep(pause)
+
+    @staticmethod
+    def _check_pagination(pagination):
+        if pagination and (pagination.sort_keys or
+                           pagination.primary_sort_dir != 'asc'):
+            raise ceilometer.NotImplementedError(
+                _('Only the pagination by ascending resource id is '
+                  'implemented'))
+
+    @staticmethod
+    def _resource_row(resource_table, resource_id):
+        row = hbase_utils.encode_unicode(resource_id)
+        if not resource_table.row(row, columns=['f:resource_id']):
+            raise base.NoResultFound()
+        return row
+
     def get_resources(self, user=None, project=None, source=None,
                       start_timestamp=None, start_timestamp_op=None,
                       end_timestamp=None, end_timestamp_op=None,
@@ -200,8 +292,7 @@ class Connection(hbase_base.Connection, base.Connection):
         :param resource: Optional resource filter.
         :param pagination: Optional pagination query.
         """
-        if pagination:
-            raise ceilometer.NotImplementedError('Pagination not implemented')
+        self._check_pagination(pagination)
 
         q = hbase_utils.make_query(metaquery=metaquery, user_id=user,
                                    project_id=project,
@@ -213,8 +304,17 @@ class Connection(hbase_base.Connection, base.Connection):
                                                       source, q)
         with self.conn_pool.connection() as conn:
             resource_table = conn.table(self.RESOURCE_TABLE)
+            row_start, limit = None, None
+            if pagination:
+                # the resources are stored by id, the page is read from
+                # the row following the marker one
+                limit = pagination.limit
+                if pagination.marker_value:
+                    row_start = self._resource_row(
+                        resource_table, pagination.marker_value) + '\x00'
             LOG.debug(_("Query Resource table: %s") % q)
-            for resource_id, data in resource_table.scan(filter=q):
+            for resource_id, data in resource_table.scan(
+                    filter=q, row_start=row_start, limit=limit):
                 f_res, sources, meters, md = hbase_utils.deserialize_entry(
                     data)
                 resource_id = hbase_utils.encode_unicode(resource_id)
@@ -250,31 +350,44 @@ class Connection(hbase_base.Connection, base.Connection):
         :param resource: Optional resource filter.
         :param source: Optional source filter.
         :param metaquery: Optional dict with metadata to match on.
-        :param pagination: Optional pagination query.
+        :param pagination: Optional pagination query, the meters are
+                           ordered by resource and name and the marker is
+                           the (resource_id, name) pair of a meter.
         """
 
         metaquery = metaquery or {}
 
-        if pagination:
-            raise ceilometer.NotImplementedError(
-                _('Pagination not implemented'))
+        self._check_pagination(pagination)
         with self.conn_pool.connection() as conn:
             resource_table = conn.table(self.RESOURCE_TABLE)
             q = hbase_utils.make_query(metaquery=metaquery, user_id=user,
                                        project_id=project,
                                        resource_id=resource,
                                        source=source)
+            row_start = limit = marker = None
+            if pagination:
+                limit, marker = pagination.limit, pagination.marker_value
+                if marker:
+                    # the page starts at the row of the marker resource,
+                    # or at the following one if it is gone since
+                    row_start = hbase_utils.encode_unicode(marker[0])
             LOG.debug(_("Query Resource table: %s") % q)
 
-            gen = resource_table.scan(filter=q)
+            gen = resource_table.scan(filter=q, row_start=row_start)
             # We need result set to be sure that user doesn't receive several
             # same meters. Please see bug
             # https://bugs.launchpad.net/ceilometer/+bug/1301371
             result = set()
-            for ignored, data in gen:
+            for row, data in gen:
                 flatten_result, s, meters, md = hbase_utils.deserialize_entry(
                     data)
+                if pagination:
+                    meters = sorted(meters, key=lambda m: m[0][2])
+                    if row == row_start:
+                        meters = [m for m in meters if m[0][2] > marker[1]]
                 for m in meters:
+                    if limit and len(result) >= limit:
+                        return
                     _m_rts, m_source, name, m_type, unit = m[0]
                     meter_dict = {'name': name,
                                   'type': m_type,
@@ -291,11 +404,13 @@ class Connection(hbase_base.Connection, base.Connection):
 
                     yield models.Meter(**meter_dict)
 
-    def get_samples(self, sample_filter, limit=None):
+    def get_samples(self, sample_filter, limit=None, marker=None):
         """Return an iterable of models.Sample instances.
 
         :param sample_filter: Filter.
         :param limit: Maximum number of results to return.
+        :param marker: Message ID of the last sample of the previous page,
+                       only the samples following it are returned.
         """
         if limit == 0:
             return
@@ -304,6 +419,15 @@ class Connection(hbase_base.Connection, base.Connection):
             q, start, stop, columns = (hbase_utils.
                                        make_sample_query_from_filter
                                        (sample_filter, require_meter=False))
+            if marker:
+                # the samples are read in row order, from the row
+                # following the marker one
+                rows = list(meter_table.scan(
+                    filter=hbase_utils.make_query(message_id=marker),
+                    row_start=start, row_stop=stop, limit=1))
+                if not rows:
+                    raise base.NoResultFound()
+                start = rows[0][0] + '\x00'
             LOG.debug(_("Query Meter Table: %s") % q)
             gen = meter_table.scan(filter=q, row_start=start, row_stop=stop,
                                    limit=limit, columns=columns)
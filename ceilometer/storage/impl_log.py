@@ -45,11 +45,13 @@ class Connection(base.Connection):
                      'resource_id': data['resource_id'],
                      'counter_volume': data['counter_volume']}))
 
-    def clear_expired_metering_data(self, ttl):
+    def clear_expired_metering_data(self, ttl, batch_size=None, pause=0):
         """Clear expired data from the backend storage system.
 
         Clearing occurs according to the time-to-live.
         :param ttl: Number of seconds to keep records for.
+        :param batch_size: Optional number of records deleted at once.
+        :param pause: Number of seconds to wait between two batches.
         """
         LOG.info(_("Dropping data with TTL %d"), ttl)
 
@@ -51,7 +51,8 @@ LOG = log.getLogger(__name__)
 
 
 AVAILABLE_CAPABILITIES = {
-    'resources': {'query': {'simple': True,
+    'resources': {'pagination': True,
+                  'query': {'simple': True,
                             'metadata': True}},
     'statistics': {'groupby': True,
                    'query': {'simple': True,
@@ -467,6 +468,13 @@ class Connection(pymongo_base.Connection):
                                       sparse=True)
         self.db.meter.ensure_index([('timestamp', pymongo.DESCENDING)],
                                    name='timestamp_idx')
+        # the samples are paginated in this order, from the message id of
+        # the last sample of the previous page
+        self.db.meter.ensure_index([('timestamp', pymongo.DESCENDING),
+                                    ('_id', pymongo.DESCENDING)],
+                                   name='timestamp_id_idx')
+        self.db.meter.ensure_index([('message_id', pymongo.ASCENDING)],
+                                   name='meter_message_id_idx')
         # remove API v1 related table
         self.db.user.drop()
         self.db.project.drop()
@@ -545,10 +553,12 @@ class Connection(pymongo_base.Connection):
         record['recorded_at'] = timeutils.utcnow()
         self.db.meter.insert(record)
 
-    def clear_expired_metering_data(self, ttl):
+    def clear_expired_metering_data(self, ttl, batch_size=None, pause=0):
         """Clear expired data from the backend storage system.
 
-        Clearing occurs with native MongoDB time-to-live feature.
+        Clearing occurs with native MongoDB time-to-live feature, the
+        server removing the expired documents by itself in periodic
+        background passes.
         """
         LOG.debug(_("Clearing expired metering data is based on native "
                     "MongoDB time to live feature and going in background."))
@@ -684,7 +694,8 @@ class Connection(pymongo_base.Connection):
     def _get_time_constrained_resources(self, query,
                                         start_timestamp, start_timestamp_op,
                                         end_timestamp, end_timestamp_op,
-                                        metaquery, resource):
+                                        metaquery, resource, pagination=None,
+                                        marker=None):
         """Return an iterable of models.Resource instances
 
         Items are constrained by sample timestamp.
@@ -695,6 +706,8 @@ class Connection(pymongo_base.Connection):
         :param end_timestamp_op: end time operator, like lt, le.
         :param metaquery: dict with metadata to match on.
         :param resource: resource filter.
+        :param pagination: pagination query.
+        :param marker: last resource of the previous page.
         """
         if resource is not None:
             query['resource_id'] = resource
@@ -730,8 +743,17 @@ class Connection(pymongo_base.Connection):
                                  sort={'resource_id': 1},
                                  query=query)
 
+        criterion, limit = {}, 0
+        if pagination:
+            criterion, sort_instructions, limit = self._paginate_resources(
+                pagination, marker, {'user_id': 'value.user_id',
+                                     'project_id': 'value.project_id',
+                                     'source': 'value.source',
+                                     'timestamp': 'value.last_timestamp',
+                                     'resource_id': '_id'})
         try:
-            for r in self.db[out].find(sort=sort_instructions):
+            for r in self.db[out].find(criterion, sort=sort_instructions,
+                                       limit=limit):
                 resource = r['value']
                 yield models.Resource(
                     resource_id=r['_id'],
@@ -744,13 +766,16 @@ class Connection(pymongo_base.Connection):
         finally:
             self.db[out].drop()
 
-    def _get_floating_resources(self, query, metaquery, resource):
+    def _get_floating_resources(self, query, metaquery, resource,
+                                pagination=None, marker=None):
         """Return an iterable of models.Resource instances
 
         Items are unconstrained by timestamp.
         :param query: project/user/source query
         :param metaquery: dict with metadata to match on.
         :param resource: resource filter.
+        :param pagination: pagination query.
+        :param marker: last resource of the previous page.
         """
         if resource is not None:
             query['_id'] = resource
@@ -762,8 +787,19 @@ class Connection(pymongo_base.Connection):
         sort_keys = ['last_sample_timestamp' if i == 'timestamp' else i
                      for i in keys]
         sort_instructions = self._build_sort_instructions(sort_keys)[0]
-
-        for r in self.db.resource.find(query, sort=sort_instructions):
+        limit = 0
+        if pagination:
+            criterion, sort_instructions, limit = self._paginate_resources(
+                pagination, marker, {'user_id': 'user_id',
+                                     'project_id': 'project_id',
+                                     'source': 'source',
+                                     'timestamp': 'last_sample_timestamp',
+                                     'resource_id': '_id'})
+            if criterion:
+                query = {'$and': [query, criterion]}
+
+        for r in self.db.resource.find(query, sort=sort_instructions,
+                                       limit=limit):
             yield models.Resource(
                 resource_id=r['_id'],
                 user_id=r['user_id'],
@@ -775,6 +811,32 @@ class Connection(pymongo_base.Connection):
                 source=r['source'],
                 metadata=pymongo_utils.unquote_keys(r['metadata']))
 
+    # attributes of the resources by which they can be sorted
+    _RESOURCE_SORT_KEYS = {'user_id': 'user_id',
+                           'project_id': 'project_id',
+                           'source': 'source',
+                           'timestamp': 'last_sample_timestamp',
+                           'resource_id': 'resource_id'}
+
+    @classmethod
+    def _paginate_resources(cls, pagination, marker, fields):
+        """Return the criterion, sort and limit of a page of resources.
+
+        :param pagination: pagination query.
+        :param marker: last resource of the previous page, if any.
+        :param fields: fields of the documents for each sort key.
+        """
+        keys = pagination.sort_keys + ['resource_id']
+        criterion = {}
+        if marker:
+            criterion = pymongo_utils.make_keyset_query(
+                [fields[k] for k in keys],
+                [getattr(marker, cls._RESOURCE_SORT_KEYS[k]) for k in keys],
+                pagination.primary_sort_dir)
+        sort_instructions = cls._build_sort_instructions(
+            [fields[k] for k in keys], pagination.primary_sort_dir)[0]
+        return criterion, sort_instructions, pagination.limit or 0
+
     def get_resources(self, user=None, project=None, source=None,
                       start_timestamp=None, start_timestamp_op=None,
                       end_timestamp=None, end_timestamp_op=None,
@@ -792,8 +854,20 @@ class Connection(pymongo_base.Connection):
         :param resource: Optional resource filter.
         :param pagination: Optional pagination query.
         """
-        if pagination:
-            raise ceilometer.NotImplementedError('Pagination not implemented')
+        if pagination and set(pagination.sort_keys) - set(
+                self._RESOURCE_SORT_KEYS):
+            raise ceilometer.NotImplementedError(
+                'Sorting resources by %s not implemented' %
+                ', '.join(pagination.sort_keys))
+        marker = None
+        if pagination and pagination.marker_value:
+            marker = list(self.get_resources(
+                user, project, source, start_timestamp, start_timestamp_op,
+                end_timestamp, end_timestamp_op, metaquery,
+                resource=pagination.marker_value))
+            if not marker:
+                raise base.NoResultFound()
+            marker = marker[0]
 
         metaquery = pymongo_utils.improve_keys(metaquery, metaquery=True) or {}
 
@@ -811,9 +885,11 @@ class Connection(pymongo_base.Connection):
                                                         start_timestamp_op,
                                                         end_timestamp,
                                                         end_timestamp_op,
-                                                        metaquery, resource)
+                                                        metaquery, resource,
+                                                        pagination, marker)
         else:
-            return self._get_floating_resources(query, metaquery, resource)
+            return self._get_floating_resources(query, metaquery, resource,
+                                                pagination, marker)
 
     def _aggregate_param(self, fragment_key, aggregate):
         fragment_map = self.STANDARD_AGGREGATES[fragment_key]
@@ -20,6 +20,7 @@ from __future__ import absolute_import
 import datetime
 import hashlib
 import os
+import time
 
 from oslo.config import cfg
 from oslo.db import exception as dbexc
@@ -45,6 +46,9 @@ from ceilometer import utils
 
 LOG = log.getLogger(__name__)
 
+# number of samples read by each query of a streamed listing
+_CHUNK_SIZE = 1000
+
 
 STANDARD_AGGREGATES = dict(
     avg=func.avg(models.Sample.volume).label('avg'),
@@ -70,9 +74,11 @@ PARAMETERIZED_AGGREGATES = dict(
 )
 
 AVAILABLE_CAPABILITIES = {
-    'meters': {'query': {'simple': True,
+    'meters': {'pagination': True,
+               'query': {'simple': True,
                          'metadata': True}},
-    'resources': {'query': {'simple': True,
+    'resources': {'pagination': True,
+                  'query': {'simple': True,
                             'metadata': True}},
     'samples': {'pagination': True,
                 'groupby': True,
@@ -348,35 +354,143 @@ class Connection(base.Connection):
                          message_signature=data['message_signature'],
                          message_id=data['message_id'])
 
-    def clear_expired_metering_data(self, ttl):
+    def clear_expired_metering_data(self, ttl, batch_size=None, pause=0):
         """Clear expired data from the backend storage system.
 
-        Clearing occurs according to the time-to-live.
+        Clearing occurs according to the time-to-live. The samples are
+        deleted from the oldest one, then the resources left without samples
+        along with their metadata, each batch of rows in its own transaction
+        so that the tables are never locked for long. An interrupted expiry
+        resumes where it stopped when run again.
+
         :param ttl: Number of seconds to keep records for.
+        :param batch_size: Optional number of rows deleted per transaction.
+        :param pause: Number of seconds to wait between two transactions.
         """
-
+        end = timeutils.utcnow() - datetime.timedelta(seconds=ttl)
         session = self._engine_facade.get_session()
+
+        rows = 0
+        for bound in self._expiry_bounds(
+                session, models.Sample.timestamp,
+                models.Sample.timestamp < end, batch_size, pause):
+            query = (session.query(models.Sample)
+                     .filter(models.Sample.timestamp < end))
+            if bound is not None:
+                query = query.filter(models.Sample.timestamp <= bound)
+            with session.begin():
+                deleted = query.delete(synchronize_session=False)
+            rows += deleted
+            if deleted:
+                LOG.info(_("%(deleted)d samples removed up to %(bound)s, "
+                           "%(total)d so far"),
+                         {'deleted': deleted, 'bound': bound or end,
+                          'total': rows})
+        LOG.info(_("%d samples removed from database"), rows)
+
+        # remove Meter definitions with no matching samples
         with session.begin():
-            end = timeutils.utcnow() - datetime.timedelta(seconds=ttl)
-            sample_q = (session.query(models.Sample)
-                        .filter(models.Sample.timestamp < end))
-
-            sample_subq = sample_q.subquery()
-            for table in [models.MetaText, models.MetaBigInt,
-                          models.MetaFloat, models.MetaBool]:
-                (session.query(table)
-                 .join(sample_subq, sample_subq.c.id == table.id)
-                 .delete())
-
-            rows = sample_q.delete()
-            # remove Meter definitions with no matching samples
             (session.query(models.Meter)
              .filter(~models.Meter.samples.any())
              .delete(synchronize_session='fetch'))
-            (session.query(models.Resource)
-             .filter(~models.Resource.samples.any())
-             .delete(synchronize_session='fetch'))
-            LOG.info(_("%d samples removed from database"), rows)
+
+        resources = 0
+        orphan = ~models.Resource.samples.any()
+        lower = None
+        for bound in self._expiry_bounds(
+                session, models.Resource.internal_id, orphan,
+                batch_size, pause):
+            with session.begin():
+                # the metadata rows are those of the resources
+                for table in [models.MetaText, models.MetaBigInt,
+                              models.MetaFloat, models.MetaBool]:
+                    self._orphan_query(session, table, table.id,
+                                       lower, bound).delete(
+                        synchronize_session=False)
+                deleted = self._orphan_query(
+                    session, models.Resource, models.Resource.internal_id,
+                    lower, bound).delete(synchronize_session=False)
+            resources += deleted
+            lower = bound
+            if deleted:
+                LOG.info(_("%(deleted)d resources removed, %(total)d so far"),
+                         {'deleted': deleted, 'total': resources})
+        LOG.info(_("%d resources removed from database"), resources)
+
+    @staticmethod
+    def _orphan_query(session, table, resource_id, lower, bound):
+        """Return the query of the rows of resources with no samples.
+
+        :param resource_id: Column of the table with the internal id of the
+                            resource of the rows.
+        :param lower: Optional exclusive lower bound of the internal ids.
+        :param bound: Optional inclusive upper bound of the internal ids.
+        """
+        query = session.query(table).filter(~sa.exists().where(
+            models.Sample.resource_id == resource_id))
+        if lower is not None:
+            query = query.filter(resource_id > lower)
+        if bound is not None:
+            query = query.filter(resource_id <= bound)
+        return query
+
+    @staticmethod
+    def _expiry_bounds(session, column, criterion, batch_size, pause):
+        """Yield the upper bounds of the batches of rows to delete.
+
+        The rows matching the criterion are read in the order of the column,
+        each bound being the value of the column for the last row of a
+        batch, None for the last batch. The caller deletes the rows of a
+        batch before the next bound is computed.
+
+        :param column: Indexed column by which the rows are ordered.
+        :param criterion: Criterion of the rows to delete.
+        :param batch_size: Number of rows per batch, all rows if None or 0.
+        :param pause: Number of seconds to wait between two batches.
+        """
+        lower = None
+        while True:
+            bound = None
+            if batch_size:
+                query = session.query(column).filter(criterion)
+                if lower is not None:
+                    query = query.filter(column > lower)
+                bound = query.order_by(column).offset(batch_size - 1).first()
+                bound = bound[0] if bound is not None else None
+            yield bound
+            if bound is None:
+                return
+            lower = bound
+            if pause:
+                time.sleep(pause)
+
+    # attributes of the resources by which they can be sorted
+    _RESOURCE_SORT_KEYS = {'user_id': 'user_id',
+                           'project_id': 'project_id',
+                           'source': 'source',
+                           'timestamp': 'last_sample_timestamp',
+                           'resource_id': 'resource_id'}
+
+    @staticmethod
+    def _paginate(query, pagination, columns, marker_values):
+        """Return the page of a query ordered by the given columns.
+
+        :param query: query to paginate.
+        :param pagination: pagination query.
+        :param columns: columns by which the rows are ordered, the last one
+                        identifying the rows.
+        :param marker_values: values of the columns for the last row of
+                              the previous page, if any.
+        """
+        sort_dir = pagination.primary_sort_dir
+        if marker_values:
+            query = query.filter(sql_utils.keyset_criterion(
+                columns, marker_values, sort_dir))
+        order = sa.asc if sort_dir == 'asc' else sa.desc
+        query = query.order_by(*[order(c) for c in columns])
+        if pagination.limit:
+            query = query.limit(pagination.limit)
+        return query
 
     def get_resources(self, user=None, project=None, source=None,
                       start_timestamp=None, start_timestamp_op=None,
@@ -395,8 +509,20 @@ class Connection(base.Connection):
         :param resource: Optional resource filter.
         :param pagination: Optional pagination query.
         """
-        if pagination:
-            raise ceilometer.NotImplementedError('Pagination not implemented')
+        if pagination and set(pagination.sort_keys) - set(
+                self._RESOURCE_SORT_KEYS):
+            raise ceilometer.NotImplementedError(
+                'Sorting resources by %s not implemented' %
+                ', '.join(pagination.sort_keys))
+        marker = None
+        if pagination and pagination.marker_value:
+            marker = list(self.get_resources(
+                user, project, source, start_timestamp, start_timestamp_op,
+                end_timestamp, end_timestamp_op, metaquery,
+                resource=pagination.marker_value))
+            if not marker:
+                raise base.NoResultFound()
+            marker = marker[0]
 
         s_filter = storage.SampleFilter(user=user,
                                         project=project,
@@ -409,53 +535,73 @@ class Connection(base.Connection):
                                         resource=resource)
 
         session = self._engine_facade.get_session()
-        # get list of resource_ids
-        res_q = session.query(distinct(models.Resource.resource_id)).join(
-            models.Sample,
-            models.Sample.resource_id == models.Resource.internal_id)
-        res_q = make_query_from_filter(session, res_q, s_filter,
-                                       require_meter=False)
-
-        for res_id in res_q.all():
-
-            # get max and min sample timestamp value
-            min_max_q = (session.query(func.max(models.Sample.timestamp)
-                                       .label('max_timestamp'),
-                                       func.min(models.Sample.timestamp)
-                                       .label('min_timestamp'))
-                                .join(models.Resource,
-                                      models.Resource.internal_id ==
-                                      models.Sample.resource_id)
-                                .filter(models.Resource.resource_id ==
-                                        res_id[0]))
-
-            min_max_q = make_query_from_filter(session, min_max_q, s_filter,
-                                               require_meter=False)
-
-            min_max = min_max_q.first()
-
-            # get resource details for latest sample
-            res_q = (session.query(models.Resource.resource_id,
-                                   models.Resource.user_id,
-                                   models.Resource.project_id,
-                                   models.Resource.source_id,
-                                   models.Resource.resource_metadata)
+        # get max and min sample timestamp value of each resource
+        min_max_q = (session.query(models.Resource.resource_id,
+                                   func.max(models.Sample.timestamp)
+                                   .label('max_timestamp'),
+                                   func.min(models.Sample.timestamp)
+                                   .label('min_timestamp'))
                             .join(models.Sample,
                                   models.Sample.resource_id ==
-                                  models.Resource.internal_id)
-                            .filter(models.Sample.timestamp ==
-                                    min_max.max_timestamp)
-                            .filter(models.Resource.resource_id ==
-                                    res_id[0])
-                            .order_by(models.Sample.id.desc()).limit(1))
-
-            res = res_q.first()
-
+                                  models.Resource.internal_id))
+        min_max_q = make_query_from_filter(session, min_max_q, s_filter,
+                                           require_meter=False)
+        min_max_q = min_max_q.group_by(models.Resource.resource_id)
+        if pagination and not pagination.sort_keys:
+            # the page only depends on the resource ids, so only the
+            # resources of the page are aggregated
+            min_max_q = self._paginate(min_max_q, pagination,
+                                       [models.Resource.resource_id],
+                                       marker and [marker.resource_id])
+        min_max_q = min_max_q.subquery()
+
+        # get the latest sample of each resource
+        latest_q = (session.query(func.max(models.Sample.id).label('id'))
+                           .select_from(min_max_q)
+                           .join(models.Resource,
+                                 models.Resource.resource_id ==
+                                 min_max_q.c.resource_id)
+                           .join(models.Sample,
+                                 and_(models.Sample.resource_id ==
+                                      models.Resource.internal_id,
+                                      models.Sample.timestamp ==
+                                      min_max_q.c.max_timestamp))
+                           .group_by(min_max_q.c.resource_id)
+                           .subquery())
+
+        # get resource details for latest sample
+        res_q = (session.query(models.Resource.resource_id,
+                               models.Resource.user_id,
+                               models.Resource.project_id,
+                               models.Resource.source_id,
+                               models.Resource.resource_metadata,
+                               min_max_q.c.min_timestamp,
+                               min_max_q.c.max_timestamp)
+                        .join(models.Sample,
+                              models.Sample.resource_id ==
+                              models.Resource.internal_id)
+                        .join(latest_q, latest_q.c.id == models.Sample.id)
+                        .join(min_max_q,
+                              min_max_q.c.resource_id ==
+                              models.Resource.resource_id))
+        if pagination:
+            columns = {'user_id': models.Resource.user_id,
+                       'project_id': models.Resource.project_id,
+                       'source': models.Resource.source_id,
+                       'timestamp': min_max_q.c.max_timestamp,
+                       'resource_id': models.Resource.resource_id}
+            keys = pagination.sort_keys + ['resource_id']
+            res_q = self._paginate(
+                res_q, pagination, [columns[k] for k in keys],
+                marker and [getattr(marker, self._RESOURCE_SORT_KEYS[k])
+                            for k in keys])
+
+        for res in res_q.all():
             yield api_models.Resource(
                 resource_id=res.resource_id,
                 project_id=res.project_id,
-                first_sample_timestamp=min_max.min_timestamp,
-                last_sample_timestamp=min_max.max_timestamp,
+                first_sample_timestamp=res.min_timestamp,
+                last_sample_timestamp=res.max_timestamp,
                 source=res.source_id,
                 user_id=res.user_id,
                 metadata=res.resource_metadata
@@ -470,11 +616,15 @@ class Connection(base.Connection):
         :param resource: Optional ID of the resource.
         :param source: Optional source filter.
         :param metaquery: Optional dict with metadata to match on.
-        :param pagination: Optional pagination query.
+        :param pagination: Optional pagination query, the meters are
+                           ordered by resource and name and the marker is
+                           the (resource_id, name) pair of a meter.
         """
 
-        if pagination:
-            raise ceilometer.NotImplementedError('Pagination not implemented')
+        if pagination and pagination.sort_keys:
+            raise ceilometer.NotImplementedError(
+                'Sorting meters by %s not implemented' %
+                ', '.join(pagination.sort_keys))
 
         s_filter = storage.SampleFilter(user=user,
                                         project=project,
@@ -491,6 +641,15 @@ class Connection(base.Connection):
             models.Sample.meter_id, models.Resource.resource_id)
         if resource:
             subq = subq.filter(models.Resource.resource_id == resource)
+        if pagination and pagination.marker_value:
+            # skip the resources of the previous pages
+            marker_resource = pagination.marker_value[0]
+            if pagination.primary_sort_dir == 'asc':
+                subq = subq.filter(
+                    models.Resource.resource_id >= marker_resource)
+            else:
+                subq = subq.filter(
+                    models.Resource.resource_id <= marker_resource)
         subq = subq.subquery()
 
         # get meter details for samples.
@@ -507,6 +666,11 @@ class Connection(base.Connection):
                   models.Resource.internal_id == models.Sample.resource_id))
         query_sample = make_query_from_filter(session, query_sample, s_filter,
                                               require_meter=False)
+        if pagination:
+            query_sample = self._paginate(
+                query_sample, pagination,
+                [models.Resource.resource_id, models.Meter.name],
+                pagination.marker_value)
 
         for row in query_sample.all():
             yield api_models.Meter(
@@ -518,11 +682,41 @@ class Connection(base.Connection):
                 source=row.source_id,
                 user_id=row.user_id)
 
+    @classmethod
+    def _retrieve_samples_by_chunks(cls, query, last=None, limit=None):
+        """Read the samples of a query by chunks.
+
+        The query is ordered by descending timestamp and id, and each
+        chunk is read by a query of its own starting after the last sample
+        of the previous chunk. Only a chunk of rows is then held in memory
+        as the samples are consumed, whereas most DBAPIs, MySQLdb included,
+        buffer the whole result of a query.
+
+        :param query: query of the samples, with their id.
+        :param last: (timestamp, id) of the sample preceding the first one.
+        :param limit: maximum number of samples to return.
+        """
+        while True:
+            size = min(_CHUNK_SIZE, limit) if limit else _CHUNK_SIZE
+            chunk = query
+            if last:
+                chunk = chunk.filter(sql_utils.keyset_criterion(
+                    [models.Sample.timestamp, models.Sample.id], last,
+                    'desc'))
+            rows = chunk.limit(size).all()
+            for sample in cls._retrieve_samples(rows):
+                yield sample
+            if len(rows) < size:
+                return
+            if limit:
+                limit -= len(rows)
+                if not limit:
+                    return
+            last = (rows[-1].timestamp, rows[-1].id)
+
     @staticmethod
     def _retrieve_samples(query):
-        samples = query.all()
-
-        for s in samples:
+        for s in query:
             # Remove the id generated by the database when
             # the sample was inserted. It is an implementation
             # detail that should not leak outside of the driver.
@@ -542,17 +736,26 @@ class Connection(base.Connection):
                 message_signature=s.message_signature,
             )
 
-    def get_samples(self, sample_filter, limit=None):
+    def get_samples(self, sample_filter, limit=None, marker=None):
         """Return an iterable of api_models.Samples.
 
         :param sample_filter: Filter.
         :param limit: Maximum number of results to return.
+        :param marker: Message ID of the last sample of the previous page,
+                       only the samples following it are returned.
         """
         if limit == 0:
             return []
 
         session = self._engine_facade.get_session()
-        query = session.query(models.Sample.timestamp,
+        last = None
+        if marker:
+            last = (session.query(models.Sample.timestamp, models.Sample.id).
+                    filter(models.Sample.message_id == marker).first())
+            if last is None:
+                raise base.NoResultFound()
+        query = session.query(models.Sample.id,
+                              models.Sample.timestamp,
                               models.Sample.recorded_at,
                               models.Sample.message_id,
                               models.Sample.message_signature,
@@ -568,12 +771,10 @@ class Connection(base.Connection):
             models.Meter, models.Meter.id == models.Sample.meter_id).join(
             models.Resource,
             models.Resource.internal_id == models.Sample.resource_id).order_by(
-            models.Sample.timestamp.desc())
+            models.Sample.timestamp.desc(), models.Sample.id.desc())
         query = make_query_from_filter(session, query, sample_filter,
                                        require_meter=False)
-        if limit:
-            query = query.limit(limit)
-        return self._retrieve_samples(query)
+        return self._retrieve_samples_by_chunks(query, last, limit)
 
     def query_samples(self, filter_expr=None, orderby=None, limit=None):
         if limit == 0:
@@ -586,7 +787,9 @@ class Connection(base.Connection):
             transformer.apply_filter(filter_expr)
 
         transformer.apply_options(orderby, limit)
-        return self._retrieve_samples(transformer.get_query())
+        query = transformer.get_query()
+        LOG.debug(_("Complex query of samples: %s"), query)
+        return self._retrieve_samples(query)
 
     @staticmethod
     def _get_aggregate_functions(aggregate):
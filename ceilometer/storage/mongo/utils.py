@@ -153,6 +153,23 @@ def make_query_from_filter(sample_filter, require_meter=True):
     return q
 
 
+def make_keyset_query(keys, values, sort_dir='asc'):
+    """Return a query selecting the documents following a marker document.
+
+    :param keys: keys by which the documents are ordered, all in the
+                 sort_dir direction.
+    :param values: values of the keys for the marker document.
+    :param sort_dir: direction in which the documents are ordered.
+    """
+    op = '$gt' if sort_dir == 'asc' else '$lt'
+    criteria = []
+    for i, key in enumerate(keys):
+        criterion = dict(zip(keys[:i], values[:i]))
+        criterion[key] = {op: values[i]}
+        criteria.append(criterion)
+    return {'$or': criteria}
+
+
 def quote_key(key, reverse=False):
     """Prepare key for storage data in MongoDB.
 
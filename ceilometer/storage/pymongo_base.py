@@ -27,9 +27,11 @@ from ceilometer import utils
 
 
 COMMON_AVAILABLE_CAPABILITIES = {
-    'meters': {'query': {'simple': True,
+    'meters': {'pagination': True,
+               'query': {'simple': True,
                          'metadata': True}},
-    'samples': {'query': {'simple': True,
+    'samples': {'pagination': True,
+                'query': {'simple': True,
                           'metadata': True,
                           'complex': True}},
 }
@@ -59,11 +61,15 @@ class Connection(base.Connection):
         :param resource: Optional resource filter.
         :param source: Optional source filter.
         :param metaquery: Optional dict with metadata to match on.
-        :param pagination: Optional pagination query.
+        :param pagination: Optional pagination query, the meters are
+                           ordered by resource and name and the marker is
+                           the (resource_id, name) pair of a meter.
         """
 
-        if pagination:
-            raise ceilometer.NotImplementedError('Pagination not implemented')
+        if pagination and pagination.sort_keys:
+            raise ceilometer.NotImplementedError(
+                'Sorting meters by %s not implemented' %
+                ', '.join(pagination.sort_keys))
 
         metaquery = pymongo_utils.improve_keys(metaquery, metaquery=True) or {}
 
@@ -78,8 +84,34 @@ class Connection(base.Connection):
             q['source'] = source
         q.update(metaquery)
 
-        for r in self.db.resource.find(q):
-            for r_meter in r['meter']:
+        if not pagination:
+            resources = self.db.resource.find(q)
+            limit = marker = None
+        else:
+            # the resources are read in order from the marker one, their
+            # meters being sorted by name
+            desc = pagination.primary_sort_dir == 'desc'
+            limit, marker = pagination.limit, pagination.marker_value
+            if marker:
+                q = {'$and': [q, {'_id': {'$lte' if desc else '$gte':
+                                          marker[0]}}]}
+            resources = self.db.resource.find(q, sort=[
+                ('_id', pymongo.DESCENDING if desc else pymongo.ASCENDING)])
+
+        count = 0
+        for r in resources:
+            meters = r['meter']
+            if pagination:
+                meters = sorted(meters, key=lambda m: m['counter_name'],
+                                reverse=desc)
+                if marker and r['_id'] == marker[0]:
+                    meters = [m for m in meters
+                              if (m['counter_name'] < marker[1] if desc
+                                  else m['counter_name'] > marker[1])]
+            for r_meter in meters:
+                if limit and count >= limit:
+                    return
+                count += 1
                 yield models.Meter(
                     name=r_meter['counter_name'],
                     type=r_meter['counter_type'],
@@ -92,19 +124,29 @@ class Connection(base.Connection):
                     user_id=r['user_id'],
                 )
 
-    def get_samples(self, sample_filter, limit=None):
+    def get_samples(self, sample_filter, limit=None, marker=None):
         """Return an iterable of model.Sample instances.
 
         :param sample_filter: Filter.
         :param limit: Maximum number of results to return.
+        :param marker: Message ID of the last sample of the previous page,
+                       only the samples following it are returned.
         """
         if limit == 0:
             return []
         q = pymongo_utils.make_query_from_filter(sample_filter,
                                                  require_meter=False)
+        if marker:
+            last = self.db.meter.find_one({'message_id': marker})
+            if last is None:
+                raise base.NoResultFound()
+            q = {'$and': [q, pymongo_utils.make_keyset_query(
+                ['timestamp', '_id'], [last['timestamp'], last['_id']],
+                'desc')]}
 
         return self._retrieve_samples(q,
-                                      [("timestamp", pymongo.DESCENDING)],
+                                      [("timestamp", pymongo.DESCENDING),
+                                       ("_id", pymongo.DESCENDING)],
                                       limit)
 
     def query_samples(self, filter_expr=None, orderby=None, limit=None):
@@ -0,0 +1,41 @@
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import json
+
+import sqlalchemy as sa
+
+
+def upgrade(migrate_engine):
+    meta = sa.MetaData(bind=migrate_engine)
+    alarm = sa.Table('alarm', meta, autoload=True)
+    sa.Column('meter_name', sa.String(255)).create(alarm)
+
+    # copy the meter name of the existing alarm rules in the column
+    query = sa.select([alarm.c.alarm_id, alarm.c.rule])
+    for alarm_id, rule in query.execute().fetchall():
+        rule = json.loads(rule) if rule else {}
+        (alarm.update().where(alarm.c.alarm_id == alarm_id).values(
+            meter_name=rule.get('meter_name')).execute())
+
+    sa.Index('ix_alarm_meter_name', alarm.c.meter_name).create()
+
+
+def downgrade(migrate_engine):
+    meta = sa.MetaData(bind=migrate_engine)
+    alarm = sa.Table('alarm', meta, autoload=True)
+    sa.Index('ix_alarm_meter_name', alarm.c.meter_name).drop()
+    # reload the table, so sqlite does not recreate the dropped index
+    meta = sa.MetaData(bind=migrate_engine)
+    alarm = sa.Table('alarm', meta, autoload=True)
+    alarm.c.meter_name.drop()
@@ -0,0 +1,31 @@
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import sqlalchemy as sa
+
+
+def upgrade(migrate_engine):
+    meta = sa.MetaData(bind=migrate_engine)
+    sample = sa.Table('sample', meta, autoload=True)
+    # the samples are paginated from the message id of the last sample of
+    # the previous page; the column is too long to be fully indexed by
+    # MySQL, the message ids being uuids a prefix is selective enough
+    sa.Index('ix_sample_message_id', sample.c.message_id,
+             mysql_length=100).create()
+
+
+def downgrade(migrate_engine):
+    meta = sa.MetaData(bind=migrate_engine)
+    sample = sa.Table('sample', meta, autoload=True)
+    sa.Index('ix_sample_message_id', sample.c.message_id,
+             mysql_length=100).drop()
@@ -213,7 +213,8 @@ class Sample(Base):
         Index('ix_sample_timestamp', 'timestamp'),
         Index('ix_sample_resource_id', 'resource_id'),
         Index('ix_sample_meter_id', 'meter_id'),
-        Index('ix_sample_meter_id_resource_id', 'meter_id', 'resource_id')
+        Index('ix_sample_meter_id_resource_id', 'meter_id', 'resource_id'),
+        Index('ix_sample_message_id', 'message_id', mysql_length=100)
     )
     id = Column(Integer, primary_key=True)
     meter_id = Column(Integer, ForeignKey('meter.id'))
@@ -257,6 +258,7 @@ class Alarm(Base):
     __table_args__ = (
         Index('ix_alarm_user_id', 'user_id'),
         Index('ix_alarm_project_id', 'project_id'),
+        Index('ix_alarm_meter_name', 'meter_name'),
     )
     alarm_id = Column(String(255), primary_key=True)
     enabled = Column(Boolean)
@@ -280,6 +282,9 @@ class Alarm(Base):
     rule = Column(JSONEncodedDict)
     time_constraints = Column(JSONEncodedDict)
 
+    # copy of the rule field queried on, kept in sync with the rule
+    meter_name = Column(String(255))
+
 
 class AlarmChange(Base):
     """Define AlarmChange data."""
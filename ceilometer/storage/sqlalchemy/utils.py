@@ -58,6 +58,7 @@ class QueryTransformer(object):
     def __init__(self, table, query):
         self.table = table
         self.query = query
+        self.meta_aliases = {}
 
     def _handle_complex_op(self, complex_op, nodes):
         op = self.complex_operators[complex_op]
@@ -85,14 +86,19 @@ class QueryTransformer(object):
 
         field_name = field_name[len('resource_metadata.'):]
         meta_table = META_TYPE_MAP[type(value)]
-        meta_alias = aliased(meta_table)
-        on_clause = and_(self.table.internal_id == meta_alias.id,
-                         meta_alias.meta_key == field_name)
-        # outer join is needed to support metaquery
-        # with or operator on non existent metadata field
-        # see: test_query_non_existing_metadata_with_result
-        # test case.
-        self.query = self.query.outerjoin(meta_alias, on_clause)
+        # a sample has at most one row per key in a meta table, so the
+        # predicates on the same key can share a single join
+        meta_alias = self.meta_aliases.get((meta_table, field_name))
+        if meta_alias is None:
+            meta_alias = aliased(meta_table)
+            on_clause = and_(self.table.internal_id == meta_alias.id,
+                             meta_alias.meta_key == field_name)
+            # outer join is needed to support metaquery
+            # with or operator on non existent metadata field
+            # see: test_query_non_existing_metadata_with_result
+            # test case.
+            self.query = self.query.outerjoin(meta_alias, on_clause)
+            self.meta_aliases[(meta_table, field_name)] = meta_alias
         return op(meta_alias.value, value)
 
     def _transform(self, sub_tree):
@@ -138,3 +144,19 @@ def trait_op_condition(conditions, trait_type, value, op='eq'):
                'ge': (trait_model >= value), 'ne': (trait_model != value)}
     conditions.append(op_dict[op])
     return conditions
+
+
+def keyset_criterion(columns, values, sort_dir='asc'):
+    """Return the criterion selecting the rows following a marker row.
+
+    The rows are ordered by the columns, all in the sort_dir direction,
+    values being the values of the columns for the marker row. Unlike an
+    offset, the criterion lets the database start reading from the marker
+    in an index on the columns.
+    """
+    op = operator.gt if sort_dir == 'asc' else operator.lt
+    criteria = []
+    for i, column in enumerate(columns):
+        equal = [c == v for c, v in zip(columns[:i], values[:i])]
+        criteria.append(and_(op(column, values[i]), *equal))
+    return or_(*criteria)
@@ -19,6 +19,7 @@
 """
 
 import datetime
+import json
 import uuid
 
 from ceilometerclient import exc
@@ -380,3 +381,72 @@ class TestEvaluate(base.TestEvaluatorBase):
                              "Alarm should not change state if the current "
                              " time is outside its time constraint.")
             self.assertEqual([], self.notifier.notify.call_args_list)
+
+    def test_prepared_states(self):
+        self._set_all_alarms('insufficient data')
+        # both combinations share their first sub-alarm
+        shared = self.alarms[0].rule['alarm_ids'][0]
+        self.alarms[1].rule['alarm_ids'][0] = shared
+        listed = [alarms.Alarm(None, {'alarm_id': alarm_id, 'state': 'ok'})
+                  for alarm_id in self.alarms[0].rule['alarm_ids']]
+        with mock.patch('ceilometerclient.client.get_client',
+                        return_value=self.api_client):
+            self.api_client.query_alarms.query.return_value = listed
+            self.api_client.alarms.get.return_value = self._get_alarm('ok')
+            self.evaluator.prepare(self.alarms)
+            self._evaluate_all_alarms()
+            # only the sub-alarms of the combinations are queried
+            alarm_ids = sorted(set(self.alarms[0].rule['alarm_ids'] +
+                                   self.alarms[1].rule['alarm_ids']))
+            self.assertEqual(3, len(alarm_ids))
+            self.api_client.query_alarms.query.assert_called_once_with(
+                filter=json.dumps({'in': {'alarm_id': alarm_ids}}))
+            # only the sub-alarm missing from the query is retrieved
+            self.api_client.alarms.get.assert_called_once_with(
+                self.alarms[1].rule['alarm_ids'][1])
+            expected = [mock.call(alarm.alarm_id, state='ok')
+                        for alarm in self.alarms]
+            update_calls = self.api_client.alarms.set_state.call_args_list
+            self.assertEqual(expected, update_calls)
+
+    def test_prepared_states_of_combinations(self):
+        self._set_all_alarms('insufficient data')
+        # the and-alarm combines the or-alarm
+        self.alarms[1].rule['alarm_ids'] = [self.alarms[0].alarm_id]
+        listed = [alarms.Alarm(None, {'alarm_id': alarm_id, 'state': 'alarm'})
+                  for alarm_id in self.alarms[0].rule['alarm_ids']]
+        listed.append(alarms.Alarm(None, {'alarm_id': self.alarms[0].alarm_id,
+                                          'state': 'insufficient data'}))
+        with mock.patch('ceilometerclient.client.get_client',
+                        return_value=self.api_client):
+            self.api_client.query_alarms.query.return_value = listed
+            self.evaluator.prepare(self.alarms)
+            self._evaluate_all_alarms()
+            self.assertFalse(self.api_client.alarms.get.called)
+            # the new state of the or-alarm is reused
+            self._assert_all_alarms('alarm')
+
+    def test_prepare_listing_failure(self):
+        self._set_all_alarms('insufficient data')
+        with mock.patch('ceilometerclient.client.get_client',
+                        return_value=self.api_client):
+            self.api_client.query_alarms.query.side_effect = Exception('boom')
+            self.api_client.alarms.get.return_value = self._get_alarm('ok')
+            self.evaluator.prepare(self.alarms)
+            self._evaluate_all_alarms()
+            self.assertEqual(4, self.api_client.alarms.get.call_count)
+            self._assert_all_alarms('ok')
+
+    def test_prepare_outside_time_constraints(self):
+        self.alarms[0].time_constraints = self.alarms[1].time_constraints = [
+            {'name': 'test',
+             'description': 'test',
+             'start': '0 11 * * *',  # daily at 11:00
+             'duration': 10800,  # 3 hours
+             'timezone': ''}]
+        timeutils.set_time_override(datetime.datetime(2014, 1, 1, 15))
+        self.addCleanup(timeutils.clear_time_override)
+        with mock.patch('ceilometerclient.client.get_client',
+                        return_value=self.api_client):
+            self.evaluator.prepare(self.alarms)
+            self.assertFalse(self.api_client.query_alarms.query.called)
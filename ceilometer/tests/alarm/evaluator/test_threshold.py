@@ -512,3 +512,132 @@ class TestEvaluate(base.TestEvaluatorBase):
                              "Alarm should not change state if the current "
                              " time is outside its time constraint.")
             self.assertEqual([], self.notifier.notify.call_args_list)
+
+
+class TestGroupedEvaluate(base.TestEvaluatorBase):
+    EVALUATOR = threshold.ThresholdEvaluator
+
+    def prepare_alarms(self):
+        self.alarms = [
+            models.Alarm(name='instance_%s_running_hot' % resource_id,
+                         description='instance_running_hot',
+                         type='threshold',
+                         enabled=True,
+                         user_id='foobar',
+                         project_id='snafu',
+                         alarm_id=str(uuid.uuid4()),
+                         state=state,
+                         state_timestamp=constants.MIN_DATETIME,
+                         timestamp=constants.MIN_DATETIME,
+                         insufficient_data_actions=[],
+                         ok_actions=[],
+                         alarm_actions=[],
+                         repeat_actions=False,
+                         time_constraints=[],
+                         rule=dict(
+                             comparison_operator='gt',
+                             threshold=80.0,
+                             evaluation_periods=evaluation_periods,
+                             statistic='avg',
+                             period=60,
+                             meter_name='cpu_util',
+                             query=[{'field': 'project_id',
+                                     'op': 'eq',
+                                     'value': 'snafu'},
+                                    {'field': 'resource_id',
+                                     'op': 'eq',
+                                     'value': resource_id}])
+                         )
+            for resource_id, evaluation_periods, state in [
+                ('a', 3, 'insufficient data'),
+                ('b', 3, 'ok'),
+                ('c', 5, 'insufficient data')]
+        ]
+
+    def setUp(self):
+        super(TestGroupedEvaluate, self).setUp()
+        self.now = datetime.datetime(2015, 1, 1, 12)
+        timeutils.set_time_override(self.now)
+        self.addCleanup(timeutils.clear_time_override)
+
+    def _get_stat(self, resource_id, minutes_ago, avg):
+        period_start = self.now - datetime.timedelta(minutes=minutes_ago)
+        return statistics.Statistics(None, {
+            'avg': avg, 'count': 1,
+            'period_start': period_start.isoformat(),
+            'groupby': {'resource_id': resource_id}})
+
+    def _evaluate_all_alarms(self):
+        self.evaluator.prepare(self.alarms)
+        super(TestGroupedEvaluate, self)._evaluate_all_alarms()
+
+    def test_shared_statistics_query(self):
+        stats = ([self._get_stat('a', m, 90.0) for m in moves.xrange(6, 0, -1)]
+                 + [self._get_stat('b', m, 90.0) for m in (6, 5)]
+                 + [self._get_stat('c', m, 10.0)
+                    for m in moves.xrange(6, 0, -1)])
+        with mock.patch('ceilometerclient.client.get_client',
+                        return_value=self.api_client):
+            self.api_client.statistics.list.return_value = stats
+            self._evaluate_all_alarms()
+
+        self.assertEqual(['alarm', 'insufficient data', 'ok'],
+                         [alarm.state for alarm in self.alarms])
+        self.api_client.statistics.list.assert_called_once_with(
+            meter_name='cpu_util', period=60, groupby=['resource_id'],
+            q=[{'field': 'project_id', 'op': 'eq', 'value': 'snafu'},
+               {'field': 'timestamp', 'op': 'le',
+                'value': self.now.isoformat()},
+               {'field': 'timestamp', 'op': 'ge',
+                'value': '2015-01-01T11:54:00'}])
+        # the statistics older than the window of an alarm are ignored
+        reason_data = [call[0][3] for call in
+                       self.notifier.notify.call_args_list]
+        self.assertEqual([3, 3, 5], [r['count'] for r in reason_data])
+
+    def test_not_shared_statistics_query(self):
+        self.alarms[1].rule['period'] = 300
+        self.alarms[2].rule['exclude_outliers'] = True
+        with mock.patch('ceilometerclient.client.get_client',
+                        return_value=self.api_client):
+            self.api_client.statistics.list.return_value = []
+            self._evaluate_all_alarms()
+
+        self._assert_all_alarms('insufficient data')
+        calls = self.api_client.statistics.list.call_args_list
+        self.assertEqual(3, len(calls))
+        for call in calls:
+            self.assertNotIn('groupby', call[1])
+
+    def test_unscoped_statistics_query_not_shared(self):
+        for alarm in self.alarms:
+            alarm.rule['query'] = [q for q in alarm.rule['query']
+                                   if q['field'] != 'project_id']
+        with mock.patch('ceilometerclient.client.get_client',
+                        return_value=self.api_client):
+            self.api_client.statistics.list.return_value = []
+            self._evaluate_all_alarms()
+
+        # without the project scope, a query grouped by resource would
+        # compute the statistics of every resource of the meter
+        calls = self.api_client.statistics.list.call_args_list
+        self.assertEqual(3, len(calls))
+        for call, resource_id in zip(calls, ['a', 'b', 'c']):
+            self.assertNotIn('groupby', call[1])
+            self.assertEqual('cpu_util', call[1]['meter_name'])
+            self.assertIn({'field': 'resource_id', 'op': 'eq',
+                           'value': resource_id}, call[1]['q'])
+
+    def test_shared_statistics_query_failure(self):
+        stats = [self._get_stat('a', m, 90.0) for m in moves.xrange(3, 0, -1)]
+        with mock.patch('ceilometerclient.client.get_client',
+                        return_value=self.api_client):
+            broken = exc.CommunicationError(message='broken')
+            self.api_client.statistics.list.side_effect = [broken, stats,
+                                                           [], []]
+            self._evaluate_all_alarms()
+
+        # each alarm falls back to its own statistics query
+        self.assertEqual(['alarm', 'insufficient data', 'insufficient data'],
+                         [alarm.state for alarm in self.alarms])
+        self.assertEqual(4, self.api_client.statistics.list.call_count)
@@ -16,6 +16,7 @@
 # under the License.
 """Tests for ceilometer/alarm/partition/coordination.py
 """
+import collections
 import datetime
 import logging
 import uuid
@@ -29,6 +30,7 @@ from ceilometer.alarm.partition import coordination
 from ceilometer.alarm.storage import models
 from ceilometer.tests import base as tests_base
 from ceilometer.tests import constants
+from ceilometer import utils
 
 
 class MockLoggingHandler(logging.Handler):
@@ -154,35 +156,38 @@ class TestCoordinate(tests_base.BaseTestCase):
         self.partition_coordinator.presence(pid, younger)
         return pid, younger
 
-    def _check_assignments(self, others, alarm_ids, per_worker,
-                           expect_uneffected=None):
-        rpc = self.partition_coordinator.coordination_rpc
-        calls = rpc.assign.call_args_list
-        return self._check_distribution(others, alarm_ids, per_worker, calls,
-                                        expect_uneffected or [])
+    def _expected_allocations(self, others, alarm_ids):
+        ring = utils.HashRing([self.partition_coordinator.this.uuid] +
+                              [pid for pid, _ in others])
+        allocations = collections.defaultdict(set)
+        for aid in alarm_ids:
+            allocations[ring.get_node(aid)].add(aid)
+        return allocations
 
-    def _check_allocation(self, others, alarm_ids, per_worker):
+    def _sent(self, *methods):
         rpc = self.partition_coordinator.coordination_rpc
-        calls = rpc.allocate.call_args_list
-        return self._check_distribution(others, alarm_ids, per_worker, calls)
-
-    def _check_distribution(self, others, alarm_ids, per_worker, calls,
-                            expect_uneffected=None):
-        expect_uneffected = expect_uneffected or []
-        uneffected = [pid for pid, _ in others]
-        uneffected.extend(expect_uneffected)
-        remainder = list(alarm_ids)
-        for call in calls:
-            args, _ = call
-            target, alarms = args
-            self.assertIn(target, uneffected)
-            uneffected.remove(target)
-            self.assertEqual(per_worker, len(alarms))
-            for aid in alarms:
-                self.assertIn(aid, remainder)
-                remainder.remove(aid)
-        self.assertEqual(set(expect_uneffected), set(uneffected))
-        return remainder
+        sent = collections.defaultdict(set)
+        for method in methods:
+            for call in getattr(rpc, method).call_args_list:
+                args, _ = call
+                target, alarms, version = args
+                sent[target].update(alarms)
+        return sent
+
+    def _check_assignments(self, others, alarm_ids):
+        expected = self._expected_allocations(others, alarm_ids)
+        assigned = self._sent('assign', 'allocate')
+        self.assertEqual(set(pid for pid, _ in others), set(assigned))
+        for pid, _ in others:
+            self.assertEqual(expected[pid], assigned[pid])
+        self.assertEqual(expected[self.partition_coordinator.this.uuid],
+                         self.partition_coordinator.assignment)
+
+    def _report_versions(self, others):
+        versions = self.partition_coordinator.versions
+        for pid, younger in others:
+            self.partition_coordinator.presence(pid, younger,
+                                                versions.get(pid))
 
     def _forget_assignments(self, expected_assignments):
         rpc = self.partition_coordinator.coordination_rpc
@@ -259,9 +264,33 @@ class TestCoordinate(tests_base.BaseTestCase):
 
         self._check_mastership(True)
 
-        remainder = self._check_assignments(others, alarm_ids, 10)
-        self.assertEqual(set(self.partition_coordinator.assignment),
-                         set(remainder))
+        self._check_assignments(others, alarm_ids)
+
+    def test_paged_distribution(self):
+        self.CONF.set_override('partition_page_size', 4, group='alarm')
+        alarm_ids = self._some_alarms(49)
+
+        self._advance_time(3)
+
+        others = [self._new_partition(i) for i in moves.xrange(1, 5)]
+
+        self._check_mastership(True)
+
+        self._check_assignments(others, alarm_ids)
+        rpc = self.partition_coordinator.coordination_rpc
+        for pid, _ in others:
+            calls = [c for c in (rpc.assign.call_args_list +
+                                 rpc.allocate.call_args_list)
+                     if c[0][0] == pid]
+            allocation = self.partition_coordinator.allocations[pid]
+            self.assertEqual((len(allocation) + 3) // 4, len(calls))
+            for call in calls:
+                self.assertTrue(len(call[0][1]) <= 4)
+            # only the last page carries the version of the allocation
+            versions = [c[0][2] for c in calls]
+            self.assertEqual(self.partition_coordinator.versions[pid],
+                             versions[-1])
+            self.assertEqual([None] * (len(calls) - 1), versions[:-1])
 
     def test_rebalance_on_partition_startup(self):
         alarm_ids = self._some_alarms(49)
@@ -272,14 +301,24 @@ class TestCoordinate(tests_base.BaseTestCase):
 
         self._check_mastership(True)
 
-        self. _forget_assignments(4)
+        self._forget_assignments(4)
+        self._report_versions(others)
+        previous = self._expected_allocations(others, alarm_ids)
 
         others.append(self._new_partition(5))
         self._check_mastership(True)
 
-        remainder = self._check_assignments(others, alarm_ids, 9)
-        self.assertEqual(set(self.partition_coordinator.assignment),
-                         set(remainder))
+        new_pid = others[-1][0]
+        expected = self._expected_allocations(others, alarm_ids)
+        # only the new partition is assigned its whole allocation
+        self.assertEqual({new_pid: expected[new_pid]}, self._sent('assign'))
+        self.assertEqual({}, self._sent('allocate'))
+        # the other partitions only loose the alarms moving to it
+        for pid, alarms in self._sent('deallocate').items():
+            self.assertEqual(previous[pid] - expected[pid], alarms)
+            self.assertTrue(alarms <= expected[new_pid])
+        self.assertEqual(expected[self.partition_coordinator.this.uuid],
+                         self.partition_coordinator.assignment)
 
     def test_rebalance_on_partition_staleness(self):
         alarm_ids = self._some_alarms(49)
@@ -291,18 +330,26 @@ class TestCoordinate(tests_base.BaseTestCase):
         self._check_mastership(True)
 
         self. _forget_assignments(4)
+        self._report_versions(others)
+        previous = self._expected_allocations(others, alarm_ids)
 
         self._advance_time(4)
 
         stale, _ = others.pop()
-        for pid, younger in others:
-            self.partition_coordinator.presence(pid, younger)
+        self._report_versions(others)
 
         self._check_mastership(True)
 
-        remainder = self._check_assignments(others, alarm_ids, 13, [stale])
-        self.assertEqual(set(self.partition_coordinator.assignment),
-                         set(remainder))
+        expected = self._expected_allocations(others, alarm_ids)
+        self.assertEqual({}, self._sent('assign'))
+        self.assertEqual({}, self._sent('deallocate'))
+        # the other partitions only gain the alarms of the stale one
+        for pid, alarms in self._sent('allocate').items():
+            self.assertNotEqual(stale, pid)
+            self.assertEqual(expected[pid] - previous[pid], alarms)
+            self.assertTrue(alarms <= previous[stale])
+        self.assertEqual(expected[self.partition_coordinator.this.uuid],
+                         self.partition_coordinator.assignment)
 
     def test_rebalance_on_sufficient_deletion(self):
         alarm_ids = self._some_alarms(49)
@@ -314,14 +361,26 @@ class TestCoordinate(tests_base.BaseTestCase):
         self._check_mastership(True)
 
         self._forget_assignments(4)
+        self._report_versions(others)
 
-        alarm_ids = self._dump_alarms(len(alarm_ids) / 2)
+        remaining_ids = self._dump_alarms(len(alarm_ids) / 2)
 
         self._check_mastership(True)
 
-        remainder = self._check_assignments(others, alarm_ids, 5)
-        self.assertEqual(set(self.partition_coordinator.assignment),
-                         set(remainder))
+        deleted = set(alarm_ids) - set(remaining_ids)
+        self.assertEqual({}, self._sent('assign'))
+        self.assertEqual({}, self._sent('allocate'))
+        deallocated = set()
+        for alarms in self._sent('deallocate').values():
+            deallocated.update(alarms)
+        expected = self._expected_allocations(others, alarm_ids)
+        self.assertEqual(
+            deleted - expected[self.partition_coordinator.this.uuid],
+            deallocated)
+        self.assertEqual(
+            self._expected_allocations(
+                others, remaining_ids)[self.partition_coordinator.this.uuid],
+            self.partition_coordinator.assignment)
 
     def test_no_rebalance_on_insufficient_deletion(self):
         alarm_ids = self._some_alarms(49)
@@ -333,16 +392,20 @@ class TestCoordinate(tests_base.BaseTestCase):
         self._check_mastership(True)
 
         self._forget_assignments(4)
+        self._report_versions(others)
 
-        alarm_ids = self._dump_alarms(45)
+        self._dump_alarms(45)
 
         self._check_mastership(True)
 
-        expect_uneffected = [pid for pid, _ in others]
-        self._check_assignments(others, alarm_ids, 10, expect_uneffected)
+        rpc = self.partition_coordinator.coordination_rpc
+        self.assertEqual([], rpc.method_calls)
+        expected = self._expected_allocations(others, alarm_ids)
+        self.assertEqual(expected[self.partition_coordinator.this.uuid],
+                         self.partition_coordinator.assignment)
 
     def test_no_rebalance_on_creation(self):
-        self._some_alarms(49)
+        alarm_ids = self._some_alarms(49)
 
         self._advance_time(3)
 
@@ -351,16 +414,46 @@ class TestCoordinate(tests_base.BaseTestCase):
         self._check_mastership(True)
 
         self._forget_assignments(4)
+        self._report_versions(others)
 
         new_alarm_ids = self._add_alarms(8)
 
-        master_assignment = set(self.partition_coordinator.assignment)
         self._check_mastership(True)
 
-        remainder = self._check_allocation(others, new_alarm_ids, 2)
-        self.assertEqual(0, len(remainder))
-        self.assertEqual(set(self.partition_coordinator.assignment),
-                         master_assignment)
+        expected = self._expected_allocations(others, new_alarm_ids)
+        self.assertEqual({}, self._sent('assign'))
+        self.assertEqual({}, self._sent('deallocate'))
+        for pid, alarms in self._sent('allocate').items():
+            self.assertEqual(expected[pid], alarms)
+        self.assertEqual(
+            self._expected_allocations(
+                others, alarm_ids + new_alarm_ids)[
+                    self.partition_coordinator.this.uuid],
+            self.partition_coordinator.assignment)
+
+    def test_reassign_on_version_mismatch(self):
+        alarm_ids = self._some_alarms(49)
+
+        self._advance_time(3)
+
+        others = [self._new_partition(i) for i in moves.xrange(1, 5)]
+
+        self._check_mastership(True)
+
+        self._forget_assignments(4)
+        self._report_versions(others[1:])
+        self._advance_time(0.25)
+        # the first partition missed its allocation
+        self.partition_coordinator.presence(others[0][0], others[0][1],
+                                            None)
+
+        self._check_mastership(True)
+
+        expected = self._expected_allocations(others, alarm_ids)
+        self.assertEqual({others[0][0]: expected[others[0][0]]},
+                         self._sent('assign'))
+        self.assertEqual({}, self._sent('allocate'))
+        self.assertEqual({}, self._sent('deallocate'))
 
     def test_bail_when_overtaken_in_distribution(self):
         self._some_alarms(49)
@@ -416,6 +509,25 @@ class TestCoordinate(tests_base.BaseTestCase):
         alarms = self.partition_coordinator.assigned_alarms(self.api_client)
         self.assertEqual(self._current_alarms(), alarms)
 
+    def test_assigned_alarms_deallocation(self):
+        alarm_ids = self._some_alarms(6)
+
+        uuid = self.partition_coordinator.this.uuid
+        self.partition_coordinator.assign(uuid, alarm_ids)
+        self.partition_coordinator.deallocate(uuid, alarm_ids[3:], 'v2')
+
+        alarms = self.partition_coordinator.assigned_alarms(self.api_client)
+        self.assertEqual(self._current_alarms()[:3], alarms)
+        self.assertEqual('v2', self.partition_coordinator.assignment_version)
+
+    def test_report_presence_version(self):
+        uuid = self.partition_coordinator.this.uuid
+        self.partition_coordinator.assign(uuid, ['a'], 'v1')
+        self.partition_coordinator.report_presence()
+        rpc = self.partition_coordinator.coordination_rpc
+        rpc.presence.assert_called_once_with(
+            uuid, self.partition_coordinator.this.priority, 'v1')
+
     def test__record_oldest(self):
         # Test when the partition to be recorded is the same as the oldest.
         self.partition_coordinator._record_oldest(
@@ -16,8 +16,12 @@
 # under the License.
 """Tests for ceilometer.alarm.service.SingletonAlarmService.
 """
+import datetime
+
+import eventlet
 import mock
 from oslo.config import fixture as fixture_config
+from oslo.utils import timeutils
 from stevedore import extension
 
 from ceilometer.alarm import service
@@ -136,6 +140,105 @@ class TestAlarmEvaluationService(tests_base.BaseTestCase):
             self.svc._evaluate_assigned_alarms()
             self.threshold_eval.evaluate.assert_called_once_with(alarms[1])
 
+    def test_evaluators_prepared(self):
+        alarms = [
+            mock.Mock(type='not_existing_type'),
+            mock.Mock(type='threshold'),
+            mock.Mock(type='threshold'),
+        ]
+
+        self.api_client.alarms.list.return_value = alarms
+        self.threshold_eval.prepare.side_effect = Exception('Boom!')
+        with mock.patch('ceilometerclient.client.get_client',
+                        return_value=self.api_client):
+            self.svc.start()
+            self.svc._evaluate_assigned_alarms()
+            self.threshold_eval.prepare.assert_called_once_with(alarms[1:])
+            self.assertEqual([mock.call(alarms[1]), mock.call(alarms[2])],
+                             self.threshold_eval.evaluate.call_args_list)
+
+    def test_combinations_evaluated_last(self):
+        combination_eval = mock.Mock()
+        self.svc.evaluators = extension.ExtensionManager.make_test_instance(
+            [extension.Extension('threshold', None, None,
+                                 self.threshold_eval),
+             extension.Extension('combination', None, None,
+                                 combination_eval)])
+        self.svc.supported_evaluators = ['threshold', 'combination']
+        alarms = [mock.Mock(type='combination'),
+                  mock.Mock(type='threshold'),
+                  mock.Mock(type='threshold')]
+        calls = []
+        self.threshold_eval.evaluate.side_effect = (
+            lambda alarm: calls.append(('evaluate', alarm)))
+        combination_eval.prepare.side_effect = (
+            lambda alarms: calls.append(('prepare', alarms)))
+        combination_eval.evaluate.side_effect = (
+            lambda alarm: calls.append(('evaluate', alarm)))
+        self._evaluate(alarms)
+        self.threshold_eval.prepare.assert_called_once_with(alarms[1:])
+        # the combination is prepared once the threshold alarms have
+        # transitioned to their new state
+        self.assertEqual([('evaluate', alarms[1]),
+                          ('evaluate', alarms[2]),
+                          ('prepare', alarms[:1]),
+                          ('evaluate', alarms[0])], calls)
+
+    def _evaluate(self, alarms):
+        self.api_client.alarms.list.return_value = alarms
+        with mock.patch('ceilometerclient.client.get_client',
+                        return_value=self.api_client):
+            self.svc._evaluate_assigned_alarms()
+
+    def test_alarms_evaluated_concurrently(self):
+        self.CONF.set_override('evaluation_workers', 2, group='alarm')
+        alarms = [mock.Mock(type='threshold') for _i in range(3)]
+        running = []
+        concurrency = []
+
+        def evaluate(alarm):
+            running.append(alarm)
+            concurrency.append(len(running))
+            eventlet.sleep(0)
+            running.remove(alarm)
+
+        self.threshold_eval.evaluate.side_effect = evaluate
+        self._evaluate(alarms)
+        self.assertEqual([mock.call(alarm) for alarm in alarms],
+                         self.threshold_eval.evaluate.call_args_list)
+        self.assertEqual(2, max(concurrency))
+
+    def test_alarm_evaluation_timeout(self):
+        self.CONF.set_override('evaluation_timeout', 0.01, group='alarm')
+        alarms = [mock.Mock(type='threshold', name='slow'),
+                  mock.Mock(type='threshold', name='fast')]
+        self.threshold_eval.evaluate.side_effect = (
+            lambda alarm: alarm is alarms[0] and eventlet.sleep(10))
+        with eventlet.Timeout(5):
+            self._evaluate(alarms)
+        self.assertEqual(2, self.threshold_eval.evaluate.call_count)
+
+    def test_overrun_alarms_skipped(self):
+        self.CONF.set_override('evaluation_interval', 60, group='alarm')
+        self.CONF.set_override('evaluation_workers', 1, group='alarm')
+        timeutils.set_time_override(datetime.datetime(2015, 1, 1))
+        self.addCleanup(timeutils.clear_time_override)
+        alarms = [mock.Mock(type='threshold') for _i in range(3)]
+
+        def evaluate(alarm):
+            timeutils.advance_time_seconds(40)
+
+        self.threshold_eval.evaluate.side_effect = evaluate
+        self._evaluate(alarms)
+        self.assertEqual([mock.call(alarms[0]), mock.call(alarms[1])],
+                         self.threshold_eval.evaluate.call_args_list)
+
+        # the skipped alarm is evaluated first during the next cycle
+        self.threshold_eval.evaluate.reset_mock()
+        self._evaluate(alarms)
+        self.assertEqual([mock.call(alarms[2]), mock.call(alarms[0])],
+                         self.threshold_eval.evaluate.call_args_list)
+
     def test_singleton_endpoint_types(self):
         endpoint_types = ["internalURL", "publicURL"]
         for endpoint_type in endpoint_types:
@@ -15,14 +15,19 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import threading
+
+import eventlet
 import mock
 from oslo.config import fixture as fixture_config
 from oslo.serialization import jsonutils
 from oslo_context import context
 from oslotest import mockpatch
 import requests
+from six import moves
 import six.moves.urllib.parse as urlparse
 
+from ceilometer.alarm.notifier import rest
 from ceilometer.alarm import service
 from ceilometer.tests import base as tests_base
 
@@ -117,7 +122,7 @@ class TestAlarmNotifier(tests_base.BaseTestCase):
                 self.service.notify_alarm(context.get_admin_context(),
                                           self._notification(action))
                 poster.assert_called_with(action, data=mock.ANY,
-                                          headers=mock.ANY)
+                                          headers=mock.ANY, timeout=30.0)
                 args, kwargs = poster.call_args
                 self.assertEqual(self.HTTP_HEADERS, kwargs['headers'])
                 self.assertEqual(DATA_JSON, jsonutils.loads(kwargs['data']))
@@ -134,7 +139,7 @@ class TestAlarmNotifier(tests_base.BaseTestCase):
                 self.service.notify_alarm(context.get_admin_context(),
                                           self._notification(action))
                 poster.assert_called_with(action, data=mock.ANY,
-                                          headers=mock.ANY,
+                                          headers=mock.ANY, timeout=30.0,
                                           cert=certificate, verify=True)
                 args, kwargs = poster.call_args
                 self.assertEqual(self.HTTP_HEADERS, kwargs['headers'])
@@ -155,7 +160,7 @@ class TestAlarmNotifier(tests_base.BaseTestCase):
                 self.service.notify_alarm(context.get_admin_context(),
                                           self._notification(action))
                 poster.assert_called_with(action, data=mock.ANY,
-                                          headers=mock.ANY,
+                                          headers=mock.ANY, timeout=30.0,
                                           cert=(certificate, key), verify=True)
                 args, kwargs = poster.call_args
                 self.assertEqual(self.HTTP_HEADERS, kwargs['headers'])
@@ -172,7 +177,7 @@ class TestAlarmNotifier(tests_base.BaseTestCase):
                 self.service.notify_alarm(context.get_admin_context(),
                                           self._notification(action))
                 poster.assert_called_with(action, data=mock.ANY,
-                                          headers=mock.ANY,
+                                          headers=mock.ANY, timeout=30.0,
                                           verify=False)
                 args, kwargs = poster.call_args
                 self.assertEqual(self.HTTP_HEADERS, kwargs['headers'])
@@ -186,7 +191,7 @@ class TestAlarmNotifier(tests_base.BaseTestCase):
                 self.service.notify_alarm(context.get_admin_context(),
                                           self._notification(action))
                 poster.assert_called_with(action, data=mock.ANY,
-                                          headers=mock.ANY,
+                                          headers=mock.ANY, timeout=30.0,
                                           verify=False)
                 args, kwargs = poster.call_args
                 self.assertEqual(self.HTTP_HEADERS, kwargs['headers'])
@@ -203,7 +208,7 @@ class TestAlarmNotifier(tests_base.BaseTestCase):
                 self.service.notify_alarm(context.get_admin_context(),
                                           self._notification(action))
                 poster.assert_called_with(action, data=mock.ANY,
-                                          headers=mock.ANY,
+                                          headers=mock.ANY, timeout=30.0,
                                           verify=True)
                 args, kwargs = poster.call_args
                 self.assertEqual(self.HTTP_HEADERS, kwargs['headers'])
@@ -258,7 +263,210 @@ class TestAlarmNotifier(tests_base.BaseTestCase):
                 headers = {'X-Auth-Token': 'token_1234'}
                 headers.update(self.HTTP_HEADERS)
                 poster.assert_called_with(
-                    url, data=mock.ANY, headers=mock.ANY)
+                    url, data=mock.ANY, headers=mock.ANY, timeout=30.0)
                 args, kwargs = poster.call_args
                 self.assertEqual(headers, kwargs['headers'])
                 self.assertEqual(DATA_JSON, jsonutils.loads(kwargs['data']))
+
+
+class TestRestAlarmNotifier(tests_base.BaseTestCase):
+    """Notify a local stand-in of a REST endpoint."""
+
+    def setUp(self):
+        super(TestRestAlarmNotifier, self).setUp()
+        self.CONF = self.useFixture(fixture_config.Config()).conf
+        self.CONF.set_override('rest_notifier_retry_delay', 0.01,
+                               group='alarm')
+        rest._DISPATCHER = None
+        self.addCleanup(setattr, rest, '_DISPATCHER', None)
+        test = self
+        self.received = []
+        self.connections = []
+        self.failures = 0
+        # statuses answered before the notifications are accepted
+        self.statuses = []
+        # released to answer the notifications sent to /hang
+        self.hanging = threading.Event()
+
+        class Handler(moves.BaseHTTPServer.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                test.connections.append(self.client_address)
+                moves.BaseHTTPServer.BaseHTTPRequestHandler.setup(self)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                if self.path == '/hang':
+                    test.hanging.wait()
+                    self.close_connection = 1
+                    return
+                if test.failures:
+                    # drop the connection without any response
+                    test.failures -= 1
+                    self.close_connection = 1
+                    return
+                if test.statuses:
+                    self.send_response(test.statuses.pop(0))
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                test.received.append(jsonutils.loads(body))
+                self.send_response(200)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        class Server(moves.socketserver.ThreadingMixIn,
+                     moves.BaseHTTPServer.HTTPServer):
+            daemon_threads = True
+
+        self.server = Server(('127.0.0.1', 0), Handler)
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.addCleanup(self.hanging.set)
+        self.action = urlparse.urlsplit('http://127.0.0.1:%d/action' %
+                                        self.server.server_port)
+
+    def _notify(self, alarm_id, current='alarm'):
+        rest.RestAlarmNotifier.notify(self.action, alarm_id, 'testalarm',
+                                      'ok', current, 'what ?', {})
+
+    @staticmethod
+    def _wait():
+        dispatcher = rest._get_dispatcher()
+        with eventlet.Timeout(5):
+            while dispatcher.workers:
+                eventlet.sleep(0.01)
+        return dispatcher
+
+    def test_notifications_sent(self):
+        self.CONF.set_override('rest_notifier_workers', 1, group='alarm')
+        for alarm_id in ('a', 'b', 'c'):
+            self._notify(alarm_id)
+        dispatcher = self._wait()
+        self.assertEqual(['a', 'b', 'c'],
+                         [body['alarm_id'] for body in self.received])
+        self.assertEqual(3, dispatcher.queued)
+        self.assertEqual(3, dispatcher.sent)
+        self.assertEqual(0, dispatcher.failed)
+        # the connection to the destination is reused
+        self.assertEqual(1, len(self.connections))
+
+    def test_notification_retried(self):
+        self.CONF.set_override('rest_notifier_max_retries', 2, group='alarm')
+        self.failures = 2
+        self._notify('a')
+        dispatcher = self._wait()
+        self.assertEqual(['a'], [body['alarm_id'] for body in self.received])
+        self.assertEqual(1, dispatcher.sent)
+        self.assertEqual(0, dispatcher.failed)
+
+    def test_notification_failed(self):
+        self.CONF.set_override('rest_notifier_max_retries', 1, group='alarm')
+        self.failures = 2
+        self._notify('a')
+        dispatcher = self._wait()
+        self.assertEqual([], self.received)
+        self.assertEqual(0, dispatcher.sent)
+        self.assertEqual(1, dispatcher.failed)
+
+    def test_server_error_retried(self):
+        self.CONF.set_override('rest_notifier_max_retries', 2, group='alarm')
+        self.statuses = [503, 500]
+        self._notify('a')
+        dispatcher = self._wait()
+        self.assertEqual(['a'], [body['alarm_id'] for body in self.received])
+        self.assertEqual(1, dispatcher.sent)
+        self.assertEqual(0, dispatcher.failed)
+
+    def test_client_error_not_retried(self):
+        self.CONF.set_override('rest_notifier_max_retries', 2, group='alarm')
+        self.statuses = [404]
+        self._notify('a')
+        dispatcher = self._wait()
+        self.assertEqual([], self.received)
+        self.assertEqual([], self.statuses)
+        self.assertEqual(0, dispatcher.sent)
+        self.assertEqual(1, dispatcher.failed)
+        # the notification was rejected once, without any retry
+        self.assertEqual(1, len(self.connections))
+
+    def test_hanging_destination_timed_out(self):
+        self.CONF.set_override('rest_notifier_workers', 1, group='alarm')
+        self.CONF.set_override('rest_notifier_timeout', 0.2, group='alarm')
+        hanging = urlparse.urlsplit('http://127.0.0.1:%d/hang' %
+                                    self.server.server_port)
+        rest.RestAlarmNotifier.notify(hanging, 'a', 'testalarm', 'ok',
+                                      'alarm', 'what ?', {})
+        self._notify('b')
+        # the only worker is released by the timeout and sends the queue
+        dispatcher = self._wait()
+        self.assertEqual(['b'], [body['alarm_id'] for body in self.received])
+        self.assertEqual(1, dispatcher.sent)
+        self.assertEqual(1, dispatcher.failed)
+
+    def test_sessions_bounded(self):
+        dispatcher = rest._get_dispatcher()
+        dispatcher.max_sessions = 2
+        with dispatcher._session('http://a/action') as first:
+            with dispatcher._session('http://b/action'):
+                pass
+            # a destination in use is kept
+            with mock.patch.object(requests.Session, 'close') as close:
+                with dispatcher._session('https://c/action'):
+                    pass
+            close.assert_called_once_with()
+            self.assertEqual([('http', 'a'), ('https', 'c')],
+                             list(dispatcher.sessions))
+            with dispatcher._session('http://a/other') as session:
+                self.assertIs(first, session)
+
+        # over the limit while the sessions are in use
+        with dispatcher._session('http://a/action'):
+            with dispatcher._session('https://c/action'):
+                with dispatcher._session('http://d/action'):
+                    self.assertEqual(3, len(dispatcher.sessions))
+        self.assertEqual({}, dict(dispatcher.in_use))
+        with dispatcher._session('http://e/action'):
+            pass
+        self.assertEqual([('http', 'd'), ('http', 'e')],
+                         list(dispatcher.sessions))
+
+    def test_notifications_coalesced(self):
+        self.CONF.set_override('rest_notifier_workers', 1, group='alarm')
+        with mock.patch('eventlet.spawn_n') as spawn_n:
+            self._notify('a', current='alarm')
+            self._notify('b')
+            self._notify('a', current='ok')
+        self.assertEqual(1, spawn_n.call_count)
+        dispatcher = rest._get_dispatcher()
+        self.assertEqual(2, dispatcher.queued)
+        self.assertEqual(1, dispatcher.coalesced)
+
+        dispatcher.workers = 0
+        spawn_n.call_args[0][0]()
+        self.assertEqual([('a', 'ok'), ('b', 'alarm')],
+                         [(body['alarm_id'], body['current'])
+                          for body in self.received])
+        self.assertEqual(2, dispatcher.sent)
+
+    def test_retry_backoff(self):
+        self.CONF.set_override('rest_notifier_max_retries', 3, group='alarm')
+        self.CONF.set_override('rest_notifier_retry_delay', 1.0,
+                               group='alarm')
+        dispatcher = rest._get_dispatcher()
+        with mock.patch.object(requests.Session, 'post',
+                               side_effect=requests.ConnectionError()):
+            with mock.patch('eventlet.sleep') as sleep:
+                dispatcher._post(self.action.geturl(), 'a', {})
+        delays = [call[0][0] for call in sleep.call_args_list]
+        self.assertEqual(3, len(delays))
+        for delay, base in zip(delays, [1, 2, 4]):
+            self.assertTrue(base * 0.5 <= delay <= base * 1.5)
+        self.assertEqual(1, dispatcher.failed)
@@ -88,20 +88,29 @@ class TestPartitionedAlarmService(tests_base.BaseTestCase):
     def test_presence_reporting(self):
         priority = 42
         self.partitioned.presence(mock.Mock(),
-                                  dict(uuid='uuid', priority=priority))
+                                  dict(uuid='uuid', priority=priority,
+                                       version='v1'))
         pc = self.partitioned.partition_coordinator
-        pc.presence.assert_called_once_with('uuid', priority)
+        pc.presence.assert_called_once_with('uuid', priority, 'v1')
 
     def test_alarm_assignment(self):
         alarms = [mock.Mock()]
         self.partitioned.assign(mock.Mock(),
                                 dict(uuid='uuid', alarms=alarms))
         pc = self.partitioned.partition_coordinator
-        pc.assign.assert_called_once_with('uuid', alarms)
+        pc.assign.assert_called_once_with('uuid', alarms, None)
 
     def test_alarm_allocation(self):
         alarms = [mock.Mock()]
         self.partitioned.allocate(mock.Mock(),
                                   dict(uuid='uuid', alarms=alarms))
         pc = self.partitioned.partition_coordinator
-        pc.allocate.assert_called_once_with('uuid', alarms)
+        pc.allocate.assert_called_once_with('uuid', alarms, None)
+
+    def test_alarm_deallocation(self):
+        alarms = [mock.Mock()]
+        self.partitioned.deallocate(mock.Mock(),
+                                    dict(uuid='uuid', alarms=alarms,
+                                         version='v1'))
+        pc = self.partitioned.partition_coordinator
+        pc.deallocate.assert_called_once_with('uuid', alarms, 'v1')
@@ -163,6 +163,9 @@ class FakeCoordinator(object):
     def assign(self, context, data):
         self._record('assign', data)
 
+    def deallocate(self, context, data):
+        self._record('deallocate', data)
+
     def _record(self, method, data):
         self.notified.append((method, data))
         self.rpc.stop()
@@ -241,3 +244,13 @@ class TestRPCAlarmPartitionCoordination(tests_base.BaseTestCase):
         self.assertEqual(id, args['uuid'])
         self.assertEqual(2, len(args['alarms']))
         self.assertEqual('allocate', method)
+
+    def test_coordination_deallocate(self):
+        id = str(uuid.uuid4())
+        self.coordination.deallocate(id, self.alarms, 'v1')
+        self.coordinator_server.rpc.wait()
+        method, args = self.coordinator_server.notified[0]
+        self.assertEqual(id, args['uuid'])
+        self.assertEqual(2, len(args['alarms']))
+        self.assertEqual('v1', args['version'])
+        self.assertEqual('deallocate', method)
@@ -71,6 +71,19 @@ class TestSingletonAlarmService(tests_base.BaseTestCase):
             self.singleton._evaluate_assigned_alarms()
             self.threshold_eval.evaluate.assert_called_once_with(alarm)
 
+    def test_evaluation_cycle_storage_backend(self):
+        self.CONF.set_override('evaluation_backend', 'storage',
+                               group='alarm')
+        alarm = mock.Mock(type='threshold')
+        self.api_client.alarms.list.return_value = [alarm]
+        with mock.patch('ceilometer.alarm.storage_client.get_client',
+                        return_value=self.api_client):
+            with mock.patch('ceilometerclient.client.get_client') as client:
+                self.singleton._evaluate_assigned_alarms()
+                self.assertFalse(client.called)
+            self.threshold_eval.evaluate.assert_called_once_with(alarm)
+            self.api_client.flush.assert_called_once_with()
+
     def test_evaluation_cycle_with_bad_alarm(self):
         alarms = [
             mock.Mock(type='threshold', name='bad'),
@@ -0,0 +1,224 @@
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+"""Tests for ceilometer/alarm/storage_client.py
+"""
+import datetime
+import json
+
+import mock
+from oslo.config import fixture as fixture_config
+from oslo.utils import timeutils
+from oslotest import base
+from oslotest import mockpatch
+
+import ceilometer
+from ceilometer.alarm.storage import models as alarm_models
+from ceilometer.alarm import storage_client
+from ceilometer import messaging
+from ceilometer import storage
+from ceilometer.storage import models
+
+
+class TestQueryToKwargs(base.BaseTestCase):
+
+    def test_query(self):
+        kwargs = storage_client._query_to_kwargs(
+            [{'field': 'resource_id', 'op': 'eq', 'value': 'my_instance'},
+             {'field': 'metadata.user_metadata.AS', 'value': 'my_group'},
+             {'field': 'metadata.size', 'value': '5'},
+             {'field': 'resource_metadata.flavor', 'value': '5',
+              'type': 'string'},
+             {'field': 'timestamp', 'op': 'ge',
+              'value': '2015-01-01T11:54:00'},
+             {'field': 'timestamp', 'op': 'le',
+              'value': '2015-01-01T12:00:00+00:00'}],
+            storage_client.StatisticsManager.translation)
+        self.assertEqual(
+            {'resource': 'my_instance',
+             'metaquery': {'metadata.user_metadata.AS': 'my_group',
+                           'metadata.size': 5,
+                           'metadata.flavor': '5'},
+             'start_timestamp': datetime.datetime(2015, 1, 1, 11, 54),
+             'start_timestamp_op': 'ge',
+             'end_timestamp': datetime.datetime(2015, 1, 1, 12),
+             'end_timestamp_op': 'le'},
+            kwargs)
+
+    def test_unsupported_query(self):
+        translation = storage_client.AlarmManager.translation
+        self.assertRaises(ceilometer.NotImplementedError,
+                          storage_client._query_to_kwargs,
+                          [{'field': 'name', 'op': 'ne', 'value': 'foo'}],
+                          translation)
+        self.assertRaises(ceilometer.NotImplementedError,
+                          storage_client._query_to_kwargs,
+                          [{'field': 'foo', 'value': 'bar'}],
+                          translation)
+
+
+class TestStorageClient(base.BaseTestCase):
+
+    def setUp(self):
+        super(TestStorageClient, self).setUp()
+        self.CONF = self.useFixture(fixture_config.Config()).conf
+        self.alarm_conn = mock.Mock()
+        self.conn = mock.Mock()
+        with mock.patch.object(storage, 'get_connection_from_config',
+                               side_effect=[self.alarm_conn, self.conn]):
+            self.client = storage_client.Client(self.CONF)
+        self.now = datetime.datetime(2015, 1, 1, 12)
+        timeutils.set_time_override(self.now)
+        self.addCleanup(timeutils.clear_time_override)
+        self.useFixture(mockpatch.PatchObject(messaging, 'get_transport'))
+        self.get_notifier = self.useFixture(mockpatch.PatchObject(
+            messaging, 'get_notifier')).mock
+        self.notifier = self.get_notifier.return_value
+
+    @staticmethod
+    def _alarm(alarm_id, project_id='snafu', user_id='foobar'):
+        return mock.Mock(alarm_id=alarm_id, project_id=project_id,
+                         user_id=user_id, state='insufficient data')
+
+    def test_list_alarms(self):
+        alarms = [self._alarm('a'), self._alarm('b')]
+        self.alarm_conn.get_alarms.return_value = alarms
+        self.assertEqual(alarms, self.client.alarms.list(
+            q=[{'field': 'enabled', 'value': True}]))
+        self.alarm_conn.get_alarms.assert_called_once_with(enabled=True)
+
+        # the alarms of the cycle are not retrieved again
+        self.assertEqual(alarms[1], self.client.alarms.get('b'))
+        self.assertEqual(1, self.alarm_conn.get_alarms.call_count)
+
+    def test_query_alarms(self):
+        alarms = [self._alarm('a'), self._alarm('b')]
+        self.alarm_conn.get_alarms.return_value = alarms[:1]
+        self.client.alarms.list()
+        self.client.alarms.set_state('b', state='alarm')
+        self.alarm_conn.query_alarms.return_value = alarms[1:]
+        self.assertEqual(alarms[1:], self.client.query_alarms.query(
+            filter='{"in": {"alarm_id": ["b"]}}'))
+        self.alarm_conn.query_alarms.assert_called_once_with(
+            filter_expr={'in': {'alarm_id': ['b']}}, orderby=None,
+            limit=None)
+        # the pending state is seen and the queried alarms are kept
+        self.assertEqual('alarm', alarms[1].state)
+        self.assertEqual(alarms[0], self.client.alarms.get('a'))
+        self.assertEqual(alarms[1], self.client.alarms.get('b'))
+        self.assertEqual(1, self.alarm_conn.get_alarms.call_count)
+
+    def test_get_unknown_alarm(self):
+        self.alarm_conn.get_alarms.return_value = []
+        self.assertIsNone(self.client.alarms.get('a'))
+        self.alarm_conn.get_alarms.assert_called_once_with(alarm_id='a')
+
+    def test_set_state_written_on_flush(self):
+        alarms = [self._alarm('a'), self._alarm('b')]
+        self.alarm_conn.get_alarms.return_value = alarms
+        self.client.alarms.list()
+        self.client.alarms.set_state('a', state='alarm')
+        self.client.alarms.set_state('b', state='ok')
+
+        # the new state is visible before being written
+        self.assertEqual('alarm', self.client.alarms.get('a').state)
+        self.assertFalse(self.alarm_conn.update_alarm_states.called)
+
+        self.client.flush()
+        self.alarm_conn.update_alarm_states.assert_called_once_with(
+            mock.ANY)
+        self.assertEqual(
+            sorted([('a', 'alarm', self.now), ('b', 'ok', self.now)]),
+            sorted(self.alarm_conn.update_alarm_states.call_args[0][0]))
+        changes = sorted((c[0][0] for c in
+                          self.alarm_conn.record_alarm_change.call_args_list),
+                         key=lambda c: c['alarm_id'])
+        self.assertEqual(['a', 'b'], [c['alarm_id'] for c in changes])
+        for change, state in zip(changes, ['alarm', 'ok']):
+            self.assertEqual(alarm_models.AlarmChange.STATE_TRANSITION,
+                             change['type'])
+            self.assertEqual({'state': state}, json.loads(change['detail']))
+            self.assertEqual('foobar', change['user_id'])
+            self.assertEqual('snafu', change['project_id'])
+            self.assertEqual('snafu', change['on_behalf_of'])
+            self.assertEqual(self.now, change['timestamp'])
+
+        # the transitions are notified like through the API
+        self.get_notifier.assert_called_once_with(
+            mock.ANY, publisher_id='ceilometer.alarm.evaluator')
+        self.assertEqual(2, self.notifier.info.call_count)
+        notifications = sorted((c[0][1:] for c in
+                                self.notifier.info.call_args_list),
+                               key=lambda n: n[1]['alarm_id'])
+        for (name, payload), change, state in zip(notifications, changes,
+                                                  ['alarm', 'ok']):
+            self.assertEqual('alarm.state_transition', name)
+            self.assertEqual({'state': state}, payload['detail'])
+            self.assertEqual(change['event_id'], payload['event_id'])
+            self.assertEqual('foobar', payload['user_id'])
+            self.assertEqual('snafu', payload['project_id'])
+
+        # nothing left to write
+        self.client.flush()
+        self.assertEqual(1, self.alarm_conn.update_alarm_states.call_count)
+
+    def test_flush_alarm_not_listed(self):
+        self.alarm_conn.get_alarms.return_value = [self._alarm('a')]
+        self.client.alarms.set_state('a', state='alarm')
+        self.client.flush()
+        self.alarm_conn.get_alarms.assert_called_once_with(alarm_id='a')
+        change = self.alarm_conn.record_alarm_change.call_args[0][0]
+        self.assertEqual('foobar', change['user_id'])
+        self.assertEqual('snafu', change['project_id'])
+
+    def test_flush_history_not_implemented(self):
+        self.alarm_conn.get_alarms.return_value = [self._alarm('a'),
+                                                   self._alarm('b')]
+        self.client.alarms.list()
+        self.alarm_conn.record_alarm_change.side_effect = (
+            ceilometer.NotImplementedError)
+        self.client.alarms.set_state('a', state='alarm')
+        self.client.alarms.set_state('b', state='ok')
+        self.client.flush()
+        self.assertEqual(2, self.alarm_conn.record_alarm_change.call_count)
+        self.assertEqual(2, self.notifier.info.call_count)
+
+    def test_flush_without_history(self):
+        self.CONF.set_override('record_history', False, group='alarm')
+        self.client.alarms.set_state('a', state='alarm')
+        self.client.flush()
+        self.alarm_conn.update_alarm_states.assert_called_once_with(
+            [('a', 'alarm', self.now)])
+        self.assertFalse(self.alarm_conn.record_alarm_change.called)
+        self.assertFalse(self.notifier.info.called)
+
+    def test_statistics(self):
+        period_start = datetime.datetime(2015, 1, 1, 11, 59)
+        self.conn.get_meter_statistics.return_value = [models.Statistics(
+            unit='%', period=60, period_start=period_start,
+            period_end=self.now, duration=60, duration_start=period_start,
+            duration_end=self.now, groupby={'resource_id': 'my_instance'},
+            avg=90.0, count=1)]
+        stats = self.client.statistics.list(
+            meter_name='cpu_util', period=60, groupby=['resource_id'],
+            q=[{'field': 'project_id', 'op': 'eq', 'value': 'snafu'}])
+        self.assertEqual(1, len(stats))
+        self.assertEqual(90.0, stats[0].avg)
+        self.assertEqual('2015-01-01T11:59:00', stats[0].period_start)
+        self.assertEqual({'resource_id': 'my_instance'}, stats[0].groupby)
+
+        sample_filter, period, groupby = (
+            self.conn.get_meter_statistics.call_args[0])
+        self.assertEqual('cpu_util', sample_filter.meter)
+        self.assertEqual('snafu', sample_filter.project)
+        self.assertEqual(60, period)
+        self.assertEqual(['resource_id'], groupby)
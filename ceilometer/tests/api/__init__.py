@@ -178,3 +178,23 @@ class FunctionalTest(db_test_base.TestBase):
         if not expect_errors:
             response = response.json
         return response
+
+    def get_json_pages(self, path, headers=None, **params):
+        """Sends simulated HTTP GET requests for all the pages of a listing.
+
+        The Link headers of the responses are followed and the list of the
+        pages is returned.
+
+        :param path: url path of target service
+        :param headers: A dictionary of headers to send along with the request
+        :param params: query params of the first page, limit included
+        """
+        pages = []
+        url = self.PATH_PREFIX + path
+        while url:
+            response = self.app.get(url, params=params, headers=headers)
+            pages.append(response.json)
+            params = None
+            link = response.headers.get('Link')
+            url = link and link[link.index('<') + 1:link.index('>')]
+        return pages
@@ -17,11 +17,13 @@
 
 import socket
 
+from eventlet.green import httplib
 import mock
 from oslo.config import cfg
 from oslo.config import fixture as fixture_config
 
 from ceilometer.api import app
+from ceilometer import service
 from ceilometer.tests import base
 
 
@@ -32,20 +34,64 @@ class TestApp(base.BaseTestCase):
         self.CONF = self.useFixture(fixture_config.Config()).conf
 
     def test_WSGI_address_family(self):
-        self.CONF.set_override('host', '::', group='api')
-        server_cls = app.get_server_cls(cfg.CONF.api.host)
-        self.assertEqual(server_cls.address_family, socket.AF_INET6)
-
-        self.CONF.set_override('host', '127.0.0.1', group='api')
-        server_cls = app.get_server_cls(cfg.CONF.api.host)
-        self.assertEqual(server_cls.address_family, socket.AF_INET)
-
-        self.CONF.set_override('host', 'ddddd', group='api')
-        server_cls = app.get_server_cls(cfg.CONF.api.host)
-        self.assertEqual(server_cls.address_family, socket.AF_INET)
+        self.assertEqual(socket.AF_INET6, app.get_address_family('::'))
+        self.assertEqual(socket.AF_INET,
+                         app.get_address_family('127.0.0.1'))
+        self.assertEqual(socket.AF_INET, app.get_address_family('ddddd'))
 
     def test_api_paste_file_not_exist(self):
         self.CONF.set_override('api_paste_config', 'non-existent-file')
         with mock.patch.object(self.CONF, 'find_file') as ff:
             ff.return_value = None
             self.assertRaises(cfg.ConfigFilesNotFoundError, app.load_app)
+
+
+class TestWSGIService(base.BaseTestCase):
+
+    def setUp(self):
+        super(TestWSGIService, self).setUp()
+        self.CONF = self.useFixture(fixture_config.Config()).conf
+        self.CONF.set_override('host', '127.0.0.1', group='api')
+        self.CONF.set_override('port', 0, group='api')
+        self.CONF.set_override('client_socket_timeout', 5, group='api')
+
+    @staticmethod
+    def _app(environ, start_response):
+        start_response('200 OK', [('Content-Length', '5')])
+        return ['hello']
+
+    def _get(self, conn):
+        conn.request('GET', '/')
+        response = conn.getresponse()
+        self.assertEqual('hello', response.read())
+        return response
+
+    def test_invalid_workers(self):
+        self.CONF.set_override('workers', 0, group='api')
+        self.assertRaises(service.WorkerException, app.WSGIService)
+
+    @mock.patch('ceilometer.api.app.load_app')
+    def test_keep_alive(self, load_app):
+        load_app.return_value = self._app
+        server = app.WSGIService()
+        server.start()
+        self.addCleanup(server.stop)
+        conn = httplib.HTTPConnection('127.0.0.1',
+                                      server.socket.getsockname()[1])
+        self.assertFalse(self._get(conn).will_close)
+        self._get(conn)
+
+    @mock.patch('ceilometer.api.app.load_app')
+    def test_restart_on_same_socket(self, load_app):
+        load_app.return_value = self._app
+        server = app.WSGIService()
+        port = server.socket.getsockname()[1]
+        server.start()
+        self._get(httplib.HTTPConnection('127.0.0.1', port))
+        server.stop()
+        server.reset()
+        server.start()
+        self.addCleanup(server.stop)
+        self._get(httplib.HTTPConnection('127.0.0.1', port))
+        # the application, and so its storage connections, is reloaded
+        self.assertEqual(2, load_app.call_count)
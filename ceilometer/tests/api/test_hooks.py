@@ -0,0 +1,159 @@
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+"""Tests for ceilometer/api/hooks.py
+"""
+import datetime
+
+import mock
+from oslo.utils import timeutils
+from wsme.rest import json as wsme_json
+from wsme import types as wtypes
+
+from ceilometer.api.controllers import v2
+from ceilometer.api import hooks
+from ceilometer.tests import base
+
+
+class TestStatisticsCache(base.BaseTestCase):
+
+    def setUp(self):
+        super(TestStatisticsCache, self).setUp()
+        self.now = datetime.datetime(2015, 1, 1, 12)
+        timeutils.set_time_override(self.now)
+        self.addCleanup(timeutils.clear_time_override)
+        self.compute = mock.Mock(side_effect=lambda: object())
+
+    def test_settled_window_cached(self):
+        cache = hooks.StatisticsCache(10, 600, 0)
+        end = self.now - datetime.timedelta(seconds=600)
+        result = cache.get('key', end, self.compute)
+        timeutils.advance_time_delta(datetime.timedelta(days=1))
+        self.assertIs(result, cache.get('key', end, self.compute))
+        self.assertEqual(1, self.compute.call_count)
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(1, cache.misses)
+        self.assertEqual(0.5, cache.hit_ratio)
+
+    def test_open_window_not_cached(self):
+        cache = hooks.StatisticsCache(10, 600, 0)
+        end = self.now - datetime.timedelta(seconds=599)
+        cache.get('key', end, self.compute)
+        cache.get('key', end, self.compute)
+        cache.get('other', None, self.compute)
+        cache.get('other', None, self.compute)
+        self.assertEqual(4, self.compute.call_count)
+        self.assertEqual(0, cache.hits)
+        self.assertEqual(0.0, cache.hit_ratio)
+
+    def test_open_window_cached_for_tail_ttl(self):
+        cache = hooks.StatisticsCache(10, 600, 30)
+        result = cache.get('key', None, self.compute)
+        timeutils.advance_time_seconds(29)
+        self.assertIs(result, cache.get('key', None, self.compute))
+        timeutils.advance_time_seconds(1)
+        self.assertIsNot(result, cache.get('key', None, self.compute))
+        self.assertEqual(2, self.compute.call_count)
+
+    def test_least_recently_used_evicted(self):
+        cache = hooks.StatisticsCache(2, 0, 0)
+        for key in ('a', 'b', 'a', 'c'):
+            cache.get(key, self.now, self.compute)
+        self.assertEqual(3, self.compute.call_count)
+        cache.get('a', self.now, self.compute)
+        self.assertEqual(3, self.compute.call_count)
+        cache.get('b', self.now, self.compute)
+        self.assertEqual(4, self.compute.call_count)
+
+    def test_failure_not_cached(self):
+        cache = hooks.StatisticsCache(10, 0, 0)
+        self.compute.side_effect = OverflowError()
+        self.assertRaises(OverflowError, cache.get, 'key', self.now,
+                          self.compute)
+        self.compute.side_effect = None
+        cache.get('key', self.now, self.compute)
+        self.assertEqual(2, self.compute.call_count)
+
+    @mock.patch.object(hooks.LOG, 'info')
+    def test_hits_reported_periodically(self, info):
+        cache = hooks.StatisticsCache(10, 0, 0, 60)
+        cache.get('key', self.now, self.compute)
+        timeutils.advance_time_seconds(59)
+        cache.get('key', self.now, self.compute)
+        self.assertEqual(0, info.call_count)
+        timeutils.advance_time_seconds(1)
+        cache.get('key', self.now, self.compute)
+        cache.get('other', self.now, self.compute)
+        self.assertEqual(1, info.call_count)
+        self.assertEqual({'hits': 2, 'misses': 1, 'ratio': 2.0 / 3,
+                          'cached': 1}, info.call_args[0][1])
+        timeutils.advance_time_seconds(60)
+        cache.get('key', self.now, self.compute)
+        self.assertEqual(2, info.call_count)
+        self.assertEqual({'hits': 3, 'misses': 2, 'ratio': 0.6,
+                          'cached': 2}, info.call_args[0][1])
+
+    @mock.patch.object(hooks.LOG, 'info')
+    def test_hits_not_reported(self, info):
+        cache = hooks.StatisticsCache(10, 0, 0)
+        timeutils.advance_time_delta(datetime.timedelta(days=1))
+        cache.get('key', self.now, self.compute)
+        self.assertEqual(0, info.call_count)
+
+
+class TestStreamingHook(base.BaseTestCase):
+
+    def setUp(self):
+        super(TestStreamingHook, self).setUp()
+        self.hook = hooks.StreamingHook()
+        self.state = mock.Mock()
+        self.state.response.status_int = 200
+        self.state.response.app_iter = ['[]']
+        self.events = [
+            v2.Event(message_id='m%d' % i, event_type='compute',
+                     generated=datetime.datetime(2015, 1, 1, 12, i),
+                     traits=[v2.Trait(name='host', type='string',
+                                      value='host%d' % i)])
+            for i in range(3)]
+
+    def test_not_streamed(self):
+        self.state.request.context = {}
+        self.hook.after(self.state)
+        self.assertEqual(['[]'], self.state.response.app_iter)
+
+    def test_streamed_as_encoded_by_wsme(self):
+        self.state.request.context = {
+            'json_stream': (v2.Event, iter(self.events))}
+        self.hook.after(self.state)
+        self.assertEqual(
+            wsme_json.encode_result(self.events, wtypes.ArrayType(v2.Event)),
+            ''.join(self.state.response.app_iter))
+        self.assertEqual({}, self.state.request.context)
+
+    def test_error_response_not_streamed(self):
+        self.state.response.status_int = 500
+        self.state.request.context = {
+            'json_stream': (v2.Event, iter(self.events))}
+        self.hook.after(self.state)
+        self.assertEqual(['[]'], self.state.response.app_iter)
+
+    def test_storage_failure_left_unterminated(self):
+        def events():
+            yield self.events[0]
+            raise Exception('boom')
+
+        self.state.request.context = {'json_stream': (v2.Event, events())}
+        self.hook.after(self.state)
+        body = ''.join(self.state.response.app_iter)
+        complete = wsme_json.encode_result(self.events[:1],
+                                           wtypes.ArrayType(v2.Event))
+        self.assertEqual(complete[:-1], body)
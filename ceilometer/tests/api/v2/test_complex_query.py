@@ -233,6 +233,58 @@ class TestComplexQuery(base.BaseTestCase):
                           self.query._validate_orderby,
                           orderby)
 
+    def test_simplify_flattens_and_or(self):
+        filter_expr = {"and": [{"=": {"project_id": "p"}},
+                               {"and": [{"=": {"user_id": "u"}},
+                                        {"and": [{"=": {"source": "s"}},
+                                                 {"=": {"user_id": "u"}}]}]}]}
+        self.assertEqual({"and": [{"=": {"project_id": "p"}},
+                                  {"=": {"user_id": "u"}},
+                                  {"=": {"source": "s"}}]},
+                         self.query._simplify(filter_expr))
+
+    def test_simplify_merges_in_lists(self):
+        filter_expr = {"or": [{"=": {"resource_id": "r1"}},
+                              {"or": [{"in": {"resource_id": ["r2", "r1"]}},
+                                      {">": {"counter_volume": 1}}]},
+                              {"=": {"resource_id": "r3"}}]}
+        self.assertEqual({"or": [{"in": {"resource_id": ["r1", "r2", "r3"]}},
+                                 {">": {"counter_volume": 1}}]},
+                         self.query._simplify(filter_expr))
+
+    def test_simplify_single_value_in(self):
+        filter_expr = {"or": [{"in": {"resource_id": ["r1"]}},
+                              {"=": {"resource_id": "r1"}}]}
+        self.assertEqual({"=": {"resource_id": "r1"}},
+                         self.query._simplify(filter_expr))
+
+    def test_simplify_metadata_not_merged(self):
+        filter_expr = {"or": [{"=": {"resource_metadata.a": "1"}},
+                              {"=": {"resource_metadata.a": "2"}}]}
+        self.assertEqual(filter_expr, self.query._simplify(filter_expr))
+
+    def test_simplify_orders_conjunction(self):
+        timestamp = datetime.datetime(2013, 12, 5, 19, 38, 29)
+        filter_expr = {"and": [{"=": {"resource_metadata.a": "1"}},
+                               {"or": [{"=": {"user_id": "u1"}},
+                                       {"=": {"project_id": "p1"}}]},
+                               {"=": {"project_id": "p"}},
+                               {"=": {"counter_name": "cpu"}},
+                               {">": {"timestamp": timestamp}}]}
+        self.assertEqual({"and": [{"=": {"counter_name": "cpu"}},
+                                  {">": {"timestamp": timestamp}},
+                                  {"=": {"project_id": "p"}},
+                                  {"=": {"resource_metadata.a": "1"}},
+                                  {"or": [{"=": {"user_id": "u1"}},
+                                          {"=": {"project_id": "p1"}}]}]},
+                         self.query._simplify(filter_expr))
+
+    def test_simplify_double_negation(self):
+        filter_expr = {"not": {"not": {"and": [{"=": {"user_id": "u"}},
+                                               {"=": {"user_id": "u"}}]}}}
+        self.assertEqual({"=": {"user_id": "u"}},
+                         self.query._simplify(filter_expr))
+
 
 class TestFilterSyntaxValidation(base.BaseTestCase):
     def setUp(self):
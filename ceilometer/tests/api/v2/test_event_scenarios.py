@@ -407,3 +407,21 @@ class TestEventAPI(EventTestBase):
                               'value': '1',
                               'type': 'integer',
                               'op': 'el'}])
+
+    def test_get_events_paginated(self):
+        data = self.get_json(self.PATH, headers=headers, limit=2)
+        self.assertEqual(['0', '100'], [e['message_id'] for e in data])
+        data = self.get_json(self.PATH, headers=headers, limit=2,
+                             marker='100')
+        self.assertEqual(['200'], [e['message_id'] for e in data])
+        self.assertEqual(4, len(data[0]['traits']))
+
+    def test_get_events_unknown_marker(self):
+        data = self.get_json(self.PATH, headers=headers, marker='DNE',
+                             expect_errors=True)
+        self.assertEqual(400, data.status_int)
+
+    def test_get_events_negative_limit(self):
+        data = self.get_json(self.PATH, headers=headers, limit=-1,
+                             expect_errors=True)
+        self.assertEqual(400, data.status_int)
@@ -216,6 +216,67 @@ class TestListMeters(v2.FunctionalTest,
         data = self.get_json('/samples')
         self.assertEqual(7, len(data))
 
+    def test_list_samples_not_streamed(self):
+        streamed = self.get_json('/samples')
+        self.CONF.set_override('stream_results', False, group='api')
+        self.assertEqual(streamed, self.get_json('/samples'))
+
+    def test_list_meter_samples_not_streamed(self):
+        streamed = self.get_json('/meters/meter.test')
+        self.CONF.set_override('stream_results', False, group='api')
+        self.assertEqual(streamed, self.get_json('/meters/meter.test'))
+
+    def test_list_samples_paginated(self):
+        pages = self.get_json_pages('/samples', limit=3)
+        self.assertEqual([3, 3, 1], [len(p) for p in pages])
+        self.assertEqual([s['id'] for s in self.get_json('/samples')],
+                         [s['id'] for p in pages for s in p])
+
+    def test_list_samples_paginated_with_query(self):
+        pages = self.get_json_pages('/samples', limit=2,
+                                    **{'q.field': 'resource_id',
+                                       'q.value': 'resource-id'})
+        self.assertEqual([2, 1], [len(p) for p in pages])
+        self.assertEqual(set(['resource-id']),
+                         set(s['resource_id'] for p in pages for s in p))
+
+    def test_list_samples_unknown_marker(self):
+        resp = self.get_json('/samples', marker='unknown',
+                             expect_errors=True)
+        self.assertEqual(400, resp.status_code)
+        self.assertEqual('Unknown marker unknown',
+                         jsonutils.loads(resp.body)['error_message']
+                         ['faultstring'])
+
+    def test_list_meter_samples_paginated(self):
+        pages = self.get_json_pages('/meters/meter.test', limit=2)
+        self.assertEqual([2, 1], [len(p) for p in pages])
+        self.assertEqual(
+            [s['message_id'] for s in self.get_json('/meters/meter.test')],
+            [s['message_id'] for p in pages for s in p])
+
+    def test_list_meters_paginated(self):
+        pages = self.get_json_pages('/meters', limit=4)
+        self.assertEqual([4, 2], [len(p) for p in pages])
+        meters = [(m['resource_id'], m['name']) for p in pages for m in p]
+        self.assertEqual(sorted(meters), meters)
+        self.assertEqual(sorted((m['resource_id'], m['name'])
+                                for m in self.get_json('/meters')),
+                         meters)
+
+    def test_list_meters_stale_marker(self):
+        # the marker resource is gone, the page starts at the next one
+        marker = base64.encodestring('resource-id1+meter.test').strip()
+        data = self.get_json('/meters', marker=marker, limit=2)
+        self.assertEqual([('resource-id2', 'meter.mine'),
+                          ('resource-id3', 'meter.test')],
+                         [(m['resource_id'], m['name']) for m in data])
+
+    def test_list_meters_unknown_marker(self):
+        resp = self.get_json('/meters', marker='unknown', limit=1,
+                             expect_errors=True)
+        self.assertEqual(400, resp.status_code)
+
     def test_query_samples_with_invalid_field_name_and_non_eq_operator(self):
         resp = self.get_json('/samples',
                              q=[{'field': 'non_valid_field_name',
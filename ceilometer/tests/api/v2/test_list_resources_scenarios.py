@@ -20,9 +20,11 @@
 import datetime
 import json
 
+import mock
 from oslo.utils import timeutils
 import six
 
+from ceilometer.api.controllers import v2 as api
 from ceilometer.publisher import utils
 from ceilometer import sample
 from ceilometer.tests.api import v2
@@ -512,6 +514,166 @@ class TestListResources(v2.FunctionalTest,
                          'q.field=resource_id&q.value=resource-id')
                         in links[1]['href'])
 
+    def test_resources_meter_links_read_once(self):
+        for resource_id, meters in [('resource-id', ['instance', 'cpu']),
+                                    ('resource-id2', ['instance'])]:
+            for meter in meters:
+                sample1 = sample.Sample(
+                    meter,
+                    'cumulative',
+                    '',
+                    1,
+                    'user-id',
+                    'project-id',
+                    resource_id,
+                    timestamp=datetime.datetime(2012, 7, 2, 10, 40),
+                    resource_metadata={},
+                    source='test_list_resources',
+                )
+                msg = utils.meter_message_from_counter(
+                    sample1,
+                    self.CONF.publisher.metering_secret,
+                )
+                self.conn.record_metering_data(msg)
+
+        with mock.patch.object(self.conn, 'get_meters',
+                               wraps=self.conn.get_meters) as get_meters:
+            data = self.get_json('/resources')
+        self.assertEqual(1, get_meters.call_count)
+        links = dict((r['resource_id'],
+                      sorted(l['rel'] for l in r['links'][1:]))
+                     for r in data)
+        self.assertEqual({'resource-id': ['cpu', 'instance'],
+                          'resource-id2': ['instance']}, links)
+
+    def test_resources_meter_links_filtered(self):
+        for resource_id, project_id in [('resource-id', 'project-id'),
+                                        ('resource-id2', 'project-id2')]:
+            sample1 = sample.Sample(
+                'instance',
+                'cumulative',
+                '',
+                1,
+                'user-id',
+                project_id,
+                resource_id,
+                timestamp=datetime.datetime(2012, 7, 2, 10, 40),
+                resource_metadata={},
+                source='test_list_resources',
+            )
+            msg = utils.meter_message_from_counter(
+                sample1,
+                self.CONF.publisher.metering_secret,
+            )
+            self.conn.record_metering_data(msg)
+
+        with mock.patch.object(self.conn, 'get_meters',
+                               wraps=self.conn.get_meters) as get_meters:
+            data = self.get_json('/resources',
+                                 q=[{'field': 'project_id',
+                                     'value': 'project-id'},
+                                    {'field': 'source',
+                                     'value': 'test_list_resources'}])
+        # only the meters of the listed resources are read
+        get_meters.assert_called_once_with(project='project-id',
+                                           source='test_list_resources')
+        self.assertEqual(['resource-id'], [r['resource_id'] for r in data])
+        self.assertEqual(['instance'],
+                         [l['rel'] for l in data[0]['links'][1:]])
+
+    def test_resources_paginated(self):
+        for resource_id, meters in [('resource-id', ['instance', 'cpu']),
+                                    ('resource-id2', ['instance']),
+                                    ('resource-id3', ['disk'])]:
+            for meter in meters:
+                sample1 = sample.Sample(
+                    meter,
+                    'cumulative',
+                    '',
+                    1,
+                    'user-id',
+                    'project-id',
+                    resource_id,
+                    timestamp=datetime.datetime(2012, 7, 2, 10, 40),
+                    resource_metadata={},
+                    source='test_list_resources',
+                )
+                msg = utils.meter_message_from_counter(
+                    sample1,
+                    self.CONF.publisher.metering_secret,
+                )
+                self.conn.record_metering_data(msg)
+
+        pages = self.get_json_pages('/resources', limit=2)
+        self.assertEqual([['resource-id', 'resource-id2'], ['resource-id3']],
+                         [[r['resource_id'] for r in p] for p in pages])
+        links = dict((r['resource_id'],
+                      sorted(l['rel'] for l in r['links'][1:]))
+                     for p in pages for r in p)
+        self.assertEqual({'resource-id': ['cpu', 'instance'],
+                          'resource-id2': ['instance'],
+                          'resource-id3': ['disk']}, links)
+
+    def test_resources_page_meters_read_by_chunks(self):
+        for resource_id, meters in [('resource-id', ['instance', 'cpu']),
+                                    ('resource-id2', ['instance']),
+                                    ('resource-id3', ['disk'])]:
+            for meter in meters:
+                sample1 = sample.Sample(
+                    meter,
+                    'cumulative',
+                    '',
+                    1,
+                    'user-id',
+                    'project-id',
+                    resource_id,
+                    timestamp=datetime.datetime(2012, 7, 2, 10, 40),
+                    resource_metadata={},
+                    source='test_list_resources',
+                )
+                msg = utils.meter_message_from_counter(
+                    sample1,
+                    self.CONF.publisher.metering_secret,
+                )
+                self.conn.record_metering_data(msg)
+
+        with mock.patch.object(self.conn, 'get_meters',
+                               wraps=self.conn.get_meters) as get_meters:
+            data = self.get_json('/resources', limit=2)
+        # the meters of the page are read at once, not resource by resource
+        self.assertEqual(1, get_meters.call_count)
+        self.assertNotIn('resource', get_meters.call_args[1])
+        self.assertEqual(('resource-id', ''),
+                         get_meters.call_args[1]['pagination'].marker_value)
+        links = dict((r['resource_id'],
+                      sorted(l['rel'] for l in r['links'][1:]))
+                     for r in data)
+        self.assertEqual({'resource-id': ['cpu', 'instance'],
+                          'resource-id2': ['instance']}, links)
+
+        # the chunks follow each other until the end of the page
+        with mock.patch.object(api.ResourcesController,
+                               '_meters_chunk_size', 1):
+            with mock.patch.object(self.conn, 'get_meters',
+                                   wraps=self.conn.get_meters) as get_meters:
+                data = self.get_json('/resources', limit=2)
+        self.assertEqual(2, get_meters.call_count)
+        self.assertEqual(('resource-id', 'instance'),
+                         get_meters.call_args[1]['pagination'].marker_value)
+        links = dict((r['resource_id'],
+                      sorted(l['rel'] for l in r['links'][1:]))
+                     for r in data)
+        self.assertEqual({'resource-id': ['cpu', 'instance'],
+                          'resource-id2': ['instance']}, links)
+
+    def test_resources_unknown_marker(self):
+        resp = self.get_json('/resources', marker='unknown', limit=1,
+                             expect_errors=True)
+        self.assertEqual(400, resp.status_code)
+        self.assertEqual('Unknown marker unknown',
+                         json.loads(resp.body)['error_message']
+                         ['faultstring'])
+
     def test_resource_skip_meter_links(self):
         sample1 = sample.Sample(
             'instance',
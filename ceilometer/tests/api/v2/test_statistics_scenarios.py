@@ -18,6 +18,8 @@
 
 import datetime
 
+import mock
+
 from ceilometer.publisher import utils
 from ceilometer import sample
 from ceilometer.tests.api import v2
@@ -121,6 +123,34 @@ class TestMaxProjectVolume(v2.FunctionalTest,
         self.assertEqual(6, data[0]['max'])
         self.assertEqual(1, data[0]['count'])
 
+    def _get_settled(self, project):
+        return self.get_json(self.PATH, q=[{'field': 'timestamp',
+                                            'op': 'le',
+                                            'value': '2012-09-26T00:00:00',
+                                            }],
+                             headers={'X-Roles': 'Member',
+                                      'X-Project-Id': project})
+
+    def test_settled_window_cached(self):
+        with mock.patch.object(self.conn, 'get_meter_statistics',
+                               side_effect=self.conn.get_meter_statistics
+                               ) as get_statistics:
+            data = self._get_settled('project1')
+            self.assertEqual(data, self._get_settled('project1'))
+            self.assertEqual(1, get_statistics.call_count)
+            self.assertEqual([], self._get_settled('project2'))
+            self.assertEqual(2, get_statistics.call_count)
+        self.assertEqual(7, data[0]['max'])
+        self.assertEqual(3, data[0]['count'])
+
+    def test_open_window_not_cached(self):
+        with mock.patch.object(self.conn, 'get_meter_statistics',
+                               side_effect=self.conn.get_meter_statistics
+                               ) as get_statistics:
+            self.get_json(self.PATH)
+            self.get_json(self.PATH)
+            self.assertEqual(2, get_statistics.call_count)
+
 
 class TestMaxResourceVolume(v2.FunctionalTest,
                             tests_db.MixinTestsWithBackendScenarios):
@@ -23,6 +23,7 @@ import mock
 
 from ceilometer.agent import manager
 from ceilometer.compute.pollsters import cpu
+from ceilometer.compute.pollsters import util
 from ceilometer.compute.virt import inspector as virt_inspector
 from ceilometer.tests.compute.pollsters import base
 
@@ -75,7 +76,8 @@ class TestCPUPollster(base.TestPollsterBase):
         samples = list(pollster.get_samples(mgr, cache, [self.instance]))
         self.assertEqual(1, len(samples))
         self.assertEqual(10 ** 6, samples[0].volume)
-        self.assertEqual(0, len(cache))
+        # only the shared instance metadata is cached, not the CPU stats
+        self.assertEqual([util.CACHE_KEY_METADATA], list(cache))
 
 
 class TestCPUUtilPollster(base.TestPollsterBase):
@@ -113,3 +113,23 @@ class TestLocationMetadata(base.BaseTestCase):
         md = util._get_metadata_from_object(self.instance)
         self.assertEqual(1, md['image_ref'])
         self.assertIsNone(md['image_ref_url'])
+
+    def test_metadata_cached_per_instance(self):
+        self.instance.id = 'instance-id'
+        self.instance.user_id = 'user-id'
+        self.instance.tenant_id = 'tenant-id'
+        cache = {}
+        with mock.patch.object(util, '_get_metadata_from_object',
+                               wraps=util._get_metadata_from_object) as get:
+            s1 = util.make_sample_from_instance(
+                self.instance, 'cpu', 'cumulative', 'ns', 1, cache=cache)
+            s2 = util.make_sample_from_instance(
+                self.instance, 'disk.read.bytes', 'cumulative', 'B', 2,
+                additional_metadata={'device': ['vda']}, cache=cache)
+        self.assertEqual(1, get.call_count)
+        self.assertIs(cache[util.CACHE_KEY_METADATA][self.instance.id],
+                      s1.resource_metadata)
+        self.assertEqual(['vda'], s2.resource_metadata['device'])
+        self.assertNotIn('device', s1.resource_metadata)
+        self.assertEqual(s1.resource_metadata['display_name'],
+                         s2.resource_metadata['display_name'])
@@ -307,6 +307,37 @@ class TestTraitDefinition(ConverterBase):
             t.fields,
             jsonpath_rw.parse('(payload.test)|(payload.other)'))
 
+    def test_dotted_paths_without_jsonpath(self):
+        with mock.patch.object(jsonpath_rw, 'parse') as parse:
+            t = converter.TraitDefinition(
+                'test_trait', dict(fields=['payload.test', '_context_x']),
+                self.fake_plugin_mgr)
+            self.assertFalse(parse.called)
+        self.assertEqual([('payload', 'test'), ('_context_x',)], t.paths)
+        for fields in ('payload.*', 'payload[0]', '$.payload'):
+            t = converter.TraitDefinition('test_trait', dict(fields=fields),
+                                          self.fake_plugin_mgr)
+            self.assertIsNone(t.paths)
+
+    def test_dotted_paths_as_jsonpath(self):
+        bodies = [{'payload': {'a': {'b': 1}, 'c': 2}},
+                  {'payload': {'a': None, 'c': 'x'}},
+                  {'payload': {'a': [{'b': 1}], 'c': None}},
+                  {'payload': {'a': 'b', 'c': [2]}},
+                  {'payload': None},
+                  {}]
+        fields = ['payload.a.b', 'payload.c', 'payload.d']
+        for body in bodies:
+            t = converter.TraitDefinition('test_trait', dict(fields=fields),
+                                          self.fake_plugin_mgr)
+            self.assertIsNotNone(t.paths)
+            expected = [models.Trait.convert_value(
+                models.Trait.TEXT_TYPE, match.value)
+                for match in t.fields.find(body) if match.value is not None]
+            trait = t.to_trait(body)
+            self.assertEqual(expected[0] if expected else None,
+                             trait and trait.value)
+
     def test_invalid_path_config(self):
         # test invalid jsonpath...
         cfg = dict(fields='payload.bogus(')
@@ -412,6 +443,25 @@ class TestEventDefinition(ConverterBase):
                             value='uuid-for-instance-0001',
                             dtype=dtype)
 
+    def test_to_event_walks_notification_once(self):
+        cfg = dict(event_type='test.thing', traits=self.traits_cfg)
+        edef = converter.EventDefinition(cfg, self.fake_plugin_mgr)
+
+        class Payload(dict):
+            lookups = []
+
+            def __getitem__(self, key):
+                self.lookups.append(key)
+                return dict.__getitem__(self, key)
+
+        payload = Payload(self.test_notification1['payload'])
+        self.test_notification1['payload'] = payload
+        e = edef.to_event(self.test_notification1)
+        self.assertHasTrait(e, 'host', value='host-1-2-3')
+        self.assertEqual(sorted(['instance_uuid', 'instance_id', 'host',
+                                 'tenant_id']),
+                         sorted(payload.lookups))
+
     def test_to_event_missing_trait(self):
         dtype = models.Trait.TEXT_TYPE
         cfg = dict(event_type='test.thing', traits=self.traits_cfg)
@@ -706,6 +756,52 @@ class TestNotificationConverter(ConverterBase):
         e = c.to_event(self.test_notification2)
         self.assertIsNotValidEvent(e, self.test_notification2)
 
+    def test_definition_precedence(self):
+        # the last definitions of the configuration take precedence
+        cfg = [dict(event_type='compute.instance.*', traits={}),
+               dict(event_type='compute.instance.create.end', traits={}),
+               dict(event_type=['compute.*', '!compute.instance.delete.*'],
+                    traits={}),
+               dict(event_type=['compute.instance.create.*',
+                                '!compute.instance.create.end'],
+                    traits={})]
+        c = converter.NotificationEventsConverter(
+            cfg, self.fake_plugin_mgr, add_catchall=False)
+        expected = {'compute.instance.create.start': cfg[3],
+                    'compute.instance.create.end': cfg[2],
+                    'compute.instance.delete.end': cfg[0],
+                    'compute.instance.exists': cfg[2],
+                    'image.upload': None}
+        for event_type, event_def in expected.items():
+            edef = c._get_event_definition(event_type)
+            self.assertEqual(event_def, edef and edef.cfg)
+            # and from the memoised definitions
+            edef = c._get_event_definition(event_type)
+            self.assertEqual(event_def, edef and edef.cfg)
+
+    def test_many_definitions(self):
+        # more wildcarded definitions than groups in a python 2 regex
+        cfg = [dict(event_type='event.%d.*' % i, traits={})
+               for i in range(110)]
+        cfg.extend(dict(event_type='event.%d.end' % i, traits={})
+                   for i in range(0, 110, 10))
+        c = converter.NotificationEventsConverter(
+            cfg, self.fake_plugin_mgr, add_catchall=False)
+        for i in range(110):
+            self.assertEqual(cfg[i], c._get_event_definition(
+                'event.%d.start' % i).cfg)
+            end = cfg[110 + i // 10] if i % 10 == 0 else cfg[i]
+            self.assertEqual(end, c._get_event_definition(
+                'event.%d.end' % i).cfg)
+
+    def test_memoised_definitions_bounded(self):
+        c = converter.NotificationEventsConverter(
+            self.valid_event_def1, self.fake_plugin_mgr, add_catchall=True)
+        with mock.patch.object(converter, 'EVENT_TYPE_CACHE_SIZE', 2):
+            for event_type in ('a', 'b', 'c'):
+                c._get_event_definition(event_type)
+        self.assertEqual(['c'], list(c._definitions_cache))
+
     def test_setup_events_default_config(self):
 
         def mock_exists(path):
@@ -16,6 +16,7 @@
 # under the License.
 """Tests for Ceilometer notify daemon."""
 
+import eventlet
 import mock
 from oslo.config import cfg
 from oslo.config import fixture as fixture_config
@@ -131,8 +132,56 @@ class TestEventEndpoint(tests_base.BaseTestCase):
     def test_message_to_event_bad_event(self):
         self.CONF.set_override("ack_on_event_error", False,
                                group="notification")
+        event = self.endpoint.event_converter.to_event.return_value
         self.mock_dispatcher.record_events.return_value = [
-            (models.Event.UNKNOWN_PROBLEM, object())]
+            (models.Event.UNKNOWN_PROBLEM, event)]
         message = {'event_type': "foo", 'message_id': "abc"}
         ret = self.endpoint.process_notification(message)
         self.assertEqual(oslo.messaging.NotificationResult.REQUEUE, ret)
+
+    def _process_concurrently(self, messages):
+        self.endpoint.event_converter.to_event.side_effect = (
+            lambda message: mock.MagicMock(event_type=message['event_type'],
+                                           message_id=message['message_id']))
+        threads = [eventlet.spawn(self.endpoint.process_notification, m)
+                   for m in messages]
+        return [t.wait() for t in threads]
+
+    def test_events_recorded_in_batches(self):
+        self.CONF.set_override("event_batch_size", 3, group="notification")
+        self.CONF.set_override("event_batch_timeout", 60,
+                               group="notification")
+        messages = [{'event_type': "foo", 'message_id': str(i)}
+                    for i in range(6)]
+        ret = self._process_concurrently(messages)
+        self.assertEqual([oslo.messaging.NotificationResult.HANDLED] * 6,
+                         ret)
+        batches = [c[0][0] for c in
+                   self.mock_dispatcher.record_events.call_args_list]
+        self.assertEqual([['0', '1', '2'], ['3', '4', '5']],
+                         [[e.message_id for e in b] for b in batches])
+
+    def test_batch_recorded_on_timeout(self):
+        self.CONF.set_override("event_batch_size", 10, group="notification")
+        self.CONF.set_override("event_batch_timeout", 0.01,
+                               group="notification")
+        messages = [{'event_type': "foo", 'message_id': str(i)}
+                    for i in range(2)]
+        self._process_concurrently(messages)
+        self.mock_dispatcher.record_events.assert_called_once_with(
+            [mock.ANY, mock.ANY])
+
+    def test_bad_event_in_batch_requeued(self):
+        self.CONF.set_override("ack_on_event_error", False,
+                               group="notification")
+        self.CONF.set_override("event_batch_size", 3, group="notification")
+        self.mock_dispatcher.record_events.side_effect = lambda events: [
+            (models.Event.UNKNOWN_PROBLEM, events[1]),
+            (models.Event.DUPLICATE, events[2])]
+        messages = [{'event_type': "foo", 'message_id': str(i)}
+                    for i in range(3)]
+        self.assertEqual([oslo.messaging.NotificationResult.HANDLED,
+                          oslo.messaging.NotificationResult.REQUEUE,
+                          oslo.messaging.NotificationResult.HANDLED],
+                         self._process_concurrently(messages))
+        self.assertEqual(1, self.mock_dispatcher.record_events.call_count)
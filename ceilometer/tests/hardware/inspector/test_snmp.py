@@ -42,12 +42,53 @@ def faux_getCmd_new(authData, transportTarget, *oids, **kwargs):
 def faux_bulkCmd_new(authData, transportTarget, nonRepeaters, maxRepetitions,
                      *oids, **kwargs):
     varBindTable = [
-        [(FakeObjectName(oid + ".%d" % i), i) for i in range(1, 3)]
-        for oid in oids
+        [(FakeObjectName(oid + ".%d" % i), i) for oid in oids]
+        for i in range(1, 3)
     ]
     return (None, None, 0, varBindTable)
 
 
+class FakeCommandGenerator(object):
+    getCmd = staticmethod(faux_getCmd_new)
+    bulkCmd = staticmethod(faux_bulkCmd_new)
+
+
+class FakeAgent(object):
+    """A local SNMP agent answering from a table of oids."""
+
+    def __init__(self, oids, reachable=True):
+        self.oids = oids
+        self.reachable = reachable
+        self.requests = []
+
+    def getCmd(self, authData, transportTarget, *oids, **kwargs):
+        self.requests.append(('get', oids))
+        if not self.reachable:
+            return ('requestTimedOut', None, 0, [])
+        return (None, None, 0, [(FakeObjectName(oid), self.oids.get(oid))
+                                for oid in oids])
+
+    def bulkCmd(self, authData, transportTarget, nonRepeaters,
+                maxRepetitions, *oids, **kwargs):
+        self.requests.append(('bulk', oids))
+        if not self.reachable:
+            return ('requestTimedOut', None, 0, [])
+        # walk every column in parallel, in oid order, the way an agent
+        # answers a GetBulkRequest
+        key = lambda k: tuple(int(x) for x in k.split('.'))
+        keys = sorted(self.oids, key=key)
+        columns = [[k for k in keys if key(k) > key(oid)] for oid in oids]
+        table = []
+        for row in range(max(len(c) for c in columns)):
+            table.append([(FakeObjectName(c[row]), self.oids[c[row]])
+                          if row < len(c) else (FakeObjectName('end'), None)
+                          for c in columns])
+            if not any(row < len(c) and c[row].startswith(oid + '.')
+                       for c, oid in zip(columns, oids)):
+                break
+        return (None, None, 0, table)
+
+
 class TestSNMPInspector(test_base.BaseTestCase):
     mapping = {
         'test_exact': {
@@ -70,13 +111,11 @@ class TestSNMPInspector(test_base.BaseTestCase):
 
     def setUp(self):
         super(TestSNMPInspector, self).setUp()
+        self.useFixture(mockpatch.PatchObject(
+            snmp.cmdgen, 'CommandGenerator', new=FakeCommandGenerator))
         self.inspector = snmp.SNMPInspector()
         self.host = netutils.urlsplit("snmp://localhost")
         self.inspector.MAPPING = self.mapping
-        self.useFixture(mockpatch.PatchObject(
-            self.inspector._cmdGen, 'getCmd', new=faux_getCmd_new))
-        self.useFixture(mockpatch.PatchObject(
-            self.inspector._cmdGen, 'bulkCmd', new=faux_bulkCmd_new))
 
     def test_snmp_error(self):
         def get_list(func, *args, **kwargs):
@@ -131,8 +170,6 @@ class TestSNMPInspector(test_base.BaseTestCase):
         self.assertEqual(ret[0][0], ret[0][1]['meta'])
 
     def test_post_op_net(self):
-        self.useFixture(mockpatch.PatchObject(
-            self.inspector._cmdGen, 'bulkCmd', new=faux_bulkCmd_new))
         cache = {}
         metadata = {}
         ret = self.inspector._post_op_net(self.host, cache, None,
@@ -143,3 +180,74 @@ class TestSNMPInspector(test_base.BaseTestCase):
         self.assertEqual(8, ret)
         self.assertIn('ip', metadata)
         self.assertIn("2", metadata['ip'])
+
+
+class TestSNMPInspectorPrefetch(test_base.BaseTestCase):
+    OIDS = {
+        # cpu and memory
+        '1.3.6.1.4.1.2021.10.1.3.1': '0.99',
+        '1.3.6.1.4.1.2021.4.5.0': 1000,
+        '1.3.6.1.4.1.2021.4.6.0': 90,
+        # disks
+        '1.3.6.1.4.1.2021.9.1.2.1': '/',
+        '1.3.6.1.4.1.2021.9.1.3.1': '/dev/sda1',
+        '1.3.6.1.4.1.2021.9.1.6.1': 2000,
+        # network interfaces
+        '1.3.6.1.2.1.2.2.1.2.1': 'lo',
+        '1.3.6.1.2.1.2.2.1.2.2': 'eth0',
+        '1.3.6.1.2.1.2.2.1.5.1': 80,
+        '1.3.6.1.2.1.2.2.1.5.2': 800,
+        '1.3.6.1.2.1.2.2.1.6.1': FakeObjectName('0x000000000000'),
+        '1.3.6.1.2.1.2.2.1.6.2': FakeObjectName('0x525400000001'),
+        '1.3.6.1.2.1.2.2.1.10.1': 10,
+        '1.3.6.1.2.1.2.2.1.10.2': 20,
+        '1.3.6.1.2.1.4.20.1.2.10.0.0.2': 2,
+    }
+
+    def setUp(self):
+        super(TestSNMPInspectorPrefetch, self).setUp()
+        self.agent = FakeAgent(self.OIDS)
+        self.useFixture(mockpatch.PatchObject(
+            snmp.cmdgen, 'CommandGenerator', new=lambda: self.agent))
+        self.inspector = snmp.SNMPInspector()
+        self.host = netutils.urlsplit("snmp://localhost")
+
+    def test_prefetch_single_get_and_bulk(self):
+        identifiers = ['cpu.load.1min', 'memory.total', 'memory.used',
+                       'disk.size.total', 'network.incoming.bytes',
+                       'unknown.meter']
+        cache = {}
+        self.inspector.prefetch(self.host, identifiers, cache)
+        self.assertEqual(['get', 'bulk'],
+                         [r[0] for r in self.agent.requests])
+
+        for identifier in identifiers[:-1]:
+            list(self.inspector.inspect_generic(self.host, identifier, cache))
+        self.assertEqual(2, len(self.agent.requests))
+
+        ret = list(self.inspector.inspect_generic(
+            self.host, 'disk.size.total', cache))
+        self.assertEqual([(2000, {'device': '/dev/sda1', 'path': '/'}, {})],
+                         ret)
+        ret = list(self.inspector.inspect_generic(
+            self.host, 'network.incoming.bytes', cache))
+        self.assertEqual(2, len(ret))
+        eth0 = [r for r in ret if r[1]['name'] == 'eth0'][0]
+        self.assertEqual(20, eth0[0])
+        self.assertEqual('525400000001', eth0[1]['mac'])
+        self.assertEqual('10.0.0.2', eth0[1]['ip'])
+
+    def test_prefetch_skips_cached_oids(self):
+        cache = {}
+        self.inspector.prefetch(self.host, ['memory.total'], cache)
+        self.inspector.prefetch(self.host, ['memory.total', 'memory.used'],
+                                cache)
+        self.assertEqual([('get', ('1.3.6.1.4.1.2021.4.5.0',)),
+                          ('get', ('1.3.6.1.4.1.2021.4.6.0',))],
+                         self.agent.requests)
+
+    def test_prefetch_unreachable_host(self):
+        self.agent.reachable = False
+        self.assertRaises(snmp.SNMPException,
+                          self.inspector.prefetch,
+                          self.host, ['memory.total', 'disk.size.total'], {})
@@ -0,0 +1,104 @@
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+"""Tests for ceilometer/hardware/plugin.py
+"""
+
+import datetime
+
+import fixtures
+import mock
+from oslo.config import fixture as fixture_config
+from oslo.utils import timeutils
+from oslotest import mockpatch
+
+from ceilometer.hardware import plugin
+from ceilometer.hardware.pollsters import cpu
+from ceilometer.hardware.pollsters import memory
+from ceilometer.tests.hardware.pollsters import base
+
+
+class FakePrefetchInspector(base.FakeInspector):
+    unreachable = set()
+    prefetched = []
+
+    def prefetch(self, host, identifiers, cache):
+        self.prefetched.append((host.hostname, sorted(identifiers)))
+        if host.hostname in self.unreachable:
+            raise Exception('%s unreachable' % host.hostname)
+
+
+class TestHardwarePollster(base.TestPollsterBase):
+
+    @staticmethod
+    def faux_get_inspector(url, namespace=None):
+        return FakePrefetchInspector()
+
+    def setUp(self):
+        super(TestHardwarePollster, self).setUp()
+        self.CONF = self.useFixture(fixture_config.Config()).conf
+        self.useFixture(fixtures.MonkeyPatch(
+            'ceilometer.hardware.inspector.get_inspector',
+            self.faux_get_inspector))
+        self.useFixture(mockpatch.PatchObject(
+            plugin.HardwarePollster, 'circuit_breaker',
+            plugin.HostCircuitBreaker()))
+        self.useFixture(mockpatch.PatchObject(
+            FakePrefetchInspector, 'unreachable', set()))
+        self.useFixture(mockpatch.PatchObject(
+            FakePrefetchInspector, 'prefetched', []))
+        self.pollsters = [cpu.CPULoad1MinPollster(),
+                          memory.MemoryTotalPollster()]
+        self.manager = mock.Mock(extensions=[mock.Mock(obj=p)
+                                             for p in self.pollsters])
+
+    def _poll(self):
+        cache = {}
+        return [list(p.get_samples(self.manager, cache, self.hosts))
+                for p in self.pollsters]
+
+    def test_prefetch_once_per_host(self):
+        samples = self._poll()
+        self.assertEqual([2, 2], [len(s) for s in samples])
+        self.assertEqual(
+            [('test', ['cpu.load.1min', 'memory.total']),
+             ('test2', ['cpu.load.1min', 'memory.total'])],
+            sorted(FakePrefetchInspector.prefetched))
+
+    def test_unreachable_host_skipped_in_interval(self):
+        FakePrefetchInspector.unreachable.add('test2')
+        samples = self._poll()
+        self.assertEqual([1, 1], [len(s) for s in samples])
+        self.assertEqual(['test', 'test2'],
+                         sorted(h for h, _ in
+                                FakePrefetchInspector.prefetched))
+
+    def test_circuit_breaker(self):
+        self.CONF.set_override('host_failure_threshold', 2, group='hardware')
+        self.CONF.set_override('host_failure_cooldown', 60, group='hardware')
+        FakePrefetchInspector.unreachable.add('test2')
+        now = datetime.datetime(2015, 1, 1)
+        timeutils.set_time_override(now)
+        self.addCleanup(timeutils.clear_time_override)
+
+        for i in range(3):
+            self._poll()
+        # the third interval does not try the host anymore
+        self.assertEqual(2, [h for h, _ in
+                             FakePrefetchInspector.prefetched].count('test2'))
+
+        timeutils.advance_time_seconds(60)
+        FakePrefetchInspector.unreachable.clear()
+        samples = self._poll()
+        self.assertEqual([2, 2], [len(s) for s in samples])
+        self.assertTrue(plugin.HardwarePollster.circuit_breaker.allow(
+            'test2'))
@@ -54,6 +54,7 @@ def _execute(funcs, *cmd, **kwargs):
         test_data.get_power_cmd: test_data.power_data,
         test_data.get_temperature_cmd: test_data.temperature_data,
         test_data.sdr_info_cmd: test_data.sdr_info,
+        test_data.read_sensor_all_cmd: test_data.sensor_all,
         test_data.read_sensor_temperature_cmd: test_data.sensor_temperature,
         test_data.read_sensor_voltage_cmd: test_data.sensor_voltage,
         test_data.read_sensor_current_cmd: test_data.sensor_current,
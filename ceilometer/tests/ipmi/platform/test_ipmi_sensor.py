@@ -83,6 +83,19 @@ class TestIPMISensor(base.BaseTestCase):
         sensor = sensors['Fan']['System Fan 2 (0x32)']
         self.assertEqual('4704 (+/- 0) RPM', sensor['Sensor Reading'])
 
+    def test_read_sensor_all(self):
+        sensors = self.ipmi.read_sensor_any()
+
+        # data of every sensor type returned by one ipmitool run
+        self.assertEqual(set(['Temperature', 'Voltage', 'Current', 'Fan']),
+                         set(sensors))
+        self.assertEqual(3, len(sensors['Temperature']))
+        self.assertEqual(3, len(sensors['Voltage']))
+        self.assertEqual(2, len(sensors['Current']))
+        self.assertEqual(4, len(sensors['Fan']))
+        self.assertEqual(sensors['Fan'],
+                         self.ipmi.read_sensor_any('Fan')['Fan'])
+
 
 class TestNonIPMISensor(base.BaseTestCase):
 
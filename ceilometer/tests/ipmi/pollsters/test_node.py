@@ -45,6 +45,15 @@ class TestPowerPollster(base.TestPollsterBase):
         # only one sample, and value is 19(0x13 as current_value)
         self._verify_metering(1, 19, CONF.host)
 
+    @mock.patch('ceilometer.pipeline.setup_pipeline', mock.MagicMock())
+    def test_get_samples_read_once_per_interval(self):
+        self._test_get_samples()
+        cache = {}
+        for i in range(2):
+            samples = list(self.pollster.get_samples(self.mgr, cache, {}))
+            self.assertEqual(1, len(samples))
+        self.pollster.nodemanager.read_power_all.assert_called_once_with()
+
 
 class TestTemperaturePollster(base.TestPollsterBase):
 
@@ -174,3 +174,27 @@ class TestVoltageSensorPollster(base.TestPollsterBase):
         self._test_get_samples()
 
         self._verify_metering(4, float(3.309), CONF.host)
+
+
+class TestSensorPollstersSharedRead(base.TestPollsterBase):
+
+    def fake_sensor_data(self, sensor_type):
+        return dict(TEMPERATURE_SENSOR_DATA, **FAN_SENSOR_DATA)
+
+    def fake_data(self):
+        # No use for Sensor test
+        return None
+
+    def make_pollster(self):
+        return sensor.TemperatureSensorPollster()
+
+    @mock.patch('ceilometer.pipeline.setup_pipeline', mock.MagicMock())
+    def test_get_samples(self):
+        self._test_get_samples()
+        cache = {}
+        temperature = list(self.pollster.get_samples(self.mgr, cache, {}))
+        fan = list(sensor.FanSensorPollster().get_samples(self.mgr, cache,
+                                                          {}))
+        self.assertEqual(10, len(temperature))
+        self.assertEqual(12, len(fan))
+        self.pollster.ipmi.read_sensor_any.assert_called_once_with('')
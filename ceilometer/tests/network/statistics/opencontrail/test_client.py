@@ -24,11 +24,12 @@ class TestOpencontrailClient(base.BaseTestCase):
 
     def setUp(self):
         super(TestOpencontrailClient, self).setUp()
+        self.addCleanup(mock.patch.stopall)
         self.client = client.Client('http://127.0.0.1:8143',
                                     'admin', 'admin', None, False)
 
         self.post_resp = mock.MagicMock()
-        self.post = mock.patch('requests.post',
+        self.post = mock.patch('requests.Session.post',
                                return_value=self.post_resp).start()
 
         self.post_resp.raw.version = 1.1
@@ -39,7 +40,7 @@ class TestOpencontrailClient(base.BaseTestCase):
         self.post_resp.content = 'dummy'
 
         self.get_resp = mock.MagicMock()
-        self.get = mock.patch('requests.get',
+        self.get = mock.patch('requests.Session.get',
                               return_value=self.get_resp).start()
         self.get_resp.raw_version = 1.1
         self.get_resp.status_code = 200
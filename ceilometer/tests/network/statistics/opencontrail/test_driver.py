@@ -143,3 +143,28 @@ class TestOpencontrailDriver(base.BaseTestCase):
               'tenant_id': '89271fa581ab4380bf172f868c3615f9'},
              mock.ANY)]
         self._test_meter('switch.port.transmit.bytes', expected)
+
+    def test_failed_network_skipped(self):
+        failed_net = dict(self.fake_networks()[0], id='failed-net')
+        self.nc_networks.stop()
+        mock.patch('ceilometer.neutron_client.Client.network_get_all',
+                   return_value=[failed_net] + self.fake_networks()).start()
+
+        def fake_port_stats(net_id):
+            if net_id == 'failed-net':
+                raise Exception()
+            return self.fake_port_stats()
+
+        cache = {}
+        with mock.patch('ceilometer.network.statistics.opencontrail.'
+                        'client.NetworksAPIClient.get_port_statistics',
+                        side_effect=fake_port_stats) as port_stats:
+            for meter_name in ('switch.port.receive.packets',
+                               'switch.port.transmit.bytes'):
+                samples = list(self.driver.get_sample_data(
+                    meter_name, self.parse_url, self.params, cache))
+                self.assertEqual(1, len(samples))
+                self.assertEqual('298a3088-a446-4d5a-bad8-f92ecacd786b',
+                                 samples[0][2]['network_id'])
+            # the statistics are only requested once per interval
+            self.assertEqual(2, port_stats.call_count)
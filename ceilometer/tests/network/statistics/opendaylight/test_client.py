@@ -29,6 +29,7 @@ class TestClientHTTPBasicAuth(base.BaseTestCase):
 
     def setUp(self):
         super(TestClientHTTPBasicAuth, self).setUp()
+        self.addCleanup(mock.patch.stopall)
         self.parsed_url = urlparse.urlparse(
             'http://127.0.0.1:8080/controller/nb/v2?container_name=default&'
             'container_name=egg&auth=%s&user=admin&password=admin_pass&'
@@ -45,7 +46,7 @@ class TestClientHTTPBasicAuth(base.BaseTestCase):
         self.client = client.Client(self.endpoint, odl_params)
 
         self.resp = mock.MagicMock()
-        self.get = mock.patch('requests.get',
+        self.get = mock.patch('requests.Session.get',
                               return_value=self.resp).start()
 
         self.resp.raw.version = 1.1
@@ -149,8 +150,7 @@ class TestClientHTTPBasicAuth(base.BaseTestCase):
         class _Exception(Exception):
             pass
 
-        self.get = mock.patch('requests.get',
-                              side_effect=_Exception).start()
+        self.get.side_effect = _Exception
 
         self.assertRaises(_Exception,
                           self.client.statistics.get_flow_statistics,
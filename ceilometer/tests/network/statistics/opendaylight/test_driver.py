@@ -13,8 +13,10 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 import abc
+import threading
 
 import mock
+from oslo.serialization import jsonutils
 from oslotest import base
 import six
 from six import moves
@@ -367,6 +369,23 @@ class TestOpenDayLightDriverSimple(_Base):
         ]
         self._test_for_meter('switch.port', expected_data)
 
+    def test_partial_results(self):
+        mock.patch('ceilometer.network.statistics.opendaylight.client.'
+                   'StatisticsAPIClient.get_flow_statistics',
+                   side_effect=Exception()).start()
+        mock.patch('ceilometer.network.statistics.opendaylight.client.'
+                   'TopologyAPIClient.get_topology',
+                   side_effect=Exception()).start()
+        cache = {}
+        self.assertEqual([], self.driver.get_sample_data(
+            'switch.flow', self.fake_odl_url, self.fake_params, cache))
+        self.assertEqual(1, len(self.driver.get_sample_data(
+            'switch', self.fake_odl_url, self.fake_params, cache)))
+        port_data = self.driver.get_sample_data(
+            'switch.port', self.fake_odl_url, self.fake_params, cache)
+        self.assertEqual(1, len(port_data))
+        self.assertNotIn('topology_node_id', port_data[0][2])
+
     def test_meter_switch_port_receive_packets(self):
         expected_data = [
             (0, "00:00:00:00:00:00:00:02", {
@@ -1704,3 +1723,82 @@ class TestOpenDayLightDriverComplex(_Base):
                 "flow_priority": "1"}),
         ]
         self._test_for_meter('switch.flow.bytes', expected_data)
+
+
+class TestOpenDayLightDriverLocalServer(base.BaseTestCase):
+    """Poll a local stand-in of the OpenDaylight NorthBound REST API."""
+
+    responses = {
+        '/statistics/default/port': TestOpenDayLightDriverSimple.port_data,
+        '/statistics/default/table': TestOpenDayLightDriverSimple.table_data,
+        '/topology/default': TestOpenDayLightDriverSimple.topology_data,
+        '/topology/default/userLinks':
+        TestOpenDayLightDriverSimple.user_links_data,
+        '/switchmanager/default/nodes':
+        TestOpenDayLightDriverSimple.switch_data,
+        '/hosttracker/default/hosts/active':
+        TestOpenDayLightDriverSimple.active_hosts_data,
+        '/hosttracker/default/hosts/inactive':
+        TestOpenDayLightDriverSimple.inactive_hosts_data,
+    }
+
+    def setUp(self):
+        super(TestOpenDayLightDriverLocalServer, self).setUp()
+        test = self
+        self.requests = []
+        self.connections = []
+
+        class Handler(moves.BaseHTTPServer.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                test.connections.append(self.client_address)
+                moves.BaseHTTPServer.BaseHTTPRequestHandler.setup(self)
+
+            def do_GET(self):
+                path = self.path[len('/controller/nb/v2'):]
+                test.requests.append(path)
+                if path in test.responses:
+                    code, body = 200, jsonutils.dumps(test.responses[path])
+                else:
+                    code, body = 500, ''
+                self.send_response(code)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        class Server(moves.socketserver.ThreadingMixIn,
+                     moves.BaseHTTPServer.HTTPServer):
+            daemon_threads = True
+
+        self.server = Server(('127.0.0.1', 0), Handler)
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.driver = driver.OpenDayLightDriver()
+        self.url = url_parse.ParseResult(
+            'opendaylight', '127.0.0.1:%d' % self.server.server_port,
+            '/controller/nb/v2', None, None, None)
+        self.params = url_parse.parse_qs('scheme=http&'
+                                         'container_name=default')
+
+    def test_get_sample_data(self):
+        cache = {}
+        self.assertEqual([], self.driver.get_sample_data(
+            'switch.flow', self.url, self.params, cache))
+        switch = self.driver.get_sample_data('switch', self.url,
+                                             self.params, cache)
+        self.assertEqual('00:00:00:00:00:00:00:02', switch[0][1])
+        self.assertEqual(8, len(self.requests))
+
+        # connections are kept alive between intervals
+        self.driver.get_sample_data('switch', self.url, self.params, {})
+        self.assertEqual(16, len(self.requests))
+        self.assertTrue(len(self.connections) < len(self.requests))
@@ -114,6 +114,7 @@ class TestSwiftPollster(testscenarios.testcase.WithScenarios,
     def tearDown(self):
         super(TestSwiftPollster, self).tearDown()
         swift._Base._ENDPOINT = None
+        swift._Base._CONN_POOL = None
 
     def test_iter_accounts_no_cache(self):
         cache = {}
@@ -180,16 +181,60 @@ class TestSwiftPollster(testscenarios.testcase.WithScenarios,
         endpoint = 'end://point/'
         api_method = '%s_account' % self.pollster.METHOD
         with mockpatch.PatchObject(swift_client, api_method, new=mock_method):
-            with mockpatch.PatchObject(
-                    self.manager.keystone.service_catalog, 'url_for',
-                    return_value=endpoint):
-                list(self.pollster.get_samples(self.manager, {},
-                                               ASSIGNED_TENANTS))
+            with mockpatch.PatchObject(swift_client, 'http_connection',
+                                       return_value=(None, mock.Mock())):
+                with mockpatch.PatchObject(
+                        self.manager.keystone.service_catalog, 'url_for',
+                        return_value=endpoint):
+                    list(self.pollster.get_samples(self.manager, {},
+                                                   ASSIGNED_TENANTS))
         expected = [mock.call(self.pollster._neaten_url(endpoint, t.id),
-                              self.manager.keystone.auth_token)
+                              self.manager.keystone.auth_token,
+                              http_conn=mock.ANY)
                     for t in ASSIGNED_TENANTS]
         self.assertEqual(expected, mock_method.call_args_list)
 
+    def test_connections_reused(self):
+        conn = mock.Mock()
+        endpoint = 'http://point/'
+        api_method = '%s_account' % self.pollster.METHOD
+        with mockpatch.PatchObject(swift_client, api_method,
+                                   new=mock.MagicMock()) as mock_method:
+            with mockpatch.PatchObject(swift_client, 'http_connection',
+                                       return_value=(None, conn)) as mock_conn:
+                with mockpatch.PatchObject(
+                        self.manager.keystone.service_catalog, 'url_for',
+                        return_value=endpoint):
+                    list(self.pollster.get_samples(self.manager, {},
+                                                   ASSIGNED_TENANTS))
+                    list(self.pollster.get_samples(self.manager, {},
+                                                   ASSIGNED_TENANTS))
+        mock_conn.mock.assert_called_once_with(endpoint)
+        for call, tenant in zip(mock_method.mock.call_args_list,
+                                ASSIGNED_TENANTS * 2):
+            parsed, http_conn = call[1]['http_conn']
+            self.assertEqual(conn, http_conn)
+            self.assertEqual('/v1/AUTH_' + tenant.id, parsed.path)
+
+    def test_failed_account_skipped(self):
+        def fake_api_method(url, token, http_conn):
+            if url.endswith(ASSIGNED_TENANTS[1].id):
+                raise swift_client.ClientException('Account HEAD failed')
+            return dict(self.ACCOUNTS)[url.rsplit('_', 1)[1]]
+
+        api_method = '%s_account' % self.pollster.METHOD
+        with mockpatch.PatchObject(swift_client, api_method,
+                                   side_effect=fake_api_method):
+            with mockpatch.PatchObject(swift_client, 'http_connection',
+                                       return_value=(None, mock.Mock())):
+                with mockpatch.PatchObject(
+                        self.manager.keystone.service_catalog, 'url_for',
+                        return_value='http://point/'):
+                    samples = list(self.pollster.get_samples(
+                        self.manager, {}, ASSIGNED_TENANTS))
+        self.assertEqual(set([ASSIGNED_TENANTS[0].id]),
+                         set(s.project_id for s in samples))
+
     def test_get_endpoint_only_once(self):
         mock_url_for = mock.MagicMock()
         api_method = '%s_account' % self.pollster.METHOD
@@ -212,3 +257,29 @@ class TestSwiftPollster(testscenarios.testcase.WithScenarios,
                                                      ASSIGNED_TENANTS))
 
         self.assertEqual(0, len(samples))
+
+
+class TestSwiftPollstersSharedCache(base.BaseTestCase):
+
+    def tearDown(self):
+        super(TestSwiftPollstersSharedCache, self).tearDown()
+        swift._Base._ENDPOINT = None
+        swift._Base._CONN_POOL = None
+
+    def test_account_fetched_once_per_interval(self):
+        pollsters = [swift.ObjectsPollster(),
+                     swift.ObjectsSizePollster(),
+                     swift.ObjectsContainersPollster()]
+        ksclient = mock.MagicMock()
+        ksclient.service_catalog.url_for.return_value = 'http://point/'
+        manager = mock.Mock(keystone=ksclient)
+        cache = {}
+        with mockpatch.PatchObject(swift_client, 'head_account',
+                                   return_value=HEAD_ACCOUNTS[0][1]) as head:
+            with mockpatch.PatchObject(swift_client, 'http_connection',
+                                       return_value=(None, mock.Mock())):
+                samples = [s for p in pollsters
+                           for s in p.get_samples(manager, cache,
+                                                  ASSIGNED_TENANTS)]
+        self.assertEqual(6, len(samples))
+        self.assertEqual(len(ASSIGNED_TENANTS), head.mock.call_count)
@@ -16,6 +16,7 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import eventlet
 import mock
 from oslo.config import fixture as fixture_config
 from oslotest import mockpatch
@@ -110,6 +111,7 @@ class TestSwiftMiddleware(tests_base.BaseTestCase):
         self.assertEqual('1.0', data.resource_metadata['version'])
         self.assertEqual('container', data.resource_metadata['container'])
         self.assertEqual('obj', data.resource_metadata['object'])
+        self.assertNotIn('method', data.resource_metadata)
 
         # test the # of request and the request method
         data = samples[1]
@@ -132,6 +134,7 @@ class TestSwiftMiddleware(tests_base.BaseTestCase):
         self.assertEqual('1.0', data.resource_metadata['version'])
         self.assertEqual('container', data.resource_metadata['container'])
         self.assertEqual('obj', data.resource_metadata['object'])
+        self.assertNotIn('method', data.resource_metadata)
 
         # test the # of request and the request method
         data = samples[1]
@@ -342,3 +345,69 @@ class TestSwiftMiddleware(tests_base.BaseTestCase):
         list(app(req.environ, self.start_response))
         samples = self.pipeline_manager.pipelines[0].samples[0]
         self.assertEqual("account", samples.resource_id)
+
+    def _nonblocking_app(self, **conf):
+        conf['nonblocking_publish'] = 'true'
+        return swift_middleware.CeilometerMiddleware(FakeApp(), conf)
+
+    def _request(self, app, path='/1.0/account/container/obj'):
+        req = FakeRequest(path, environ={'REQUEST_METHOD': 'GET'})
+        list(app(req.environ, self.start_response))
+
+    def test_nonblocking_publish(self):
+        app = self._nonblocking_app()
+        with mock.patch.object(self.pipeline_manager.pipelines[0],
+                               'publish_samples',
+                               wraps=self.pipeline_manager.pipelines[0].
+                               publish_samples) as publish_samples:
+            for i in range(3):
+                self._request(app)
+            # nothing is published in the request path
+            samples = self.pipeline_manager.pipelines[0].samples
+            self.assertEqual(0, len(samples))
+
+            eventlet.sleep(0)
+            # all the queued requests are published at once
+            self.assertEqual(1, publish_samples.call_count)
+        self.assertEqual(6, len(samples))
+        self.assertEqual(['storage.objects.outgoing.bytes',
+                          'storage.api.request'] * 3,
+                         [s.name for s in samples])
+        self.assertNotIn('method', samples[0].resource_metadata)
+        self.assertEqual('get', samples[1].resource_metadata['method'])
+        self.assertEqual(0, app.dropped_requests)
+
+    def test_nonblocking_publish_batch_size(self):
+        app = self._nonblocking_app(send_batch_size='2')
+        with mock.patch.object(self.pipeline_manager.pipelines[0],
+                               'publish_samples') as publish_samples:
+            for i in range(3):
+                self._request(app)
+            eventlet.sleep(0)
+        self.assertEqual([4, 2], [len(c[0][1]) for c in
+                                  publish_samples.call_args_list])
+
+    def test_nonblocking_publish_drop_newest(self):
+        app = self._nonblocking_app(send_queue_size='1')
+        self._request(app, '/1.0/account/first')
+        self._request(app, '/1.0/account/second')
+        self.assertEqual(1, app.dropped_requests)
+        eventlet.sleep(0)
+        samples = self.pipeline_manager.pipelines[0].samples
+        self.assertEqual(['first', 'first'],
+                         [s.resource_metadata['container'] for s in samples])
+
+    def test_nonblocking_publish_drop_oldest(self):
+        app = self._nonblocking_app(send_queue_size='1',
+                                    send_queue_overflow='drop_oldest')
+        self._request(app, '/1.0/account/first')
+        self._request(app, '/1.0/account/second')
+        self.assertEqual(1, app.dropped_requests)
+        eventlet.sleep(0)
+        samples = self.pipeline_manager.pipelines[0].samples
+        self.assertEqual(['second', 'second'],
+                         [s.resource_metadata['container'] for s in samples])
+
+    def test_invalid_send_queue_overflow(self):
+        self.assertRaises(ValueError, self._nonblocking_app,
+                          send_queue_overflow='drop_all')
@@ -39,7 +39,7 @@ class CapabilitiesTest(test_base.BaseTestCase):
 
     def test_capabilities(self):
         expected_capabilities = {
-            'meters': {'pagination': False,
+            'meters': {'pagination': True,
                        'query': {'simple': True,
                                  'metadata': True,
                                  'complex': False}},
@@ -47,7 +47,7 @@ class CapabilitiesTest(test_base.BaseTestCase):
                           'query': {'simple': True,
                                     'metadata': True,
                                     'complex': False}},
-            'samples': {'pagination': False,
+            'samples': {'pagination': True,
                         'groupby': False,
                         'query': {'simple': True,
                                   'metadata': True,
@@ -148,15 +148,15 @@ class CapabilitiesTest(test_base.BaseTestCase):
 
     def test_capabilities(self):
         expected_capabilities = {
-            'meters': {'pagination': False,
+            'meters': {'pagination': True,
                        'query': {'simple': True,
                                  'metadata': True,
                                  'complex': False}},
-            'resources': {'pagination': False,
+            'resources': {'pagination': True,
                           'query': {'simple': True,
                                     'metadata': True,
                                     'complex': False}},
-            'samples': {'pagination': False,
+            'samples': {'pagination': True,
                         'groupby': False,
                         'query': {'simple': True,
                                   'metadata': True,
@@ -31,8 +31,12 @@ from oslo.utils import timeutils
 from ceilometer.alarm.storage import impl_sqlalchemy as impl_sqla_alarm
 from ceilometer.event.storage import impl_sqlalchemy as impl_sqla_event
 from ceilometer.event.storage import models
+from ceilometer.publisher import utils
+from ceilometer import sample
+from ceilometer import storage
 from ceilometer.storage import impl_sqlalchemy
 from ceilometer.storage.sqlalchemy import models as sql_models
+from ceilometer.storage.sqlalchemy import utils as sql_utils
 from ceilometer.tests import base as test_base
 from ceilometer.tests import db as tests_db
 from ceilometer.tests.storage import test_storage_scenarios as scenarios
@@ -155,13 +159,82 @@ class EventTest(tests_db.TestBase):
         m = [models.Event("1", "Foo", now, []),
              models.Event("2", "Zoo", now, [])]
 
-        with mock.patch.object(self.event_conn, "_record_event") as mock_save:
-            mock_save.side_effect = MyException("Boom")
-            problem_events = self.event_conn.record_events(m)
+        with mock.patch.object(self.event_conn, "_insert_events",
+                               side_effect=MyException("Boom")):
+            with mock.patch.object(self.event_conn,
+                                   "_record_event") as mock_save:
+                mock_save.side_effect = MyException("Boom")
+                problem_events = self.event_conn.record_events(m)
         self.assertEqual(2, len(problem_events))
         for bad, event in problem_events:
             self.assertEqual(bad, models.Event.UNKNOWN_PROBLEM)
 
+    def test_record_events_in_bulk(self):
+        now = datetime.datetime.utcnow()
+        m = [models.Event("1", "Foo", now,
+                          [models.Trait("A", models.Trait.TEXT_TYPE, "a"),
+                           models.Trait("B", models.Trait.INT_TYPE, 1)]),
+             models.Event("2", "Foo", now,
+                          [models.Trait("A", models.Trait.TEXT_TYPE, "b")]),
+             models.Event("1", "Zoo", now, [])]
+
+        with mock.patch.object(self.event_conn, "_record_event") as mock_save:
+            problem_events = self.event_conn.record_events(m)
+        self.assertFalse(mock_save.called)
+        self.assertEqual([(models.Event.DUPLICATE, m[2])], problem_events)
+        self.assertEqual(["Foo"], list(self.event_conn.get_event_types()))
+        self.assertEqual(
+            ["a", "b"],
+            sorted(t.value for t in self.event_conn.get_traits("Foo", "A")))
+
+        # the type ids are not read again for the next batch
+        m = [models.Event("3", "Foo", now,
+                          [models.Trait("B", models.Trait.INT_TYPE, 2)])]
+        with mock.patch.object(self.event_conn, "_create_type") as create:
+            self.assertEqual([], self.event_conn.record_events(m))
+        self.assertFalse(create.called)
+        self.assertEqual(
+            [1, 2],
+            sorted(t.value for t in self.event_conn.get_traits("Foo", "B")))
+
+    def test_bulk_failure_recorded_one_by_one(self):
+        now = datetime.datetime.utcnow()
+        m = [models.Event("1", "Foo", now, []),
+             models.Event("2", "Zoo", now, [])]
+
+        with mock.patch.object(self.event_conn, "_insert_events",
+                               side_effect=MyException("Boom")):
+            self.assertEqual([], self.event_conn.record_events(m))
+        self.assertEqual(["Foo", "Zoo"],
+                         list(self.event_conn.get_event_types()))
+
+    def test_events_read_by_chunks(self):
+        start = datetime.datetime(2015, 1, 1)
+        m = [models.Event(str(i), "Foo", start + datetime.timedelta(
+            seconds=i), [models.Trait("A", models.Trait.INT_TYPE, i)])
+            for i in range(5)]
+        self.assertEqual([], self.event_conn.record_events(m))
+        retrieve = impl_sqla_event.Connection._retrieve_events
+        with mock.patch.object(impl_sqla_event, '_READ_CHUNK_SIZE', 2):
+            with mock.patch.object(impl_sqla_event.Connection,
+                                   '_retrieve_events',
+                                   wraps=retrieve) as retrieve_events:
+                events = self.event_conn.get_events(storage.EventFilter())
+                self.assertEqual("0", next(events).message_id)
+                # only the first chunk is read
+                self.assertEqual(1, retrieve_events.call_count)
+                self.assertEqual(["1", "2", "3", "4"],
+                                 [e.message_id for e in events])
+                self.assertEqual(3, retrieve_events.call_count)
+
+                retrieve_events.reset_mock()
+                events = list(self.event_conn.get_events(
+                    storage.EventFilter(), limit=3, marker="0"))
+        self.assertEqual(["1", "2", "3"], [e.message_id for e in events])
+        self.assertEqual([[1], [2], [3]],
+                         [[t.value for t in e.traits] for e in events])
+        self.assertEqual(2, retrieve_events.call_count)
+
     def test_get_none_value_traits(self):
         model = sql_models.Trait(None, None, 5)
         self.assertIsNone(model.get_value())
@@ -173,6 +246,70 @@ class EventTest(tests_db.TestBase):
         self.assertTrue(repr.repr(ev))
 
 
+class EventTypeCreationTest(tests_db.TestBase,
+                            tests_db.MixinTestsWithBackendScenarios):
+
+    # relies on the unique event type descriptions, which the migrated
+    # schema lacks on SQLite
+    @tests_db.run_with('mysql', 'postgresql')
+    def test_type_created_concurrently(self):
+        et = self.event_conn._get_or_create_event_type("Foo")
+        tt = self.event_conn._get_or_create_trait_type(
+            "A", models.Trait.TEXT_TYPE)
+        # the types written by another collector are read from the database
+        self.assertEqual({"Foo": et.id},
+                         self.event_conn._get_event_type_ids(["Foo"]))
+        self.assertEqual(
+            et.id,
+            self.event_conn._create_type(
+                sql_models.EventType("Foo"),
+                lambda s: s.query(sql_models.EventType).filter(
+                    sql_models.EventType.desc == "Foo")))
+        self.assertEqual(
+            tt.id,
+            self.event_conn._create_type(
+                sql_models.TraitType("A", models.Trait.TEXT_TYPE),
+                lambda s: s.query(sql_models.TraitType).filter(
+                    sql_models.TraitType.desc == "A")))
+
+
+@tests_db.run_with('sqlite')
+class SampleChunksTest(tests_db.TestBase):
+
+    def setUp(self):
+        super(SampleChunksTest, self).setUp()
+        start = datetime.datetime(2015, 1, 1)
+        for i in range(5):
+            s = sample.Sample('cpu', sample.TYPE_CUMULATIVE, 'ns', i,
+                              'user-id', 'project-id', 'resource-id',
+                              timestamp=start + datetime.timedelta(seconds=i),
+                              resource_metadata={}, source='test')
+            self.conn.record_metering_data(utils.meter_message_from_counter(
+                s, self.CONF.publisher.metering_secret))
+
+    def _get_samples(self, **kwargs):
+        retrieve = impl_sqlalchemy.Connection._retrieve_samples
+        with mock.patch.object(impl_sqlalchemy, '_CHUNK_SIZE', 2):
+            with mock.patch.object(impl_sqlalchemy.Connection,
+                                   '_retrieve_samples',
+                                   wraps=retrieve) as retrieve_samples:
+                samples = self.conn.get_samples(storage.SampleFilter(),
+                                                **kwargs)
+                first = next(samples)
+                # only the first chunk is read
+                self.assertEqual(1, retrieve_samples.call_count)
+                volumes = [first.counter_volume] + [s.counter_volume
+                                                    for s in samples]
+        return volumes, retrieve_samples.call_count
+
+    def test_samples_read_by_chunks(self):
+        self.assertEqual(([4, 3, 2, 1, 0], 3), self._get_samples())
+
+    def test_samples_read_by_chunks_with_limit(self):
+        self.assertEqual(([4, 3, 2], 2), self._get_samples(limit=3))
+        self.assertEqual(([4, 3], 1), self._get_samples(limit=2))
+
+
 @tests_db.run_with('sqlite')
 class RelationshipTest(scenarios.DBTestBase):
     # Note: Do not derive from SQLAlchemyEngineTestBase, since we
@@ -189,22 +326,40 @@ class RelationshipTest(scenarios.DBTestBase):
         for table in meta_tables:
             self.assertEqual(0, (session.query(table)
                                  .filter(~table.id.in_(
-                                     session.query(sql_models.Sample.id)
-                                     .group_by(sql_models.Sample.id))).count()
+                                     session.query(
+                                         sql_models.Sample.resource_id)
+                                     .group_by(
+                                         sql_models.Sample.resource_id)))
+                                 .count()
                                  ))
 
 
+class QueryTransformerTest(tests_db.TestBase):
+
+    def test_metadata_key_joined_once(self):
+        session = self.conn._engine_facade.get_session()
+        transformer = sql_utils.QueryTransformer(
+            sql_models.FullSample, session.query(sql_models.FullSample))
+        transformer.apply_filter(
+            {"or": [{"=": {"resource_metadata.a": "1"}},
+                    {"=": {"resource_metadata.a": "2"}},
+                    {"=": {"resource_metadata.b": "3"}},
+                    {"=": {"resource_metadata.a": 4}}]})
+        sql = str(transformer.get_query())
+        self.assertEqual(3, sql.count('LEFT OUTER JOIN'))
+
+
 class CapabilitiesTest(test_base.BaseTestCase):
     # Check the returned capabilities list, which is specific to each DB
     # driver
 
     def test_capabilities(self):
         expected_capabilities = {
-            'meters': {'pagination': False,
+            'meters': {'pagination': True,
                        'query': {'simple': True,
                                  'metadata': True,
                                  'complex': False}},
-            'resources': {'pagination': False,
+            'resources': {'pagination': True,
                           'query': {'simple': True,
                                     'metadata': True,
                                     'complex': False}},
@@ -20,8 +20,10 @@
 """
 
 import datetime
+import logging
 import operator
 
+import fixtures
 import mock
 from oslo.config import cfg
 from oslo.utils import timeutils
@@ -429,51 +431,64 @@ class MeterTest(DBTestBase,
 class MeterTestPagination(DBTestBase,
                           tests_db.MixinTestsWithBackendScenarios):
 
-    def tet_get_meters_all_limit(self):
-        pagination = base.Pagination(limit=8)
+    def test_get_meters_all_limit(self):
+        pagination = base.Pagination(limit=8, primary_sort_dir='asc')
         results = list(self.conn.get_meters(pagination=pagination))
         self.assertEqual(8, len(results))
 
-        pagination = base.Pagination(limit=5)
+        pagination = base.Pagination(limit=5, primary_sort_dir='asc')
         results = list(self.conn.get_meters(pagination=pagination))
         self.assertEqual(5, len(results))
 
     def test_get_meters_all_marker(self):
-        pagination = base.Pagination(limit=3, primary_sort_dir='desc',
-                                     sort_keys=['user_id'],
-                                     sort_dirs=['desc'],
-                                     marker_value='resource-id-5')
-
+        pagination = base.Pagination(primary_sort_dir='asc',
+                                     marker_value=('resource-id-5',
+                                                   'instance'))
         results = list(self.conn.get_meters(pagination=pagination))
-        self.assertEqual(8, len(results))
+        self.assertEqual(['resource-id-6', 'resource-id-7', 'resource-id-8',
+                          'resource-id-alternate'],
+                         [i.resource_id for i in results])
 
     def test_get_meters_paginate(self):
-        pagination = base.Pagination(limit=3, primary_sort_dir='desc',
-                                     sort_keys=['user_id'], sort_dirs=['desc'],
-                                     marker_value='resource-id-5')
+        pagination = base.Pagination(limit=3, primary_sort_dir='asc',
+                                     marker_value=('resource-id-4',
+                                                   'instance'))
         results = self.conn.get_meters(pagination=pagination)
-        self.assertEqual(['user-id-8', 'user-id-7', 'user-id-6'],
-                         [i.user_id for i in results])
+        self.assertEqual(['resource-id-5', 'resource-id-6', 'resource-id-7'],
+                         [i.resource_id for i in results])
 
         pagination = base.Pagination(limit=3, primary_sort_dir='asc',
-                                     sort_keys=['user_id'], sort_dirs=['desc'],
-                                     marker_value='resource-id-5')
+                                     marker_value=('resource-id-7',
+                                                   'instance'))
         results = self.conn.get_meters(pagination=pagination)
-        self.assertEqual(['user-id-5', 'user-id-6', 'user-id-7'],
-                         [i.user_id for i in results])
+        self.assertEqual(['resource-id-8', 'resource-id-alternate'],
+                         [i.resource_id for i in results])
 
+        pagination = base.Pagination(limit=3, primary_sort_dir='asc',
+                                     marker_value=('resource-id-alternate',
+                                                   'instance'))
+        results = self.conn.get_meters(pagination=pagination)
+        self.assertEqual([], [i.resource_id for i in results])
+
+    def test_get_meters_paginate_desc(self):
         pagination = base.Pagination(limit=2, primary_sort_dir='desc',
-                                     sort_keys=['user_id'], sort_dirs=['desc'],
-                                     marker_value='resource-id-5')
-        results = list(self.conn.get_meters(pagination=pagination))
-        self.assertEqual(['user-id-3', 'user-id-2'],
-                         [i.user_id for i in results])
+                                     marker_value=('resource-id-5',
+                                                   'instance'))
+        results = self.conn.get_meters(pagination=pagination)
+        self.assertEqual(['resource-id-4', 'resource-id-3'],
+                         [i.resource_id for i in results])
 
-        pagination = base.Pagination(limit=3, primary_sort_dir='desc',
-                                     sort_keys=['user_id'], sort_dirs=['desc'],
-                                     marker_value='resource-id-5')
+    def test_get_meters_paginate_same_resource(self):
+        self.create_and_store_sample(name='cpu', resource_id='resource-id-5')
+        self.create_and_store_sample(name='memory',
+                                     resource_id='resource-id-5')
+        pagination = base.Pagination(limit=3, primary_sort_dir='asc',
+                                     marker_value=('resource-id-5', 'cpu'))
         results = self.conn.get_meters(pagination=pagination)
-        self.assertEqual([], [i.user_id for i in results])
+        self.assertEqual([('resource-id-5', 'instance'),
+                          ('resource-id-5', 'memory'),
+                          ('resource-id-6', 'instance')],
+                         [(i.resource_id, i.name) for i in results])
 
 
 class RawSampleTest(DBTestBase,
@@ -502,9 +517,36 @@ class RawSampleTest(DBTestBase,
         f = storage.SampleFilter()
         results = list(self.conn.get_samples(f, limit=3))
         self.assertEqual(3, len(results))
+
         for result in results:
             self.assertTimestampEqual(timeutils.utcnow(), result.recorded_at)
 
+    def test_get_samples_paginate(self):
+        f = storage.SampleFilter()
+        expected = [s.message_id for s in self.conn.get_samples(f)]
+        results = self.conn.get_samples(f, limit=3, marker=expected[2])
+        self.assertEqual(expected[3:6], [s.message_id for s in results])
+
+    def test_get_samples_paginate_all(self):
+        f = storage.SampleFilter(user='user-id')
+        expected = [s.message_id for s in self.conn.get_samples(f)]
+        results = []
+        marker = None
+        while True:
+            page = [s.message_id
+                    for s in self.conn.get_samples(f, limit=2, marker=marker)]
+            results.extend(page)
+            if len(page) < 2:
+                break
+            marker = page[-1]
+        self.assertEqual(expected, results)
+
+    def test_get_samples_unknown_marker(self):
+        f = storage.SampleFilter()
+        self.assertRaises(base.NoResultFound,
+                          lambda: list(self.conn.get_samples(
+                              f, marker='unknown')))
+
     def test_get_samples_in_default_order(self):
         f = storage.SampleFilter()
         prev_timestamp = None
@@ -676,6 +718,56 @@ class RawSampleTest(DBTestBase,
         results = list(self.conn.get_resources())
         self.assertEqual(5, len(results))
 
+    @tests_db.run_with('sqlite', 'hbase')
+    def test_clear_metering_data_by_batches(self):
+        self.mock_utcnow.return_value = datetime.datetime(2012, 7, 2, 10, 45)
+        with mock.patch('time.sleep') as sleep:
+            self.conn.clear_expired_metering_data(3 * 60, batch_size=2,
+                                                  pause=0.5)
+        sleep.assert_any_call(0.5)
+        f = storage.SampleFilter(meter='instance')
+        results = list(self.conn.get_samples(f))
+        self.assertEqual(5, len(results))
+        results = list(self.conn.get_resources())
+        self.assertEqual(5, len(results))
+
+    @tests_db.run_with('sqlite', 'hbase')
+    def test_clear_metering_data_progress_logged(self):
+        self.mock_utcnow.return_value = datetime.datetime(2012, 7, 2, 10, 45)
+        logger = self.useFixture(fixtures.FakeLogger(level=logging.INFO))
+        self.conn.clear_expired_metering_data(3 * 60, batch_size=2)
+        progress = [line for line in logger.output.splitlines()
+                    if line.endswith('so far')]
+        samples = [line for line in progress if 'samples removed' in line]
+        self.assertTrue(len(samples) > 1)
+        self.assertTrue(samples[-1].endswith(', 7 so far'))
+        resources = [line for line in progress
+                     if 'resources removed' in line]
+        self.assertTrue(len(resources) > 1)
+        self.assertEqual(len(samples) + len(resources), len(progress))
+
+    @tests_db.run_with('sqlite', 'hbase')
+    def test_clear_metering_data_resumed(self):
+        self.mock_utcnow.return_value = datetime.datetime(2012, 7, 2, 10, 45)
+
+        def interrupt(seconds):
+            if seconds == 1:
+                raise KeyboardInterrupt()
+
+        with mock.patch('time.sleep', side_effect=interrupt):
+            self.assertRaises(KeyboardInterrupt,
+                              self.conn.clear_expired_metering_data,
+                              3 * 60, batch_size=2, pause=1)
+        f = storage.SampleFilter(meter='instance')
+        results = list(self.conn.get_samples(f))
+        self.assertEqual(10, len(results))
+
+        self.conn.clear_expired_metering_data(3 * 60, batch_size=2)
+        results = list(self.conn.get_samples(f))
+        self.assertEqual(5, len(results))
+        results = list(self.conn.get_resources())
+        self.assertEqual(5, len(results))
+
     @tests_db.run_with('sqlite', 'hbase', 'db2')
     def test_clear_metering_data_no_data_to_remove(self):
         # NOTE(jd) Override this test in MongoDB because our code doesn't clear
@@ -2805,6 +2897,19 @@ class AlarmTest(AlarmTestBase,
         alarms = list(self.alarm_conn.get_alarms(alarm_type='combination'))
         self.assertEqual(0, len(alarms))
 
+    def test_list_by_meter(self):
+        self.add_some_alarms()
+        alarms = list(self.alarm_conn.get_alarms(meter='test.fourty'))
+        self.assertEqual(['0r4ng3'], [a.alarm_id for a in alarms])
+
+        orange = alarms[0]
+        orange.rule['meter_name'] = 'test.one'
+        self.alarm_conn.update_alarm(orange)
+        alarms = list(self.alarm_conn.get_alarms(meter='test.fourty'))
+        self.assertEqual([], alarms)
+        alarms = list(self.alarm_conn.get_alarms(meter='test.one'))
+        self.assertEqual(2, len(alarms))
+
     def test_add(self):
         self.add_some_alarms()
         alarms = list(self.alarm_conn.get_alarms())
@@ -2863,6 +2968,19 @@ class AlarmTest(AlarmTestBase,
         all = list(self.alarm_conn.get_alarms())
         self.assertEqual(1, len(all))
 
+    def test_update_states(self):
+        self.add_some_alarms()
+        now = datetime.datetime(2015, 7, 2, 11, 0)
+        self.alarm_conn.update_alarm_states([
+            ('r3d', alarm_models.Alarm.ALARM_ALARM, now),
+            ('0r4ng3', alarm_models.Alarm.ALARM_OK, now)])
+        alarms = dict((a.alarm_id, a) for a in self.alarm_conn.get_alarms())
+        self.assertEqual(alarm_models.Alarm.ALARM_ALARM, alarms['r3d'].state)
+        self.assertEqual(now, alarms['r3d'].state_timestamp)
+        self.assertEqual(alarm_models.Alarm.ALARM_OK, alarms['0r4ng3'].state)
+        self.assertEqual('orange-alert', alarms['0r4ng3'].name)
+        self.assertNotEqual(now, alarms['y3ll0w'].state_timestamp)
+
     def test_delete(self):
         self.add_some_alarms()
         victim = list(self.alarm_conn.get_alarms(name='orange-alert'))[0]
@@ -3463,6 +3581,38 @@ class GetEventTest(EventTestBase):
         events = [event for event in self.event_conn.get_events(event_filter)]
         self.assertEqual(6, len(events))
 
+    def test_get_events_in_generated_order(self):
+        event_filter = storage.EventFilter()
+        events = list(self.event_conn.get_events(event_filter))
+        self.assertEqual([e.message_id for e in self.event_models],
+                         [e.message_id for e in events])
+        for event in events:
+            self.assertEqual(4, len(event.traits))
+
+    def test_get_events_paginated(self):
+        event_filter = storage.EventFilter()
+        events = list(self.event_conn.get_events(event_filter, limit=4))
+        self.assertEqual(["id_Foo_0", "id_Bar_100", "id_Zoo_200",
+                          "id_Foo_300"], [e.message_id for e in events])
+        events = list(self.event_conn.get_events(event_filter, limit=4,
+                                                 marker="id_Foo_300"))
+        self.assertEqual(["id_Bar_400", "id_Zoo_500"],
+                         [e.message_id for e in events])
+
+    def test_get_events_paginated_with_filter(self):
+        event_filter = storage.EventFilter(event_type="Foo")
+        events = list(self.event_conn.get_events(event_filter, limit=1))
+        self.assertEqual(["id_Foo_0"], [e.message_id for e in events])
+        events = list(self.event_conn.get_events(event_filter, limit=1,
+                                                 marker="id_Foo_0"))
+        self.assertEqual(["id_Foo_300"], [e.message_id for e in events])
+
+    def test_get_events_unknown_marker(self):
+        event_filter = storage.EventFilter()
+        self.assertRaises(base.NoResultFound, list,
+                          self.event_conn.get_events(event_filter,
+                                                     marker="unknown"))
+
     def test_get_by_message_id(self):
         new_events = [event_models.Event("id_testid",
                                          "MessageIDTest",
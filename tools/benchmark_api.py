@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Load benchmark of a running API server.
+
+Usage:
+
+source .tox/py27/bin/activate
+./tools/benchmark_api.py --clients 8 --duration 30 \\
+    /v2/meters/cpu_util/statistics
+
+It sends requests to the server from concurrent clients, each one keeping
+its connection open, and prints the throughput and the latencies of the
+requests. Comparing runs against servers started with different
+[api] workers values shows how they serve concurrent requests.
+"""
+from __future__ import print_function
+
+import argparse
+import threading
+import time
+
+from six.moves import http_client
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        description='benchmark the requests to a running API server',
+    )
+    parser.add_argument(
+        '--host',
+        default='127.0.0.1',
+        help='Host of the API server.',
+    )
+    parser.add_argument(
+        '--port',
+        default=8777,
+        type=int,
+        help='Port of the API server.',
+    )
+    parser.add_argument(
+        '--clients',
+        default=4,
+        type=int,
+        help='Number of concurrent clients.',
+    )
+    parser.add_argument(
+        '--duration',
+        default=10,
+        type=int,
+        help='Duration of the benchmark in seconds.',
+    )
+    parser.add_argument(
+        '--token',
+        help='Keystone token sent in the X-Auth-Token header.',
+    )
+    parser.add_argument(
+        '--header',
+        action='append',
+        default=[],
+        help='Additional header of the requests, as name:value.',
+    )
+    parser.add_argument(
+        'path',
+        help='Path of the requests, e.g. /v2/meters.',
+    )
+    return parser
+
+
+def run_client(args, headers, deadline, latencies, errors):
+    conn = http_client.HTTPConnection(args.host, args.port)
+    while time.time() < deadline:
+        started = time.time()
+        try:
+            conn.request('GET', args.path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+        except (http_client.HTTPException, IOError):
+            errors.append(1)
+            conn.close()
+            conn = http_client.HTTPConnection(args.host, args.port)
+            continue
+        if response.status != 200:
+            errors.append(response.status)
+        else:
+            latencies.append(time.time() - started)
+    conn.close()
+
+
+def main():
+    args = get_parser().parse_args()
+    headers = dict(h.split(':', 1) for h in args.header)
+    if args.token:
+        headers['X-Auth-Token'] = args.token
+
+    latencies = []
+    errors = []
+    deadline = time.time() + args.duration
+    clients = [threading.Thread(target=run_client,
+                                args=(args, headers, deadline,
+                                      latencies, errors))
+               for i in range(args.clients)]
+    started = time.time()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    elapsed = time.time() - started
+
+    latencies.sort()
+    print('%d requests, %d errors in %.1fs: %.1f requests/s' %
+          (len(latencies), len(errors), elapsed, len(latencies) / elapsed))
+    if latencies:
+        print('latency: median %.3fs, 95th percentile %.3fs, max %.3fs' %
+              (latencies[len(latencies) // 2],
+               latencies[int(len(latencies) * 0.95)],
+               latencies[-1]))
+    return 0
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Benchmark of the lookup of the event definition of a notification.
+
+Usage:
+
+source .tox/py27/bin/activate
+./tools/benchmark_event_definitions.py --definitions 500
+
+It times, per notification, the lookup of the event definition matching
+the event type of a notification among random definitions: the indexed
+lookup of the converter with and without its memoisation and, as points
+of comparison, a linear scan of the definitions with fnmatch and a linear
+scan of their compiled patterns.
+"""
+from __future__ import print_function
+
+import argparse
+import fnmatch
+import random
+import time
+
+from oslo.config import cfg
+
+from ceilometer.event import converter
+
+SERVICES = ['compute', 'image', 'volume', 'network', 'identity', 'dns',
+            'orchestration', 'objectstore', 'snapshot', 'port', 'router']
+RESOURCES = ['instance', 'server', 'stack', 'user', 'project', 'domain',
+             'floatingip', 'backup', 'record', 'share', 'cluster']
+ACTIONS = ['create', 'update', 'delete', 'resize', 'rebuild', 'exists',
+           'upload', 'download', 'attach', 'detach', 'suspend', 'resume']
+PHASES = ['start', 'end', 'error']
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        description='benchmark the lookup of the event definitions',
+    )
+    parser.add_argument(
+        '--definitions',
+        default=500,
+        type=int,
+        help='Number of event definitions.',
+    )
+    parser.add_argument(
+        '--notifications',
+        default=100,
+        type=int,
+        help='Number of notifications looked up, among ten times less '
+             'event types.',
+    )
+    parser.add_argument(
+        '--wildcards',
+        default=0.2,
+        type=float,
+        help='Ratio of the event types of the definitions with a '
+             'wildcard.',
+    )
+    parser.add_argument(
+        '--seed',
+        default=0,
+        type=int,
+        help='Seed of the random definitions and notifications.',
+    )
+    return parser
+
+
+def random_event_type(rand):
+    return '.'.join([rand.choice(SERVICES), rand.choice(RESOURCES),
+                     rand.choice(ACTIONS), rand.choice(PHASES)])
+
+
+def random_definitions(rand, count, wildcards):
+    definitions = []
+    for i in range(count):
+        event_types = []
+        for j in range(rand.randint(1, 3)):
+            event_type = random_event_type(rand)
+            if rand.random() < wildcards:
+                # wildcard the action or the phase
+                parts = event_type.split('.')
+                parts[rand.choice([2, 3])] = '*'
+                event_type = '.'.join(parts)
+            event_types.append(event_type)
+        if rand.random() < 0.1:
+            event_types.append('!%s.*' % rand.choice(SERVICES))
+        definitions.append({'event_type': event_types,
+                            'traits': {'instance_id': {
+                                'fields': 'payload.instance_id'}}})
+    return definitions
+
+
+def fnmatch_scan(definitions, event_type):
+    """Linear scan matching the patterns of each definition with fnmatch."""
+    for d in definitions:
+        included = [t for t in d.cfg['event_type'] if not t.startswith('!')]
+        excluded = [t[1:] for t in d.cfg['event_type'] if t.startswith('!')]
+        if not included:
+            included = ['*']
+        if (any(fnmatch.fnmatch(event_type, t) for t in included) and
+                not any(fnmatch.fnmatch(event_type, t) for t in excluded)):
+            return d
+
+
+def compiled_scan(definitions, event_type):
+    """Linear scan matching the compiled patterns of each definition."""
+    for d in definitions:
+        if d.match_type(event_type):
+            return d
+
+
+def indexed(conv, event_type):
+    conv._definitions_cache.clear()
+    return conv._get_event_definition(event_type)
+
+
+def measure(label, lookup, event_types):
+    started = time.time()
+    found = [lookup(event_type) for event_type in event_types]
+    elapsed = time.time() - started
+    print('%-30s %10.4f ms per notification' %
+          (label, elapsed * 1000 / len(event_types)))
+    return found
+
+
+def main():
+    cfg.CONF([], project='ceilometer')
+    args = get_parser().parse_args()
+    rand = random.Random(args.seed)
+
+    conv = converter.NotificationEventsConverter(
+        random_definitions(rand, args.definitions, args.wildcards), None)
+    definitions = conv.definitions
+    # the notifications share their event types, so that the memoised
+    # lookup is not always a miss
+    known_types = [random_event_type(rand)
+                   for i in range(max(1, args.notifications // 10))]
+    event_types = [rand.choice(known_types)
+                   for i in range(args.notifications)]
+
+    expected = measure('linear fnmatch scan',
+                       lambda t: fnmatch_scan(definitions, t), event_types)
+    results = [
+        measure('linear compiled scan',
+                lambda t: compiled_scan(definitions, t), event_types),
+        measure('indexed lookup', lambda t: indexed(conv, t), event_types),
+        measure('memoised lookup', conv._get_event_definition, event_types),
+    ]
+    for found in results:
+        assert found == expected, 'the lookups do not match'
+    return 0
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Benchmark of the resource listing of the SQL storage driver on SQLite.
+
+Usage:
+
+source .tox/py27/bin/activate
+./tools/benchmark_resources.py --resources 10000 --meters 3
+
+It times, and counts the SQL statements of, the storage calls made by
+GET /v2/resources: the listing of the resources and the listing of their
+meters for the meter links, once for all the resources and, as a point of
+comparison, once per resource.
+"""
+from __future__ import print_function
+
+import argparse
+import datetime
+import time
+
+from oslo.config import cfg
+import sqlalchemy
+
+from ceilometer.publisher import utils
+from ceilometer import sample
+from ceilometer.storage import impl_sqlalchemy
+from ceilometer.storage.sqlalchemy import models
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        description='benchmark the listing of the resources on SQLite',
+    )
+    parser.add_argument(
+        '--resources',
+        default=1000,
+        type=int,
+        help='Number of resources.',
+    )
+    parser.add_argument(
+        '--meters',
+        default=3,
+        type=int,
+        help='Number of meters per resource.',
+    )
+    parser.add_argument(
+        '--samples',
+        default=2,
+        type=int,
+        help='Number of samples per meter and resource.',
+    )
+    parser.add_argument(
+        '--url',
+        default='sqlite://',
+        help='SQLite database to fill, in memory by default.',
+    )
+    return parser
+
+
+def record_test_data(conn, resources, meters, samples):
+    start = datetime.datetime(2015, 1, 1)
+    for r in range(resources):
+        for m in range(meters):
+            for s in range(samples):
+                c = sample.Sample(
+                    name='meter-%d' % m,
+                    type=sample.TYPE_GAUGE,
+                    unit='%',
+                    volume=s,
+                    user_id='user-%d' % (r % 10),
+                    project_id='project-%d' % (r % 5),
+                    resource_id='resource-%d' % r,
+                    timestamp=start + datetime.timedelta(minutes=s,
+                                                         seconds=r),
+                    resource_metadata={'display_name': 'server-%d' % r},
+                    source='benchmark')
+                data = utils.meter_message_from_counter(
+                    c, cfg.CONF.publisher.metering_secret)
+                data['timestamp'] = c.timestamp
+                conn.record_metering_data(data)
+
+
+def measure(engine, label, func):
+    statements = []
+
+    def count(*args):
+        statements.append(args[2])
+
+    sqlalchemy.event.listen(engine, 'before_cursor_execute', count)
+    started = time.time()
+    try:
+        result = func()
+    finally:
+        sqlalchemy.event.remove(engine, 'before_cursor_execute', count)
+    print('%-30s %8.3fs %8d statements' %
+          (label, time.time() - started, len(statements)))
+    return result
+
+
+def main():
+    cfg.CONF([], project='ceilometer')
+    args = get_parser().parse_args()
+
+    conn = impl_sqlalchemy.Connection(args.url)
+    engine = conn._engine_facade.get_engine()
+    # the schema of the models, quicker to create than running the
+    # migrations
+    models.Base.metadata.create_all(engine)
+    print('Recording %d samples...' % (args.resources * args.meters *
+                                       args.samples))
+    record_test_data(conn, args.resources, args.meters, args.samples)
+
+    resources = measure(engine, 'get_resources()',
+                        lambda: list(conn.get_resources()))
+    measure(engine, 'get_meters() for all',
+            lambda: list(conn.get_meters()))
+    measure(engine, 'get_meters() per resource',
+            lambda: [list(conn.get_meters(resource=r.resource_id))
+                     for r in resources])
+    return 0
+
+
+if __name__ == '__main__':
+    main()